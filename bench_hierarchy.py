@@ -0,0 +1,113 @@
+"""Benchmark: hierarchy operations with and without the subtree index.
+
+Run with: python bench_hierarchy.py
+"""
+import random
+import time
+
+from tasker.hierarchy import SubtreeIndex
+from tasker.model import Task
+
+SIZES = [1000, 5000, 10000, 50000]
+OPS = 500
+
+
+def make_tasks(n):
+    """Top-level tasks with 0-3 children (a child may have a grandchild)."""
+    rng = random.Random(n)
+    tasks = []
+    while len(tasks) < n:
+        tasks.append(Task(text=f"task {len(tasks)}"))
+        for _ in range(rng.randint(0, 3)):
+            tasks.append(Task(text="child", indent=1))
+            if rng.random() < 0.2:
+                tasks.append(Task(text="grandchild", indent=2))
+    return tasks[:n]
+
+
+def legacy_group(tasks, index):
+    """The linear scan TaskerApp used before the index."""
+    parent_indent = tasks[index].indent
+    end = index + 1
+    while end < len(tasks) and tasks[end].indent > parent_indent:
+        end += 1
+    return index, end
+
+
+def legacy_move_down(tasks, index):
+    start, end = legacy_group(tasks, index)
+    if end >= len(tasks):
+        return
+    below_end = legacy_group(tasks, end)[1]
+    tasks[start:below_end] = tasks[end:below_end] + tasks[start:end]
+
+
+def index_move_down(idx, index):
+    start, end = idx.group(index)
+    if end >= len(idx.tasks):
+        return
+    below_end = idx.group(end)[1]
+    idx.move(start, end, start + (below_end - end))
+
+
+def timed(fn, positions):
+    t0 = time.perf_counter()
+    for p in positions:
+        fn(p)
+    return (time.perf_counter() - t0) / len(positions) * 1e6
+
+
+def main():
+    print(f"{'tasks':>7} {'op':<22} {'legacy us':>10} {'index us':>10}")
+    for n in SIZES:
+        rng = random.Random(0)
+        tasks = make_tasks(n)
+        idx = SubtreeIndex(tasks)
+        roots = [i for i, t in enumerate(tasks) if t.indent == 0]
+        positions = [rng.choice(roots) for _ in range(OPS)]
+
+        rows = [
+            ("group lookup",
+             timed(lambda p: legacy_group(tasks, p), positions),
+             timed(idx.group, positions)),
+            ("done cascade",
+             timed(lambda p: [setattr(t, "done", True) for t in
+                              tasks[slice(*legacy_group(tasks, p))]],
+                   positions),
+             timed(lambda p: [setattr(t, "done", True) for t in
+                              tasks[slice(*idx.group(p))]], positions)),
+        ]
+
+        legacy_tasks = make_tasks(n)
+        rows.append(("move group down",
+                     timed(lambda p: legacy_move_down(legacy_tasks, p),
+                           positions),
+                     timed(lambda p: index_move_down(idx, p), positions)))
+        rows.append(("insert + delete",
+                     timed(lambda p: (legacy_tasks.insert(p + 1, Task()),
+                                      legacy_tasks.pop(p + 1)), positions),
+                     timed(lambda p: (idx.insert(p + 1, Task()),
+                                      idx.pop(p + 1)), positions)))
+        rows.append(("indent + unindent",
+                     timed(lambda p: (setattr(legacy_tasks[p + 1], "indent", 1),
+                                      setattr(legacy_tasks[p + 1], "indent", 0))
+                           if p + 1 < n and legacy_tasks[p + 1].indent == 0
+                           else None, positions),
+                     timed(lambda p: (idx.set_indent(p + 1, 1),
+                                      idx.set_indent(p + 1, 0))
+                           if p + 1 < n and tasks[p + 1].indent == 0
+                           else None, positions)))
+        # one project holding a tenth of the list
+        big = [Task(text="project")] + [Task(text="step", indent=1)
+                                        for _ in range(n // 10)] + tasks
+        big_idx = SubtreeIndex(big)
+        rows.append(("group of n/10 children",
+                     timed(lambda p: legacy_group(big, 0), positions),
+                     timed(lambda p: big_idx.group(0), positions)))
+        for name, legacy, indexed in rows:
+            print(f"{n:>7} {name:<22} {legacy:>10.2f} {indexed:>10.2f}")
+        assert not idx.check(), "index out of sync"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Benchmark: Tasker's cost per key press anywhere on the system.
+
+Replays a synthetic typing stream (mostly plain letters, some shortcuts,
+a Ctrl+K, Ctrl+K chord now and then) through three paths:
+
+  on_press hook  the previous approach: ``keyboard.on_press`` ran
+                 Tasker's chord detection for every key press
+  X11 grab       ``tasker.hotkey.GlobalHotkey`` on X11: the X server
+                 delivers only the chord's key combinations, so only
+                 those are timed; the filtering itself costs Tasker
+                 nothing and is not measured
+  keyboard hook  ``GlobalHotkey`` on the ``keyboard`` backend: every
+                 press is injected into the package's own listener,
+                 which matches it against its hotkey table in Python.
+                 Needs the ``keyboard`` package and its OS setup (root
+                 on Linux); skipped otherwise
+
+and reports the calls into Python hooks and the time spent per key
+press.  ``keyboard.is_pressed`` is replaced by a dict lookup, so the
+old path's numbers are a lower bound.  Run with:
+
+    python bench_hotkey.py [--keys 200000]
+"""
+import argparse
+import random
+import time
+
+from tasker.constants import GLOBAL_HOTKEY
+from tasker.hotkey import GlobalHotkey
+
+
+class KeyEvent:
+    """What a ``keyboard`` hook receives."""
+
+    __slots__ = ("name", "modifiers", "mods")
+
+    def __init__(self, name, mods):
+        self.name = name
+        self.modifiers = None  # the hook does not fill these in
+        self.mods = mods
+
+
+class LegacyChord:
+    """The old ``TaskerApp._on_key_press``, run for every key press."""
+
+    def __init__(self, pressed, on_trigger):
+        self._is_pressed = pressed.__contains__
+        self.on_trigger = on_trigger
+        self._hotkey_state = 0
+        self._hotkey_ts = 0.0
+
+    def on_key_press(self, event):
+        try:
+            key_name = event.name.lower() if event.name else ""
+            is_ctrl_k = (key_name == "k" and
+                         any(mod in event.modifiers or []
+                             for mod in ("ctrl", "left ctrl", "right ctrl"))
+                         if hasattr(event, "modifiers") and event.modifiers
+                         else key_name == "k" and self._is_pressed("ctrl"))
+            if is_ctrl_k:
+                now = time.time()
+                if self._hotkey_state == 1 and (now - self._hotkey_ts) < 1.0:
+                    self._hotkey_state = 0
+                    self.on_trigger()
+                else:
+                    self._hotkey_state = 1
+                    self._hotkey_ts = now
+            elif key_name not in ("ctrl", "left ctrl", "right ctrl",
+                                  "control_l", "control_r", ""):
+                self._hotkey_state = 0
+        except Exception:
+            pass
+
+
+def make_stream(n, seed=0):
+    """(event, modifiers held) pairs, with a chord every ~5000 keys."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    ctrl = frozenset({"ctrl"})
+    stream = []
+    while len(stream) < n:
+        r = rng.random()
+        if r < 0.0002:
+            stream += [KeyEvent("ctrl", frozenset()), KeyEvent("k", ctrl),
+                       KeyEvent("k", ctrl)]
+        elif r < 0.02:
+            stream += [KeyEvent("ctrl", frozenset()),
+                       KeyEvent(rng.choice("acvxzs"), ctrl)]
+        elif r < 0.15:
+            stream.append(KeyEvent(rng.choice(["space", "backspace", "enter",
+                                               "shift", "tab"]), frozenset()))
+        else:
+            stream.append(KeyEvent(rng.choice(letters), frozenset()))
+    return stream[:n]
+
+
+def run_legacy(stream):
+    fired = [0]
+    pressed = set()
+    legacy = LegacyChord(pressed, lambda: fired.__setitem__(0, fired[0] + 1))
+    t0 = time.perf_counter()
+    for event in stream:
+        pressed.clear()
+        pressed.update(event.mods)
+        legacy.on_key_press(event)
+    return time.perf_counter() - t0, len(stream), fired[0]
+
+
+def run_grab(stream):
+    fired = [0]
+    hotkey = GlobalHotkey(GLOBAL_HOTKEY,
+                          lambda: fired.__setitem__(0, fired[0] + 1))
+    registered = set(hotkey.steps)
+    # the X server filters the rest; this stands in for it, untimed
+    delivered = [(e.mods, e.name) for e in stream
+                 if (e.mods, e.name) in registered]
+    t0 = time.perf_counter()
+    for combo in delivered:
+        hotkey._pressed(combo)
+    return time.perf_counter() - t0, len(delivered), fired[0]
+
+
+def run_keyboard(stream):
+    """Feed the stream through ``keyboard``'s listener without its OS hook.
+
+    Each press becomes its modifiers' downs, the key's down and up, and
+    the modifiers' ups, handled the way the listener threads would.
+    """
+    import keyboard
+
+    listener = keyboard._listener
+    listener.init()  # tables and device only; no hook thread
+    listener.listening = True
+    fired = [0]
+    hotkey = GlobalHotkey(GLOBAL_HOTKEY,
+                          lambda: fired.__setitem__(0, fired[0] + 1))
+    for mods, key in set(hotkey.steps):
+        name = "+".join(sorted(mods) + [key])
+        keyboard.add_hotkey(name.replace("super", "windows"),
+                            hotkey._pressed, args=((mods, key),))
+    codes = {}
+
+    def scan(name):
+        if name not in codes:
+            codes[name] = keyboard.key_to_scan_codes(name)[0]
+        return codes[name]
+
+    events = []
+    for e in stream:
+        mods = sorted(e.mods)
+        for name, kind in ([(m, keyboard.KEY_DOWN) for m in mods] +
+                           [(e.name, keyboard.KEY_DOWN),
+                            (e.name, keyboard.KEY_UP)] +
+                           [(m, keyboard.KEY_UP) for m in mods]):
+            events.append(keyboard.KeyboardEvent(kind, scan(name), name))
+    queue = listener.queue
+    t0 = time.perf_counter()
+    for event in events:
+        listener.direct_callback(event)
+        while not queue.empty():
+            queued = queue.get()
+            if listener.pre_process_event(queued):
+                listener.invoke_handlers(queued)
+    seconds = time.perf_counter() - t0
+    keyboard.unhook_all_hotkeys()
+    return seconds, len(events), fired[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=200000)
+    args = parser.parse_args()
+
+    stream = make_stream(args.keys)
+    print(f"{args.keys} key presses")
+    print(f"{'path':<15} {'calls':>8} {'chords':>7} {'total ms':>9} "
+          f"{'ns/key':>8}")
+    for name, run in (("on_press hook", run_legacy),
+                      ("X11 grab", run_grab),
+                      ("keyboard hook", run_keyboard)):
+        try:
+            seconds, calls, fired = run(stream)
+        except Exception as e:
+            print(f"{name:<15} not measured: {e or type(e).__name__}")
+            continue
+        print(f"{name:<15} {calls:>8} {fired:>7} {seconds * 1000:>9.2f} "
+              f"{seconds * 1e9 / args.keys:>8.1f}")
+    print("X11 grab assumes the X server filters keys: only the chord's "
+          "presses reach Tasker and are timed.")
+
+
+if __name__ == "__main__":
+    main()
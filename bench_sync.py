@@ -0,0 +1,216 @@
+"""Benchmark: Microsoft To Do sync against the local fake Graph server.
+
+For lists of 10 to 5000 tasks, measures wall time, HTTP requests and
+bytes sent for:
+
+  legacy         the push before incremental sync, as the baseline:
+                 one request at a time on a new connection each, every
+                 task deleted and created again
+  full replace   the same clear and re-create through batched requests
+                 on pooled connections, which the first push still does
+  no change      incremental push with nothing to send
+  1 edit         incremental push after changing one task
+  10% edits      incremental push after changing a tenth of the tasks
+  add + delete   incremental push after adding one task, deleting one
+  idle pull      delta pull with nothing changed in To Do since the
+                 last pull
+  pull 10 edits  delta pull after ten tasks were changed in To Do
+
+Needs msal and requests installed; no sign-in happens.  Run with:
+
+    python bench_sync.py [--sizes 10 100] [--latency 0.02]
+                         [--throttle-rate 0.05] [--fail-rate 0.01]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import tasker.ms_todo_sync as ms_todo_sync
+from fake_graph import FakeGraph
+from tasker.model import Task
+
+SIZES = [10, 100, 1000, 5000]
+LIST_NAME = "Bench"
+
+
+class BenchSession(ms_todo_sync.SyncSession):
+    """``SyncSession`` that skips MSAL; the fake server takes any token."""
+
+    def acquire_token(self, interactive=False):
+        return "bench-token"
+
+
+def legacy_push(tasks, list_id, info):
+    """The original ``push_tasks`` minus sign-in and list lookup.
+
+    Lists the tasks page by page, deletes them one by one and creates
+    every task again, one ``requests.request`` (and connection) per call
+    and no retries.
+    """
+    import requests
+    info.update(mode="legacy", requests=0, bytes_sent=0)
+
+    def call(method, url, json_body=None):
+        headers = {"Authorization": "Bearer bench-token"}
+        data = None
+        if json_body is not None:
+            headers["Content-Type"] = "application/json"
+            data = json.dumps(json_body)
+        info["requests"] += 1
+        info["bytes_sent"] += len(data.encode("utf-8")) if data else 0
+        response = requests.request(method, url, headers=headers, data=data,
+                                    timeout=30)
+        if response.status_code >= 400:
+            raise ms_todo_sync.GraphError(
+                f"{method} {url} failed: {response.status_code}",
+                response.status_code)
+        return response.json() if response.text else None
+
+    url = f"{ms_todo_sync.GRAPH_BASE}/me/todo/lists/{list_id}/tasks"
+    ids = []
+    page = url
+    while page:
+        data = call("GET", page)
+        ids += [item["id"] for item in data.get("value", [])]
+        page = data.get("@odata.nextLink")
+    for task_id in ids:
+        call("DELETE", f"{url}/{task_id}")
+    for task in tasks:
+        call("POST", url, ms_todo_sync._task_payload(task))
+
+
+def make_tasks(n):
+    rng = random.Random(n)
+    return [Task(text=f"task {i}", done=rng.random() < 0.2,
+                 star=1 if rng.random() < 0.1 else 0,
+                 reminder="2030-01-01T09:00:00" if rng.random() < 0.1
+                 else None)
+            for i in range(n)]
+
+
+def timed(fn):
+    """Run fn(info); return (seconds, info)."""
+    info = {}
+    t0 = time.perf_counter()
+    try:
+        fn(info)
+    except ms_todo_sync.GraphError as exc:
+        # gave up (e.g. with --fail-rate); the next push resumes
+        info["mode"] = f"failed {exc.status}"
+    return time.perf_counter() - t0, info
+
+
+def settle(fn, tries=10):
+    """Run fn(info) until it is not stopped by injected failures."""
+    for _ in range(tries):
+        if not timed(fn)[1].get("mode", "").startswith("failed"):
+            return
+
+
+def bench_size(n, args):
+    if os.path.exists(ms_todo_sync.SYNC_STATE_FILE):
+        os.remove(ms_todo_sync.SYNC_STATE_FILE)  # from the previous size
+    graph = FakeGraph(latency=args.latency, throttle_rate=args.throttle_rate,
+                      fail_rate=args.fail_rate, seed=n).start()
+    ms_todo_sync.GRAPH_BASE = graph.base_url
+    session = BenchSession("bench-client", LIST_NAME)
+    rng = random.Random(0)
+    tasks = make_tasks(n)
+    rows = []
+
+    def push(info):
+        session.push(tasks, info=info)
+
+    def legacy(info):
+        legacy_push(tasks, session.list_id, info)
+
+    def full_replace(info):
+        # without sync state every push clears and re-creates the list
+        os.remove(ms_todo_sync.SYNC_STATE_FILE)
+        push(info)
+
+    def edit(count):
+        def run(info):
+            for task in rng.sample(tasks, count):
+                task.text += "*"
+            push(info)
+        return run
+
+    def add_delete(info):
+        tasks.insert(rng.randrange(n), Task(text="new task"))
+        del tasks[rng.randrange(n)]
+        push(info)
+
+    def pull(info):
+        result = session.pull(tasks, info=info)
+        for task, _key, merged in result.updated:
+            task.update_from(merged)
+        tasks.extend(result.added)
+
+    def pull_remote_edits(info):
+        list_id = next(iter(graph.lists))
+        for item in rng.sample(graph.tasks(LIST_NAME), min(10, n)):
+            graph.dispatch("PATCH", f"/me/todo/lists/{list_id}/tasks/"
+                           f"{item['id']}", {"title": item["title"] + "!"})
+        pull(info)
+
+    try:
+        settle(push)  # create the list and the sync state
+        scenarios = [
+            # (name, timed part, untimed preparation or None)
+            ("legacy", legacy, None),
+            ("full replace", full_replace, None),
+            ("no change", push, None),
+            ("1 edit", edit(1), None),
+            ("10% edits", edit(max(1, n // 10)), None),
+            ("add + delete", add_delete, None),
+            # the pushes above show up as changes; read those first
+            ("idle pull", pull, lambda: settle(pull)),
+            ("pull 10 edits", pull_remote_edits, None),
+        ]
+        for name, fn, prepare in scenarios:
+            if prepare is not None:
+                prepare()
+            seconds, info = timed(fn)
+            rows.append((name, info.get("mode", "pull"), seconds,
+                         info.get("requests", 0), info.get("bytes_sent", 0),
+                         info.get("throttled", 0) + info.get("retries", 0)))
+        settle(push)  # the last push may have given up
+        remote = sorted(item["title"] for item in graph.tasks(LIST_NAME))
+        if remote != sorted(t.text for t in tasks):
+            rows.append(("MISMATCH", "-", 0.0, 0, 0, 0))
+    finally:
+        session.close()
+        graph.stop()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds the fake server adds to each request")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    state_dir = tempfile.mkdtemp(prefix="tasker-bench-")
+    ms_todo_sync.SYNC_STATE_FILE = os.path.join(state_dir, "ms_sync_state.json")
+    ms_todo_sync.TOKEN_CACHE_FILE = os.path.join(state_dir, "ms_token_cache.json")
+    print(f"{'tasks':>6} {'scenario':<14} {'mode':<12} {'seconds':>8} "
+          f"{'requests':>8} {'KB sent':>9} {'retried':>7}")
+    try:
+        for n in args.sizes:
+            for name, mode, seconds, requests, sent, retried in bench_size(n, args):
+                print(f"{n:>6} {name:<14} {mode:<12} {seconds:>8.3f} "
+                      f"{requests:>8} {sent / 1024:>9.1f} {retried:>7}")
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
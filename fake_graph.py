@@ -0,0 +1,344 @@
+"""Local stand-in for the Microsoft Graph To Do endpoints.
+
+Implements just enough of ``/me/todo/lists``, list tasks (with
+``@odata.nextLink`` paging), ``tasks/delta`` and ``$batch`` to exercise
+``tasker.ms_todo_sync`` without an Azure app or network access.  It can
+also misbehave like the real service: answer a share of requests with
+429 Too Many Requests or with 5xx errors, throttle clients that keep too
+many requests in flight, and add latency.  Any bearer token is accepted;
+override ``SyncSession.acquire_token`` to skip the sign-in (see
+``bench_sync.py``).
+
+Run it standalone:
+
+    python fake_graph.py --port 8765 --throttle-rate 0.2
+
+or from Python:
+
+    server = FakeGraph().start()
+    ms_todo_sync.GRAPH_BASE = server.base_url
+    ...
+    server.stop()
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BATCH_LIMIT = 20
+
+
+class FakeGraph:
+    """In-memory To Do lists served over HTTP.
+
+    *throttle_rate* is the share of requests (and of ``$batch``
+    sub-requests) answered with 429, *fail_rate* the share answered with
+    a 500, 502, 503 or 504 before doing anything; *max_in_flight*
+    throttles HTTP requests beyond that many at once.  Throttled responses carry
+    ``Retry-After: <retry_after>`` unless *retry_after* is None.  Every
+    HTTP request takes at least *latency* seconds.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, page_size=100,
+                 throttle_rate=0.0, max_in_flight=None, retry_after=1,
+                 latency=0.0, fail_rate=0.0, seed=None):
+        self.page_size = page_size
+        self.throttle_rate = throttle_rate
+        self.fail_rate = fail_rate
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.latency = latency
+        # list id -> {"displayName": ..., "tasks": {task id: task}}
+        self.lists = {}
+        self.requests = 0      # HTTP requests received
+        self.sub_requests = 0  # requests inside $batch bodies
+        self.throttled = 0     # 429s sent, including inside $batch
+        self.failed = 0        # injected 5xx errors, including inside $batch
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        # delta: (sequence number, list id, task id) per change; delta
+        # tokens below delta_floor are answered with 410 Gone
+        self._changes = []
+        self._seq = itertools.count(1)
+        self.delta_floor = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1.0"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def tasks(self, list_name):
+        """Tasks of the list called *list_name*, in creation order."""
+        for item in self.lists.values():
+            if item["displayName"] == list_name:
+                return list(item["tasks"].values())
+        return []
+
+    # ---- request handling ----
+    def _throttle(self):
+        """Whether to answer the next request with 429."""
+        with self._lock:
+            if self.throttle_rate and self._random.random() < self.throttle_rate:
+                self.throttled += 1
+                return True
+        return False
+
+    def _fail(self):
+        """Status of an injected server error for the next request, or 0."""
+        with self._lock:
+            if self.fail_rate and self._random.random() < self.fail_rate:
+                self.failed += 1
+                return self._random.choice((500, 502, 503, 504))
+        return 0
+
+    def _throttle_headers(self):
+        if self.retry_after is None:
+            return {}
+        return {"Retry-After": str(self.retry_after)}
+
+    def dispatch(self, method, url, body):
+        """Return (status, body) for one request."""
+        split = urlsplit(url)
+        parts = [p for p in split.path.split("/") if p]
+        if parts[:1] == ["v1.0"]:
+            parts = parts[1:]
+        if parts == ["$batch"] and method == "POST":
+            return self._batch(body or {})
+        query = {k: v[0] for k, v in parse_qs(split.query).items()}
+        with self._lock:
+            return self._route(method, parts, query, body)
+
+    def _batch(self, body):
+        subs = body.get("requests", [])
+        if len(subs) > BATCH_LIMIT:
+            return 400, _error("BadRequest", "Too many requests in batch")
+        statuses = {}
+        responses = []
+        with self._lock:
+            self.sub_requests += len(subs)
+        for sub in subs:
+            deps = sub.get("dependsOn") or []
+            headers = None
+            if any(statuses.get(d, 424) >= 400 for d in deps):
+                status, data = 424, _error("FailedDependency",
+                                           "A dependency failed")
+            elif self._throttle():
+                status, data = 429, _error("TooManyRequests", "Throttled")
+                headers = self._throttle_headers()
+            else:
+                status = self._fail()
+                if status:
+                    data = _error("ServiceError", "Injected")
+                else:
+                    status, data = self.dispatch(sub.get("method", "GET"),
+                                                 sub.get("url", ""),
+                                                 sub.get("body"))
+            statuses[sub.get("id")] = status
+            response = {"id": sub.get("id"), "status": status}
+            if headers:
+                response["headers"] = headers
+            if data is not None:
+                response["body"] = data
+            responses.append(response)
+        return 200, {"responses": responses}
+
+    def _route(self, method, parts, query, body):
+        if parts[:3] != ["me", "todo", "lists"]:
+            return 404, _error("NotFound", "/".join(parts))
+        rest = parts[3:]
+        if not rest:
+            if method == "GET":
+                return 200, {"value": [
+                    {"id": lid, "displayName": item["displayName"]}
+                    for lid, item in self.lists.items()
+                ]}
+            if method == "POST":
+                lid = f"list-{next(self._ids)}"
+                self.lists[lid] = {"displayName": body["displayName"],
+                                   "tasks": {}}
+                return 201, {"id": lid, "displayName": body["displayName"]}
+        todo = self.lists.get(rest[0])
+        if todo is None or rest[1:2] != ["tasks"]:
+            return 404, _error("ErrorItemNotFound", "List not found")
+        tasks = todo["tasks"]
+        if rest[2:] == ["delta"] and method == "GET":
+            return self._delta(rest[0], tasks, query)
+        if len(rest) == 2:
+            if method == "GET":
+                return 200, self._page(rest[0], tasks, int(query.get("$skip", 0)))
+            if method == "POST":
+                task = {k: v for k, v in (body or {}).items() if v is not None}
+                task["id"] = f"task-{next(self._ids)}"
+                tasks[task["id"]] = task
+                self._changed(rest[0], task["id"])
+                return 201, task
+        elif len(rest) == 3:
+            task = tasks.get(rest[2])
+            if task is None:
+                return 404, _error("ErrorItemNotFound", "Task not found")
+            if method == "GET":
+                return 200, task
+            if method == "PATCH":
+                for key, value in (body or {}).items():
+                    if value is None:
+                        task.pop(key, None)
+                    else:
+                        task[key] = value
+                self._changed(rest[0], rest[2])
+                return 200, task
+            if method == "DELETE":
+                del tasks[rest[2]]
+                self._changed(rest[0], rest[2])
+                return 204, None
+        return 405, _error("MethodNotAllowed", method)
+
+    def _changed(self, lid, task_id):
+        self._changes.append((next(self._seq), lid, task_id))
+
+    def _delta(self, lid, tasks, query):
+        """Tasks changed since ``$deltatoken``, or all of them without one."""
+        token = query.get("$deltatoken")
+        if token is None:
+            items = list(tasks.values())
+        else:
+            since = int(token)
+            if since < self.delta_floor:
+                return 410, _error("SyncStateNotFound", "Delta token expired")
+            ids = dict.fromkeys(tid for seq, l, tid in self._changes
+                                if seq > since and l == lid)
+            items = [tasks.get(tid) or {"id": tid,
+                                        "@removed": {"reason": "deleted"}}
+                     for tid in ids]
+        skip = int(query.get("$skip", 0))
+        page = {"value": items[skip:skip + self.page_size]}
+        link = f"{self.base_url}/me/todo/lists/{lid}/tasks/delta?"
+        if skip + self.page_size < len(items):
+            params = f"$skip={skip + self.page_size}"
+            if token is not None:
+                params += f"&$deltatoken={token}"
+            page["@odata.nextLink"] = link + params
+        else:
+            latest = self._changes[-1][0] if self._changes else 0
+            page["@odata.deltaLink"] = link + f"$deltatoken={latest}"
+        return 200, page
+
+    def _page(self, lid, tasks, skip):
+        items = list(tasks.values())
+        page = {"value": items[skip:skip + self.page_size]}
+        if skip + self.page_size < len(items):
+            page["@odata.nextLink"] = (
+                f"{self.base_url}/me/todo/lists/{lid}/tasks"
+                f"?$skip={skip + self.page_size}"
+            )
+        return page
+
+
+def _error(code, message):
+    return {"error": {"code": code, "message": message}}
+
+
+def _make_handler(graph):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                self._reply(400, _error("BadRequest", "Invalid JSON"))
+                return
+            with graph._lock:
+                graph.requests += 1
+                graph.in_flight += 1
+                graph.peak_in_flight = max(graph.peak_in_flight,
+                                           graph.in_flight)
+                crowded = (graph.max_in_flight is not None and
+                           graph.in_flight > graph.max_in_flight)
+                if crowded:
+                    graph.throttled += 1
+            try:
+                if graph.latency:
+                    time.sleep(graph.latency)
+                if crowded or graph._throttle():
+                    self._reply(429, _error("TooManyRequests", "Throttled"),
+                                graph._throttle_headers())
+                    return
+                failure = graph._fail()
+                if failure:
+                    self._reply(failure, _error("ServiceError", "Injected"))
+                    return
+                status, data = graph.dispatch(self.command, self.path, body)
+            finally:
+                with graph._lock:
+                    graph.in_flight -= 1
+            self._reply(status, data)
+
+        def _reply(self, status, data, headers=None):
+            payload = json.dumps(data).encode("utf-8") if data is not None else b""
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            if payload:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="share of requests answered with 429")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="throttle beyond this many concurrent requests")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every request")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="share of requests answered with a 5xx error")
+    args = parser.parse_args()
+    graph = FakeGraph(port=args.port, page_size=args.page_size,
+                      throttle_rate=args.throttle_rate,
+                      max_in_flight=args.max_in_flight,
+                      retry_after=args.retry_after,
+                      latency=args.latency,
+                      fail_rate=args.fail_rate).start()
+    print(f"Fake Graph listening on {graph.base_url} (Ctrl+C to stop)")
+    try:
+        graph._thread.join()
+    except KeyboardInterrupt:
+        graph.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
+import argparse
+
 from .ui.app import TaskerApp
 
-if __name__ == "__main__":
-    app = TaskerApp()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tasker")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="print task load / row build / startup times "
+                             "to stderr")
+    args = parser.parse_args(argv)
+    app = TaskerApp(startup_timing=args.startup_timing)
     app.run()
+
+
+if __name__ == "__main__":
+    main()
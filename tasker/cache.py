@@ -0,0 +1,166 @@
+"""Binary startup cache for the tasks file.
+
+Parsing a large hand-editable JSON file and building ``Task`` records is
+the bulk of cold-start time.  After a load, the parsed tasks are packed
+into ``~/.tasker/cache/<hash of path>.bin`` using ``struct``/``array``
+(no pickle).  The cache is only used when the tasks file still has the
+same path, size, mtime and content hash; anything else (e.g. a hand edit)
+is a miss and the JSON is parsed again.
+"""
+import array
+import hashlib
+import json
+import os
+import struct
+import sys
+
+from .constants import CACHE_DIR
+from .model import Task
+
+_MAGIC = b"TSKC"
+_VERSION = 2
+# magic, version, file size, file mtime_ns, digest, task count, path length;
+# arrays are stored little-endian
+_HEADER = struct.Struct("<4sHQq16sII")
+
+_DONE = 1
+_HAS_REMINDER = 2
+_HAS_EXTRA = 4
+_HAS_REPEAT = 8
+
+
+def content_digest(raw):
+    """Hash of the raw tasks-file bytes."""
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _cache_path(path):
+    key = hashlib.blake2b(os.path.abspath(path).encode("utf-8"),
+                          digest_size=12).hexdigest()
+    return os.path.join(CACHE_DIR, key + ".bin")
+
+
+def load_cached_tasks(path, raw, st):
+    """Return tasks for *raw* (the file's bytes, *st* its stat) or None."""
+    try:
+        with open(_cache_path(path), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        return _unpack(data, os.path.abspath(path), raw, st)
+    except (struct.error, ValueError, IndexError, UnicodeDecodeError):
+        return None
+
+
+def save_cached_tasks(path, raw, st, tasks):
+    """Cache *tasks* as the parse result of *raw* (best effort)."""
+    try:
+        data = _pack(os.path.abspath(path), raw, st, tasks)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = _cache_path(path) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, _cache_path(path))
+    except (OSError, TypeError, ValueError, OverflowError):
+        pass
+
+
+def _pack(abspath, raw, st, tasks):
+    flags = array.array("B")
+    stars = array.array("i")
+    indents = array.array("i")
+    lengths = array.array("I")
+    strings = []
+
+    def add(s):
+        strings.append(s)
+        lengths.append(len(s))
+
+    for t in tasks:
+        f = _DONE if t.done else 0
+        add(t.text)
+        if t.reminder is not None:
+            f |= _HAS_REMINDER
+            add(t.reminder)
+        if t.repeat is not None:
+            f |= _HAS_REPEAT
+            add(t.repeat)
+        if t.extra:
+            f |= _HAS_EXTRA
+            add(json.dumps(t.extra, ensure_ascii=False))
+        flags.append(f)
+        stars.append(t.star)
+        indents.append(t.indent)
+
+    path_bytes = abspath.encode("utf-8")
+    blob = "".join(strings).encode("utf-8", "surrogatepass")
+    if sys.byteorder != "little":
+        for arr in (stars, indents, lengths):
+            arr.byteswap()
+    header = _HEADER.pack(_MAGIC, _VERSION, st.st_size, st.st_mtime_ns,
+                          content_digest(raw), len(tasks), len(path_bytes))
+    return b"".join([header, path_bytes, flags.tobytes(), stars.tobytes(),
+                     indents.tobytes(), struct.pack("<I", len(lengths)),
+                     lengths.tobytes(), blob])
+
+
+def _unpack(data, abspath, raw, st):
+    (magic, version, size, mtime_ns, digest, count,
+     path_len) = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        return None
+    if size != st.st_size or mtime_ns != st.st_mtime_ns:
+        return None
+    pos = _HEADER.size
+    if data[pos:pos + path_len].decode("utf-8") != abspath:
+        return None
+    if digest != content_digest(raw):
+        return None
+    pos += path_len
+
+    def take(typecode, n):
+        nonlocal pos
+        arr = array.array(typecode)
+        nbytes = n * arr.itemsize
+        arr.frombytes(data[pos:pos + nbytes])
+        pos += nbytes
+        if sys.byteorder != "little" and arr.itemsize > 1:
+            arr.byteswap()
+        return arr
+
+    flags = take("B", count)
+    stars = take("i", count)
+    indents = take("i", count)
+    (n_strings,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    lengths = take("I", n_strings)
+    blob = data[pos:].decode("utf-8", "surrogatepass")
+
+    tasks = []
+    append = tasks.append
+    s = 0  # string index
+    c = 0  # char offset into blob
+    for i in range(count):
+        f = flags[i]
+        end = c + lengths[s]
+        text = blob[c:end]
+        c, s = end, s + 1
+        reminder = None
+        if f & _HAS_REMINDER:
+            end = c + lengths[s]
+            reminder = blob[c:end]
+            c, s = end, s + 1
+        repeat = None
+        if f & _HAS_REPEAT:
+            end = c + lengths[s]
+            repeat = blob[c:end]
+            c, s = end, s + 1
+        extra = None
+        if f & _HAS_EXTRA:
+            end = c + lengths[s]
+            extra = json.loads(blob[c:end])
+            c, s = end, s + 1
+        append(Task(text, bool(f & _DONE), stars[i], indents[i], reminder,
+                    extra, repeat))
+    return tasks
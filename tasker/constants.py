@@ -19,8 +19,16 @@ CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 DEFAULT_DATA_FILE = os.path.join(CONFIG_DIR, "tasks.json")
 LOCK_FILE = os.path.join(CONFIG_DIR, "tasker.lock")
 
-GLOBAL_HOTKEY = "ctrl+k"  # chord: Ctrl+K, Ctrl+K
+GLOBAL_HOTKEY = "ctrl+k, ctrl+k"  # default chord; config "global_hotkey"
 WINDOW_WIDTH = 480
 WINDOW_HEIGHT = 400
 TITLE_HEIGHT = 24
-REMINDER_CHECK_MS = 30000
+REMINDER_SNOOZE_MIN = 10
+# To Do sync: look for edits made in To Do this often when idle
+MS_PULL_INTERVAL_MS = 5 * 60 * 1000
+# longer lists only create widgets for the rows on screen
+VIRTUAL_LIST_THRESHOLD = 200
+SAVE_INTERVAL_MS = 1000
+JOURNAL_MAX_BYTES = 256 * 1024
+JOURNAL_MAX_AGE_S = 600
+CACHE_DIR = os.path.join(CONFIG_DIR, "cache")
@@ -0,0 +1,141 @@
+"""Hand work from background threads to the Tk thread.
+
+Tkinter calls (``root.after`` included) are only safe on the thread that
+runs the Tk loop, yet the tray icon, the global hotkey hook and the sync
+service all need to reach the UI.  They ``post`` callables to one
+``UIDispatcher`` instead: posting only touches a ``queue.SimpleQueue``,
+and a single pump on the Tk thread runs everything queued.
+
+Where Tk supports file handlers (not on Windows) the pump is event
+driven: posting writes a byte to a pipe registered with the Tk loop, at
+most once until the pump has run.  Elsewhere the queue is polled every
+*poll_ms*.
+"""
+import os
+import queue
+import sys
+import time
+import tkinter as tk
+
+
+class UIDispatcher:
+    """Run callables posted from any thread on the Tk thread, in order."""
+
+    def __init__(self, root, *, poll_ms=20):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.mode = None  # "pipe" or "poll" once started
+        self._calls = queue.SimpleQueue()
+        self._signalled = False
+        self._closed = False
+        self._rfd = self._wfd = None
+        self._timer = None
+        self._run = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._depth_max = 0
+
+    def start(self):
+        if not self._start_pipe():
+            self.mode = "poll"
+            self._timer = self.root.after(self.poll_ms, self._poll)
+
+    def post(self, fn, *args):
+        """Run ``fn(*args)`` on the Tk thread soon; callable from any thread."""
+        if self._closed:
+            return
+        self._calls.put((fn, args, time.perf_counter()))
+        # the pump clears the flag before it drains, so a call queued
+        # while the flag is still set is always picked up
+        wfd = self._wfd
+        if wfd is not None and not self._signalled:
+            self._signalled = True
+            try:
+                os.write(wfd, b"\0")
+            except OSError:
+                pass  # pipe full (a wake-up is pending) or closed
+
+    def stop(self):
+        """Stop pumping; later posts are dropped."""
+        self._closed = True
+        if self._timer is not None:
+            try:
+                self.root.after_cancel(self._timer)
+            except tk.TclError:
+                pass
+            self._timer = None
+        if self._rfd is not None:
+            rfd, wfd = self._rfd, self._wfd
+            self._rfd = self._wfd = None
+            try:
+                self.root.tk.deletefilehandler(rfd)
+            except (AttributeError, tk.TclError):
+                pass
+            os.close(rfd)
+            os.close(wfd)
+        self.mode = None
+
+    def stats(self):
+        """Counts and latencies (seconds from post to run) so far."""
+        queued = self._calls.qsize()
+        run = self._run
+        return {
+            "mode": self.mode,
+            "posted": run + queued,
+            "run": run,
+            "queued": queued,
+            "depth_max": self._depth_max,
+            "latency_avg": self._latency_total / run if run else 0.0,
+            "latency_max": self._latency_max,
+        }
+
+    # ---- internals ----
+    def _start_pipe(self):
+        try:
+            rfd, wfd = os.pipe()
+        except OSError:
+            return False
+        os.set_blocking(rfd, False)
+        os.set_blocking(wfd, False)
+        try:
+            self.root.tk.createfilehandler(rfd, tk.READABLE, self._on_readable)
+        except (AttributeError, tk.TclError):
+            os.close(rfd)  # no file handlers in this Tk build (Windows)
+            os.close(wfd)
+            return False
+        self._rfd, self._wfd = rfd, wfd
+        self.mode = "pipe"
+        return True
+
+    def _on_readable(self, fd, _mask):
+        try:
+            while os.read(fd, 512):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        self._signalled = False
+        self._drain()
+
+    def _poll(self):
+        self._timer = self.root.after(self.poll_ms, self._poll)
+        self._drain()
+
+    def _drain(self):
+        # only what is queued now; calls posted meanwhile wait for the
+        # next round, so a busy poster cannot starve the Tk loop
+        depth = self._calls.qsize()
+        if depth > self._depth_max:
+            self._depth_max = depth
+        for _ in range(depth):
+            if self._closed:
+                return
+            fn, args, posted = self._calls.get_nowait()
+            latency = time.perf_counter() - posted
+            self._run += 1
+            self._latency_total += latency
+            if latency > self._latency_max:
+                self._latency_max = latency
+            try:
+                fn(*args)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
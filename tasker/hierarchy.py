@@ -0,0 +1,123 @@
+"""Subtree index over the flat, indent-encoded task list.
+
+A task's children are the tasks right after it with a larger indent, so
+finding where a group ends normally means walking the list.  The index
+keeps, for every position, the subtree size (``end = i + size``) and the
+distance back to the parent.  Both are relative, so an edit only
+invalidates entries inside the top-level group(s) it touches; tasks in
+other top-level groups keep valid entries even when their positions
+shift.
+"""
+
+
+class SubtreeIndex:
+    """Parent pointers and subtree extents for a list of ``Task`` records.
+
+    Structural edits (insert, delete, indent change, group move) must go
+    through the index so it can repair itself; it mutates the task list
+    it was given.  Field edits that don't touch ``indent`` need nothing.
+    """
+
+    def __init__(self, tasks):
+        self.reset(tasks)
+
+    def reset(self, tasks):
+        """Index a new task list from scratch."""
+        self.tasks = tasks
+        self._size = [1] * len(tasks)
+        self._up = [0] * len(tasks)
+        self._repair(0, len(tasks))
+
+    # ---- queries ----
+    def group(self, i):
+        """Return (start, end) slice of task *i* and all its descendants."""
+        return i, i + self._size[i]
+
+    def parent(self, i):
+        """Position of the parent of task *i*, or None for a top-level task."""
+        up = self._up[i]
+        return i - up if up else None
+
+    def root(self, i):
+        """Position of the top-level ancestor of task *i*."""
+        up = self._up
+        while up[i]:
+            i -= up[i]
+        return i
+
+    # ---- structural edits ----
+    def insert(self, i, task):
+        start = self._repair_start(i)
+        self.tasks.insert(i, task)
+        self._size.insert(i, 1)
+        self._up.insert(i, 0)
+        self._repair(start, i + 1)
+
+    def append(self, task):
+        self.insert(len(self.tasks), task)
+
+    def pop(self, i):
+        start = self._repair_start(i)
+        task = self.tasks.pop(i)
+        del self._size[i]
+        del self._up[i]
+        self._repair(start, i)
+        return task
+
+    def set_indent(self, i, indent):
+        start = self._repair_start(i)
+        self.tasks[i].indent = indent
+        self._repair(start, i + 1)
+
+    def move(self, i, j, to):
+        """Move slice [i:j] so it starts at *to* (journal ``move`` semantics)."""
+        lo = min(i, to)
+        hi = max(j, to + (j - i))
+        start = self._repair_start(lo)
+        tasks = self.tasks
+        # same-length slice assignment: nothing outside [lo, hi) moves
+        if to <= i:
+            tasks[lo:hi] = tasks[i:j] + tasks[to:i]
+        else:
+            tasks[lo:hi] = tasks[j:hi] + tasks[i:j]
+        # every entry in [lo, hi) is recomputed by the repair
+        self._repair(start, hi)
+
+    # ---- consistency ----
+    def check(self):
+        """Return positions whose entries disagree with a full rebuild."""
+        fresh = SubtreeIndex(self.tasks)
+        return [i for i in range(len(self.tasks))
+                if (self._size[i], self._up[i]) !=
+                (fresh._size[i], fresh._up[i])]
+
+    # ---- internals ----
+    def _repair_start(self, i):
+        # the top-level group holding the task before *i* is the first one
+        # an edit at *i* can change
+        return self.root(i - 1) if i > 0 else 0
+
+    def _repair(self, start, stop):
+        """Recompute entries from top-level position *start* onwards.
+
+        Entries at or after *stop* still describe the list before the edit
+        (shifted along with their tasks).  The scan stops at the first of
+        them that is top-level both before and after the edit: from there
+        on, nothing depends on what comes before it.
+        """
+        tasks, size, up = self.tasks, self._size, self._up
+        n = len(tasks)
+        stack = []  # open ancestors of position i
+        i = start
+        while i < n:
+            indent = tasks[i].indent
+            while stack and tasks[stack[-1]].indent >= indent:
+                j = stack.pop()
+                size[j] = i - j
+            if not stack and i >= stop and not up[i]:
+                break
+            up[i] = i - stack[-1] if stack else 0
+            stack.append(i)
+            i += 1
+        for j in stack:
+            size[j] = i - j
@@ -0,0 +1,346 @@
+"""Global show/hide hotkey: a chord such as Ctrl+K, Ctrl+K.
+
+Only the key combinations of the chord are registered, so key presses
+that are not part of it never run any Tasker code:
+
+* on X11 the combinations are grabbed with ``XGrabKey`` (libX11 through
+  ctypes, no extra dependency) and the X server reports only those.  The
+  grab is synchronous: a press that does not complete the chord is
+  replayed to the focused application, which so still gets a lone
+  Ctrl+K; only the press that completes the chord is swallowed.  Holding
+  a combination down does not complete the chord: its auto-repeated
+  presses are passed on like the first one.
+* elsewhere ``keyboard.add_hotkey`` matches them inside the ``keyboard``
+  package (needs admin rights on Windows).
+
+Both feed a small state machine that fires once the steps arrive in
+order, each within *timeout* seconds of the previous one.  Other keys
+are never seen, so they do not break a chord: Ctrl+K, X, Ctrl+K typed
+within the timeout also counts.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import time
+
+try:
+    import keyboard as _kb
+    HAS_KEYBOARD = True
+except ImportError:
+    HAS_KEYBOARD = False
+
+try:
+    _xlib = ctypes.CDLL(ctypes.util.find_library("X11") or "libX11.so.6")
+    HAS_X11 = sys.platform.startswith("linux")
+except OSError:
+    HAS_X11 = False
+
+_MODIFIERS = {"ctrl": "ctrl", "control": "ctrl", "alt": "alt",
+              "shift": "shift", "win": "super", "windows": "super",
+              "super": "super", "cmd": "super"}
+
+
+def parse_chord(text):
+    """Steps of a chord like ``"ctrl+k, ctrl+k"``.
+
+    Each step is (modifiers, key) with a frozenset of "ctrl", "alt",
+    "shift" and "super".  Raises ValueError for a malformed chord.
+    """
+    steps = []
+    for part in str(text).lower().split(","):
+        names = [n.strip() for n in part.split("+")]
+        if not all(names):
+            raise ValueError(f"bad hotkey {text!r}")
+        *mods, key = names
+        if key in _MODIFIERS or any(m not in _MODIFIERS for m in mods):
+            raise ValueError(f"bad hotkey {text!r}")
+        steps.append((frozenset(_MODIFIERS[m] for m in mods), key))
+    return tuple(steps)
+
+
+def format_chord(steps):
+    """Display form, e.g. ``"Ctrl+K, Ctrl+K"``."""
+    order = ("ctrl", "alt", "shift", "super")
+    return ", ".join(
+        "+".join([m.capitalize() for m in order if m in mods] +
+                 [key.upper() if len(key) == 1 else key.capitalize()])
+        for mods, key in steps)
+
+
+class GlobalHotkey:
+    """Call *on_trigger* (from a background thread) when *chord* is typed."""
+
+    def __init__(self, chord, on_trigger, *, timeout=1.0):
+        self.steps = parse_chord(chord)
+        self.on_trigger = on_trigger
+        self.timeout = timeout
+        self.backend = None  # "x11" or "keyboard" once started
+        self._step = 0
+        self._last = 0.0
+        self._grab = None
+        self._kb_handles = []
+
+    def start(self):
+        """Register the chord; returns the backend used, or None."""
+        combos = set(self.steps)
+        if HAS_X11:
+            grab = _X11Grab(combos, self._pressed)
+            if grab.start():
+                self._grab = grab
+                self.backend = "x11"
+                return self.backend
+        if HAS_KEYBOARD:
+            try:
+                for mods, key in combos:
+                    name = "+".join(sorted(mods) + [key])
+                    self._kb_handles.append(_kb.add_hotkey(
+                        name.replace("super", "windows"),
+                        self._pressed, args=((mods, key),)))
+            except Exception as e:
+                print(f"[Tasker] Failed to register global hotkey: {e}",
+                      file=sys.stderr)
+                self.stop()
+                return None
+            self.backend = "keyboard"
+        return self.backend
+
+    def stop(self):
+        if self._grab is not None:
+            self._grab.stop()
+            self._grab = None
+        for handle in self._kb_handles:
+            try:
+                _kb.remove_hotkey(handle)
+            except Exception:
+                pass
+        self._kb_handles = []
+        self.backend = None
+
+    def _pressed(self, combo):
+        """One registered combination was pressed (backend thread).
+
+        Returns True if it completed the chord.
+        """
+        now = time.monotonic()
+        if self._step and now - self._last > self.timeout:
+            self._step = 0
+        if combo != self.steps[self._step]:
+            self._step = 0
+            if combo != self.steps[0]:
+                return False
+        self._step += 1
+        self._last = now
+        if self._step < len(self.steps):
+            return False
+        self._step = 0
+        self.on_trigger()
+        return True
+
+
+# ---- X11 ----
+_KEY_PRESS = 2
+_GRAB_MODE_SYNC = 0
+_GRAB_MODE_ASYNC = 1
+_REPLAY_KEYBOARD = 2  # XAllowEvents modes
+_ASYNC_KEYBOARD = 3
+# while a grabbed key is held, check this often whether it was released;
+# presses before that are its auto-repeat
+_RELEASE_POLL = 0.01
+_MASKS = {"shift": 1, "ctrl": 4, "alt": 8, "super": 64}
+# Caps Lock and Num Lock must not stop the grab from matching
+_LOCK_MASKS = (0, 2, 16, 2 | 16)
+_MOD_MASK = 1 | 4 | 8 | 64
+
+
+class _XKeyEvent(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_int), ("serial", ctypes.c_ulong),
+                ("send_event", ctypes.c_int), ("display", ctypes.c_void_p),
+                ("window", ctypes.c_ulong), ("root", ctypes.c_ulong),
+                ("subwindow", ctypes.c_ulong), ("time", ctypes.c_ulong),
+                ("x", ctypes.c_int), ("y", ctypes.c_int),
+                ("x_root", ctypes.c_int), ("y_root", ctypes.c_int),
+                ("state", ctypes.c_uint), ("keycode", ctypes.c_uint),
+                ("same_screen", ctypes.c_int)]
+
+
+class _XEvent(ctypes.Union):
+    _fields_ = [("type", ctypes.c_int), ("xkey", _XKeyEvent),
+                ("pad", ctypes.c_long * 24)]
+
+
+_XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p,
+                                  ctypes.c_void_p)
+
+if HAS_X11:
+    _dpy = ctypes.c_void_p
+    for _name, _res, _args in (
+        ("XOpenDisplay", _dpy, [ctypes.c_char_p]),
+        ("XCloseDisplay", ctypes.c_int, [_dpy]),
+        ("XDefaultRootWindow", ctypes.c_ulong, [_dpy]),
+        ("XStringToKeysym", ctypes.c_ulong, [ctypes.c_char_p]),
+        ("XKeysymToKeycode", ctypes.c_ubyte, [_dpy, ctypes.c_ulong]),
+        ("XGrabKey", ctypes.c_int, [_dpy, ctypes.c_int, ctypes.c_uint,
+                                    ctypes.c_ulong, ctypes.c_int,
+                                    ctypes.c_int, ctypes.c_int]),
+        ("XUngrabKey", ctypes.c_int, [_dpy, ctypes.c_int, ctypes.c_uint,
+                                      ctypes.c_ulong]),
+        ("XSync", ctypes.c_int, [_dpy, ctypes.c_int]),
+        ("XSetErrorHandler", ctypes.c_void_p, [_XErrorHandler]),
+        ("XConnectionNumber", ctypes.c_int, [_dpy]),
+        ("XPending", ctypes.c_int, [_dpy]),
+        ("XNextEvent", ctypes.c_int, [_dpy, ctypes.POINTER(_XEvent)]),
+        ("XAllowEvents", ctypes.c_int, [_dpy, ctypes.c_int, ctypes.c_ulong]),
+        ("XFlush", ctypes.c_int, [_dpy]),
+        ("XQueryKeymap", ctypes.c_int, [_dpy, ctypes.POINTER(ctypes.c_ubyte)]),
+    ):
+        try:
+            _func = getattr(_xlib, _name)
+        except AttributeError:
+            HAS_X11 = False
+            break
+        _func.restype = _res
+        _func.argtypes = _args
+
+
+def _keysym_name(key):
+    if len(key) > 1 and key[0] == "f" and key[1:].isdigit():
+        return key.upper()  # F1..F35
+    return key
+
+
+class _X11Grab:
+    """Grab key combinations on a private X connection; a daemon thread
+    waits for them and calls *on_combo((modifiers, key))*.
+
+    The keyboard freezes at each grabbed press until *on_combo* returns:
+    True swallows the press, False replays it to the focused window.
+    Auto-repeated presses of a held key are not reported; they are
+    swallowed or replayed like the press that started them.  A key
+    released and pressed again within _RELEASE_POLL also counts as held.
+    """
+
+    def __init__(self, combos, on_combo):
+        self.combos = combos
+        self.on_combo = on_combo
+        self._dpy = None
+        self._root = None
+        self._keys = {}  # (keycode, modifier mask) -> combo
+        self._failed = False
+        self._wake = None
+        self._thread = None
+
+    def start(self):
+        self._dpy = _xlib.XOpenDisplay(None)
+        if not self._dpy:
+            return False
+        self._root = _xlib.XDefaultRootWindow(self._dpy)
+        for combo in self.combos:
+            mods, key = combo
+            keysym = _xlib.XStringToKeysym(_keysym_name(key).encode())
+            keycode = keysym and _xlib.XKeysymToKeycode(self._dpy, keysym)
+            if not keycode:
+                print(f"[Tasker] Unknown hotkey key {key!r}", file=sys.stderr)
+                self._close()
+                return False
+            mask = 0
+            for m in mods:
+                mask |= _MASKS[m]
+            self._keys[(keycode, mask)] = combo
+
+        # a combination grabbed by another client is reported as an
+        # asynchronous BadAccess; the default handler would exit
+        def _on_error(display, event):
+            if display == self._dpy:
+                self._failed = True
+                return 0
+            return _XErrorHandler(previous)(display, event) if previous else 0
+
+        handler = _XErrorHandler(_on_error)
+        previous = _xlib.XSetErrorHandler(handler)
+        try:
+            for keycode, mask in self._keys:
+                for lock in _LOCK_MASKS:
+                    _xlib.XGrabKey(self._dpy, keycode, mask | lock,
+                                   self._root, 0, _GRAB_MODE_ASYNC,
+                                   _GRAB_MODE_SYNC)
+            _xlib.XSync(self._dpy, 0)
+        finally:
+            _xlib.XSetErrorHandler(_XErrorHandler(previous) if previous
+                                   else _XErrorHandler())
+        if self._failed:
+            print("[Tasker] Hotkey is already taken by another application",
+                  file=sys.stderr)
+            self._close()
+            return False
+
+        self._wake = os.pipe()
+        self._thread = threading.Thread(target=self._run,
+                                        name="tasker-hotkey", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._thread is not None:
+            try:
+                os.write(self._wake[1], b"\0")
+            except OSError:
+                pass  # the thread has already ended
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        xfd = _xlib.XConnectionNumber(self._dpy)
+        event = _XEvent()
+        keymap = (ctypes.c_ubyte * 32)()
+        held = None  # keycode of the last grabbed press, until released
+        swallow = False
+        try:
+            while True:
+                # the replayed press takes the grab's key release with it,
+                # so the key state is polled while a grabbed key is down
+                ready, _, _ = select.select(
+                    [xfd, self._wake[0]], [], [],
+                    None if held is None else _RELEASE_POLL)
+                if self._wake[0] in ready:
+                    return
+                if held is not None:
+                    _xlib.XQueryKeymap(self._dpy, keymap)
+                    if not keymap[held // 8] & (1 << held % 8):
+                        held = None
+                while _xlib.XPending(self._dpy):
+                    _xlib.XNextEvent(self._dpy, ctypes.byref(event))
+                    if event.type != _KEY_PRESS:
+                        continue
+                    keycode = event.xkey.keycode
+                    try:
+                        if keycode != held:
+                            held = keycode
+                            swallow = False
+                            combo = self._keys.get(
+                                (keycode, event.xkey.state & _MOD_MASK))
+                            swallow = (combo is not None and
+                                       self.on_combo(combo))
+                        # else auto-repeat: treated like the first press
+                    finally:
+                        # thaw the keyboard whatever happened
+                        _xlib.XAllowEvents(
+                            self._dpy,
+                            _ASYNC_KEYBOARD if swallow else _REPLAY_KEYBOARD,
+                            event.xkey.time)
+                        _xlib.XFlush(self._dpy)
+        finally:
+            self._close()
+            for fd in self._wake:
+                os.close(fd)
+
+    def _close(self):
+        if self._dpy:
+            for keycode, mask in self._keys:
+                for lock in _LOCK_MASKS:
+                    _xlib.XUngrabKey(self._dpy, keycode, mask | lock,
+                                     self._root)
+            _xlib.XCloseDisplay(self._dpy)
+            self._dpy = None
@@ -0,0 +1,155 @@
+import datetime
+import json
+
+# Keys written for every task, in file order.
+FIELDS = ("text", "done", "star", "indent", "reminder")
+# Keys written only when set.
+OPTIONAL_FIELDS = ("repeat",)
+
+
+def _to_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _parse_reminder(iso_str):
+    if not iso_str:
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(iso_str)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        # compare against naive local time like reminders set in the UI
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+class Task:
+    """A single task with pre-normalized fields.
+
+    ``indent``/``star`` are ints, ``done`` is a bool and ``reminder_dt``
+    holds the parsed ``reminder`` so hot paths never re-parse the JSON
+    values.  ``repeat`` is a recurrence rule (see ``recurrence``) or
+    None; ``reminder`` then holds the next occurrence.  Unknown keys
+    from a hand-edited file are kept in ``extra`` and written back
+    unchanged.
+
+    Mapping-style access (``task["star"]``, ``task.get("text")``) is
+    supported for the JSON boundary and journal replay; it normalizes
+    values the same way ``from_dict`` does.
+    """
+
+    __slots__ = ("text", "done", "star", "indent", "_reminder",
+                 "reminder_dt", "extra", "repeat")
+
+    def __init__(self, text="", done=False, star=0, indent=0, reminder=None,
+                 extra=None, repeat=None):
+        self.text = text
+        self.done = done
+        self.star = star
+        self.indent = indent
+        self.reminder = reminder
+        self.extra = extra
+        self.repeat = repeat
+
+    @property
+    def reminder(self):
+        return self._reminder
+
+    @reminder.setter
+    def reminder(self, iso_str):
+        self._reminder = iso_str or None
+        self.reminder_dt = _parse_reminder(iso_str)
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict):
+            return cls(text=str(data))
+        extra = {k: v for k, v in data.items()
+                 if k not in FIELDS and k not in OPTIONAL_FIELDS}
+        return cls(
+            text=str(data.get("text") or ""),
+            done=bool(data.get("done", False)),
+            star=_to_int(data.get("star")),
+            indent=max(0, _to_int(data.get("indent"))),
+            reminder=data.get("reminder") or None,
+            extra=extra or None,
+            repeat=str(data.get("repeat") or "") or None,
+        )
+
+    def to_dict(self):
+        d = {
+            "text": self.text,
+            "done": self.done,
+            "star": self.star,
+            "indent": self.indent,
+            "reminder": self._reminder,
+        }
+        if self.repeat:
+            d["repeat"] = self.repeat
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def key(self):
+        """Hashable snapshot of the task's content (for diffing)."""
+        extra = (json.dumps(self.extra, sort_keys=True, ensure_ascii=False)
+                 if self.extra else None)
+        return (self.text, self.done, self.star, self.indent, self._reminder,
+                self.repeat, extra)
+
+    def update_from(self, other):
+        """Copy every field of *other* into this task."""
+        self.text = other.text
+        self.done = other.done
+        self.star = other.star
+        self.indent = other.indent
+        self._reminder = other._reminder
+        self.reminder_dt = other.reminder_dt
+        self.repeat = other.repeat
+        self.extra = dict(other.extra) if other.extra else None
+
+    def copy(self):
+        return Task(self.text, self.done, self.star, self.indent,
+                    self._reminder, dict(self.extra) if self.extra else None,
+                    self.repeat)
+
+    # ---- mapping-style access ----
+    def __getitem__(self, key):
+        if key in FIELDS:
+            return getattr(self, key)
+        if key == "repeat" and self.repeat:
+            return self.repeat
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "text":
+            self.text = str(value or "")
+        elif key == "done":
+            self.done = bool(value)
+        elif key == "star":
+            self.star = _to_int(value)
+        elif key == "indent":
+            self.indent = max(0, _to_int(value))
+        elif key == "reminder":
+            self.reminder = value
+        elif key == "repeat":
+            self.repeat = str(value or "") or None
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
@@ -1,16 +1,86 @@
 import datetime
+import hashlib
 import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import msal
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
 from .constants import CONFIG_DIR
+from .model import Task
+from .task_diff import diff_tasks
+from .task_store import TaskSnapshot
 
 AUTHORITY = "https://login.microsoftonline.com/common"
 # MSAL handles reserved OIDC scopes internally; only request resource scopes.
 SCOPES = ["Tasks.ReadWrite"]
+# Replaceable so a local stand-in server (fake_graph.py) can be used.
+GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+BATCH_LIMIT = 20  # sub-requests per $batch, Graph's maximum
+BATCH_RETRIES = 4
+REQUEST_RETRIES = 5
+# Graph allows 4 concurrent requests per app and mailbox for To Do
+MAX_CONCURRENCY = 4
+# exponential backoff between retries when the server sends no Retry-After
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+RETRY_AFTER_MAX = 300
+# statuses worth retrying: failed dependency, throttled, server errors;
+# 0 stands for a network error
+_RETRY_STATUSES = (0, 424, 429, 500, 502, 503, 504)
+# the server did not process the request and asked us to slow down
+_THROTTLE_STATUSES = (429, 503)
+# renew access tokens this many seconds before they expire
+TOKEN_MARGIN = 300
 TOKEN_CACHE_FILE = os.path.join(CONFIG_DIR, "ms_token_cache.json")
+# Graph task id and payload fingerprint of every task at the last
+# successful push, in local task order, the delta link of the last pull
+# and the fingerprints of creates that may or may not have run.
+SYNC_STATE_FILE = os.path.join(CONFIG_DIR, "ms_sync_state.json")
+
+
+class GraphError(RuntimeError):
+    """A Graph request failed with HTTP *status* (0 for a network error).
+
+    *retry_after* is the server's Retry-After in seconds, if it sent one.
+    *sent* is False when the request never reached the server.  A failed
+    push sets ``entries`` to the sync-state entries describing what did
+    reach the remote list, so the next push can resume, and
+    ``unconfirmed`` to the fingerprints of creates that may have run.
+    """
+
+    def __init__(self, message, status, retry_after=None, sent=True):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.sent = sent
+        self.completed = {}  # call index -> response body, for _batch
+        self.unknown = []    # call indices whose $batch reply was lost
+        self.entries = None
+        self.unconfirmed = []
+
+    @property
+    def retryable(self):
+        return self.status in _RETRY_STATUSES
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number *attempt* (from 0).
+
+    The server's Retry-After wins; otherwise the delay doubles with each
+    attempt up to BACKOFF_MAX, with jitter so clients throttled together
+    do not come back together.
+    """
+    if retry_after is not None:
+        return retry_after
+    cap = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return random.uniform(cap / 2, cap)
 
 
 def _ensure_config_dir():
@@ -45,80 +115,329 @@ def _select_account(app, account_id=None, preferred_username=None):
     return accounts[0] if accounts else None
 
 
-def _acquire_token(client_id, account_id=None, interactive=False):
-    if not client_id:
-        raise ValueError("Microsoft Client ID is not configured.")
-    cache = _load_token_cache()
-    app = msal.PublicClientApplication(
-        client_id=client_id,
-        authority=AUTHORITY,
-        token_cache=cache,
-    )
-    account = _select_account(app, account_id=account_id)
-    result = None
-    if not interactive and account:
-        result = app.acquire_token_silent(SCOPES, account=account)
-    if not result and interactive:
-        result = app.acquire_token_interactive(SCOPES, prompt="login")
-        preferred = result.get("id_token_claims", {}).get("preferred_username")
-        account = _select_account(app, preferred_username=preferred) or account
-    if not result:
-        raise RuntimeError("No cached token. Use Test Sync to sign in.")
-    _save_token_cache(cache)
-    if "access_token" not in result:
-        raise RuntimeError(result.get("error_description") or "Token error")
-    new_account_id = account.get("home_account_id") if account else account_id
-    return result["access_token"], new_account_id
-
-
-def _graph_request(method, url, token, json_body=None):
-    headers = {"Authorization": f"Bearer {token}"}
-    if json_body is not None:
-        headers["Content-Type"] = "application/json"
-    response = requests.request(
-        method,
-        url,
-        headers=headers,
-        data=json.dumps(json_body) if json_body is not None else None,
-        timeout=30,
-    )
-    if response.status_code >= 400:
-        raise RuntimeError(
-            f"{method} {url} failed: {response.status_code} {response.text}"
-        )
-    if response.text:
-        return response.json()
+class GraphClient:
+    """Graph HTTP client, kept by a ``SyncSession`` for its lifetime.
+
+    Requests share one keep-alive ``requests.Session``, so pushes and
+    pulls pay for the TLS handshake once; ``set_token`` swaps in a
+    renewed access token.  ``map`` runs independent requests on at
+    most *max_workers* threads.
+
+    Throttled (429/503) requests are retried after Retry-After, and
+    server or network errors of idempotent requests with backoff.  The
+    number of requests in flight adapts: halved on every throttled
+    response, raised by one again after a run of successes.  ``stats``
+    reports the request count, bytes sent, throttled responses, retries
+    and wall time since the last ``reset_stats``.
+    """
+
+    def __init__(self, token, max_workers=MAX_CONCURRENCY):
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.set_token(token)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slot_free = threading.Condition(self._lock)
+        self._limit = max_workers  # requests allowed in flight right now
+        self._in_flight = 0
+        self._streak = 0  # successes since the limit last changed
+        self.reset_stats()
+
+    def set_token(self, token):
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def request(self, method, url, json_body=None):
+        headers = {}
+        data = None
+        if json_body is not None:
+            headers["Content-Type"] = "application/json"
+            data = json.dumps(json_body).encode("utf-8")
+        attempt = 0
+        while True:
+            error = self._send(method, url, headers, data)
+            if not isinstance(error, GraphError):
+                return error
+            # a POST that may have run (server or network error) is not
+            # repeated here; for a $batch, _batch marks its calls unknown
+            if (not error.retryable or attempt >= REQUEST_RETRIES or
+                    (method == "POST" and
+                     error.status not in _THROTTLE_STATUSES)):
+                raise error
+            with self._lock:
+                self._retries += 1
+            time.sleep(backoff_delay(attempt, error.retry_after))
+            attempt += 1
+
+    def _send(self, method, url, headers, data):
+        """One attempt; returns the decoded body or a ``GraphError``."""
+        with self._slot_free:
+            while self._in_flight >= self._limit:
+                self._slot_free.wait()
+            self._in_flight += 1
+            self._requests += 1
+            self._bytes_sent += len(data) if data else 0
+        try:
+            response = self.session.request(method, url, headers=headers,
+                                            data=data, timeout=30)
+        except requests.RequestException as exc:
+            return GraphError(f"{method} {url} failed: {exc}", 0,
+                              sent=not _never_sent(exc))
+        finally:
+            with self._slot_free:
+                self._in_flight -= 1
+                self._slot_free.notify()
+        status = response.status_code
+        if status >= 400:
+            if status in _THROTTLE_STATUSES:
+                self.throttled()
+            return GraphError(f"{method} {url} failed: {status} {response.text}",
+                              status, _retry_after(response.headers))
+        self.succeeded()
+        if response.text:
+            return response.json()
+        return None
+
+    def throttled(self):
+        """The server pushed back: halve the requests allowed in flight."""
+        with self._slot_free:
+            self._throttled += 1
+            self._limit = max(1, self._limit // 2)
+            self._streak = 0
+
+    def succeeded(self):
+        with self._slot_free:
+            self._streak += 1
+            if self._streak >= self._limit * 4 and self._limit < self.max_workers:
+                self._limit += 1
+                self._streak = 0
+                self._slot_free.notify()
+
+    def map(self, fn, items):
+        """``[fn(item) for item in items]``, run concurrently.
+
+        Every call finishes before the first exception, if any, is raised.
+        """
+        items = list(items)
+        if len(items) < 2 or self.max_workers < 2:
+            return [fn(item) for item in items]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="tasker-graph")
+        futures = [self._executor.submit(fn, item) for item in items]
+        wait(futures)
+        return [future.result() for future in futures]
+
+    def reset_stats(self):
+        with self._lock:
+            self._requests = 0
+            self._bytes_sent = 0
+            self._throttled = 0
+            self._retries = 0
+            self._started = time.perf_counter()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "bytes_sent": self._bytes_sent,
+                "throttled": self._throttled,
+                "retries": self._retries,
+                "seconds": time.perf_counter() - self._started,
+            }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.session.close()
+
+
+def _never_sent(exc):
+    """Whether the ``requests`` error *exc* came before any byte was sent:
+    the connection could not be opened (offline, DNS, refused)."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _retry_after(headers):
+    """Retry-After in seconds, or None if absent or not a number."""
+    for key, value in (headers or {}).items():
+        if key.lower() == "retry-after":
+            try:
+                return min(RETRY_AFTER_MAX, max(0, int(value)))
+            except (TypeError, ValueError):
+                break
     return None
 
 
-def _get_list_id(token, list_name):
-    url = "https://graph.microsoft.com/v1.0/me/todo/lists"
-    data = _graph_request("GET", url, token)
+def _sub_request(i, call, depends_on=None):
+    method, path, body = call
+    sub = {"id": str(i), "method": method, "url": path}
+    if body is not None:
+        sub["body"] = body
+        sub["headers"] = {"Content-Type": "application/json"}
+    if depends_on is not None:
+        sub["dependsOn"] = [str(depends_on)]
+    return sub
+
+
+def _batch(client, calls, ordered=False):
+    """Run *calls* — (method, path, body) tuples — through Graph ``$batch``.
+
+    Up to BATCH_LIMIT calls go in one round trip, and unordered batches
+    are sent concurrently; returns the response bodies in call order.
+    With *ordered*, each call depends on the one before it and batches go
+    one at a time, so Graph runs them in sequence and nothing after a
+    failure runs.  Calls that were throttled, hit a server error or lost
+    their dependency are retried (only those), after Retry-After or an
+    exponential backoff, until BATCH_RETRIES rounds in a row make no
+    progress; DELETE of a task that is already gone counts as success.
+    Other failures raise ``GraphError``, whose ``completed`` maps the
+    calls that did succeed to their response bodies.  When a batch itself
+    fails with a server or network error, Graph may still have run any of
+    its calls; those are listed in ``unknown``.
+    """
+    done = {}
+    unknown = []
+    pending = list(range(len(calls)))
+    stalled = 0  # rounds in a row that got nothing through
+    try:
+        while pending:
+            chunks = [pending[k:k + BATCH_LIMIT]
+                      for k in range(0, len(pending), BATCH_LIMIT)]
+
+            def send(chunk):
+                body = {"requests": [
+                    _sub_request(i, calls[i],
+                                 chunk[k - 1] if ordered and k else None)
+                    for k, i in enumerate(chunk)
+                ]}
+                try:
+                    data = client.request("POST", f"{GRAPH_BASE}/$batch",
+                                          json_body=body) or {}
+                except GraphError as exc:
+                    if exc.sent and (exc.status == 0 or exc.status >= 500):
+                        unknown.extend(chunk)
+                    raise
+                return _collect(client, calls, chunk, data, done)
+
+            failed = []
+            rounds = []
+            if ordered:
+                for n, chunk in enumerate(chunks):
+                    rounds.append(send(chunk))
+                    if rounds[-1][0]:
+                        # keep the order: nothing after a failed call may
+                        # go first
+                        failed.extend(i for later in chunks[n + 1:]
+                                      for i in later)
+                        break
+            else:
+                rounds = client.map(send, chunks)
+            retry_after = None
+            backoff = False
+            status = 0
+            for chunk_failed, chunk_retry_after, chunk_backoff, st in rounds:
+                failed.extend(chunk_failed)
+                if chunk_retry_after is not None:
+                    retry_after = max(retry_after or 0, chunk_retry_after)
+                backoff = backoff or chunk_backoff
+                status = st or status
+            failed.sort()
+            stalled = stalled + 1 if len(failed) == len(pending) else 0
+            if stalled > BATCH_RETRIES:
+                raise GraphError(f"$batch: {len(failed)} requests still "
+                                 f"failing after {BATCH_RETRIES} retries",
+                                 status, retry_after)
+            pending = failed
+            if pending and backoff:
+                # back off harder only while nothing gets through
+                time.sleep(backoff_delay(stalled, retry_after))
+    except GraphError as exc:
+        exc.completed = done
+        exc.unknown = sorted(unknown)
+        raise
+    return [done.get(i) for i in range(len(calls))]
+
+
+def _collect(client, calls, chunk, data, done):
+    """Store the sub-responses of one batch in *done*.
+
+    Returns (failed, retry_after, backoff, status): the retryable calls,
+    the largest Retry-After among them, whether any needs a backoff (a
+    424 only waits for its dependency) and the last failure status.
+    """
+    responses = {r.get("id"): r for r in data.get("responses", [])}
+    failed = []
+    retry_after = None
+    backoff = False
+    throttled = False
+    last = 0
+    for i in chunk:
+        response = responses.get(str(i), {})
+        status = response.get("status", 0)
+        method, path, _ = calls[i]
+        if 200 <= status < 300 or (status == 404 and method == "DELETE"):
+            done[i] = response.get("body")
+        elif status in _RETRY_STATUSES:
+            failed.append(i)
+            last = status
+            if status != 424:
+                backoff = True
+                after = _retry_after(response.get("headers"))
+                if after is not None:
+                    retry_after = max(retry_after or 0, after)
+            throttled = throttled or status in _THROTTLE_STATUSES
+        else:
+            raise GraphError(
+                f"{method} {path} failed: {status} "
+                f"{json.dumps(response.get('body'))}",
+                status,
+            )
+    if throttled:
+        client.throttled()
+    return failed, retry_after, backoff, last
+
+
+def _tasks_path(list_id):
+    return f"/me/todo/lists/{list_id}/tasks"
+
+
+def _task_path(list_id, task_id):
+    return f"/me/todo/lists/{list_id}/tasks/{task_id}"
+
+
+def _get_list_id(client, list_name):
+    url = f"{GRAPH_BASE}/me/todo/lists"
+    data = client.request("GET", url)
     for item in data.get("value", []):
         if item.get("displayName") == list_name:
             return item["id"]
-    created = _graph_request(
+    created = client.request(
         "POST",
         url,
-        token,
         json_body={"displayName": list_name},
     )
     return created["id"]
 
 
-def _iter_tasks(token, list_id):
-    url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{list_id}/tasks"
+def _iter_tasks(client, list_id):
+    url = GRAPH_BASE + _tasks_path(list_id)
     while url:
-        data = _graph_request("GET", url, token)
+        data = client.request("GET", url)
         for item in data.get("value", []):
             yield item
         url = data.get("@odata.nextLink")
 
 
-def _clear_list(token, list_id):
-    for item in _iter_tasks(token, list_id):
-        url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{list_id}/tasks/{item['id']}"
-        _graph_request("DELETE", url, token)
+def _clear_list(client, list_id):
+    _batch(client, [("DELETE", _task_path(list_id, item["id"]), None)
+                    for item in _iter_tasks(client, list_id)])
 
 
 def _to_graph_date(iso_str):
@@ -141,41 +460,590 @@ def _to_graph_datetime(iso_str):
     return {"dateTime": dt.strftime("%Y-%m-%dT%H:%M:%S"), "timeZone": "UTC"}
 
 
+def _from_graph_datetime(value):
+    """Inverse of ``_to_graph_datetime``: a naive ISO string."""
+    dt = datetime.datetime.fromisoformat(value["dateTime"][:19])
+    return dt.isoformat()
+
+
 def _now_graph_datetime():
     dt = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
     return {"dateTime": dt.strftime("%Y-%m-%dT%H:%M:%S"), "timeZone": "UTC"}
 
 
 def _task_payload(task):
-    title = str(task.get("text", "")).strip() or "(untitled)"
+    title = task.text.strip() or "(untitled)"
     payload = {
         "title": title,
-        "status": "completed" if task.get("done") else "notStarted",
+        "status": "completed" if task.done else "notStarted",
     }
-    if int(task.get("star", 0) or 0) > 0:
+    if task.star > 0:
         payload["importance"] = "high"
-    reminder = task.get("reminder")
-    if reminder:
+    reminder = task.reminder
+    if task.reminder_dt is not None:
         payload["dueDateTime"] = _to_graph_date(reminder)
         payload["reminderDateTime"] = _to_graph_datetime(reminder)
         payload["isReminderOn"] = True
-    if task.get("done"):
+    if task.done:
         payload["completedDateTime"] = _now_graph_datetime()
     return payload
 
 
-def _create_task(token, list_id, payload):
-    url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{list_id}/tasks"
-    return _graph_request("POST", url, token, json_body=payload)
+def _fingerprint(payload):
+    """Hash of what a push would send for a task.
 
+    ``completedDateTime`` is left out: it is stamped at push time, so it
+    would make every completed task look changed.
+    """
+    stable = {k: v for k, v in payload.items() if k != "completedDateTime"}
+    data = json.dumps(stable, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _patch_payload(payload, was_done):
+    """PATCH body for *payload*: fields it omits are cleared explicitly."""
+    body = dict(payload)
+    body.setdefault("importance", "normal")
+    if "reminderDateTime" not in body:
+        body.update(dueDateTime=None, reminderDateTime=None,
+                    isReminderOn=False)
+    if was_done:
+        # keep the original completion time
+        body.pop("completedDateTime", None)
+    return body
+
+
+def _load_sync_state():
+    try:
+        with open(SYNC_STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or not isinstance(state.get("entries"),
+                                                     list):
+        return None
+    return state
+
+
+def _save_sync_state(state):
+    _ensure_config_dir()
+    tmp = SYNC_STATE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, SYNC_STATE_FILE)
+
+
+def _sync_state(list_id, entries, delta_link, unconfirmed=()):
+    state = {"list_id": list_id, "entries": entries, "delta_link": delta_link}
+    if unconfirmed:
+        state["unconfirmed"] = list(unconfirmed)
+    return state
+
+
+def _drop_sync_state():
+    try:
+        os.remove(SYNC_STATE_FILE)
+    except OSError:
+        pass
+
+
+def _entry(task_id, payload):
+    return {"id": task_id, "fp": _fingerprint(payload),
+            "done": payload["status"] == "completed"}
+
+
+def _create_tasks(client, list_id, payloads):
+    """Create tasks in order; returns their Graph ids."""
+    created = _batch(client, [("POST", _tasks_path(list_id), p)
+                              for p in payloads], ordered=True)
+    return [item["id"] for item in created]
+
+
+def _adopt_unconfirmed(client, list_id, entries, unconfirmed):
+    """*entries* plus the remote tasks an earlier push created unawares.
+
+    *unconfirmed* holds the fingerprints of creates whose ``$batch``
+    reply was lost.  Remote tasks that no entry knows are matched to them
+    by content; the diff then pairs each with its local task, or deletes
+    it if that task is gone.  Creates that did not run match nothing.
+    """
+    wanted = {}
+    for fp in unconfirmed:
+        wanted[fp] = wanted.get(fp, 0) + 1
+    known = {e["id"] for e in entries}
+    adopted = []
+    for item in _iter_tasks(client, list_id):
+        if item["id"] in known:
+            continue
+        payload = _task_payload(_merge_remote(Task(), item))
+        fp = _fingerprint(payload)
+        if wanted.get(fp):
+            wanted[fp] -= 1
+            adopted.append(_entry(item["id"], payload))
+    return entries + adopted
+
+
+def _full_push(client, list_id, payloads):
+    """Clear the list and create every task; returns the new entries."""
+    _clear_list(client, list_id)
+    try:
+        ids = _create_tasks(client, list_id, payloads)
+    except GraphError as exc:
+        exc.entries = [_entry(exc.completed[k]["id"], payloads[k])
+                       for k in sorted(exc.completed)]
+        exc.unconfirmed = [_fingerprint(payloads[k]) for k in exc.unknown]
+        raise
+    return [_entry(task_id, p) for task_id, p in zip(ids, payloads)]
+
+
+def _incremental_push(client, list_id, payloads, entries, unconfirmed=()):
+    """Send only the changes since *entries*; returns the new entries.
+
+    Creates listed in *unconfirmed* are first looked up in the remote
+    list, so they are not made twice.  Raises ``GraphError`` with status
+    404 if a task we know about is gone from the remote list.  Other
+    failures carry the entries for the calls that went through, so the
+    next push only sends the rest.
+    """
+    if unconfirmed:
+        try:
+            entries = _adopt_unconfirmed(client, list_id, entries,
+                                         unconfirmed)
+        except GraphError as exc:
+            exc.entries = entries
+            exc.unconfirmed = list(unconfirmed)
+            raise
+    fps = [_fingerprint(p) for p in payloads]
+    diff = diff_tasks([e["fp"] for e in entries], fps, key=lambda fp: fp)
+    calls = [("DELETE", _task_path(list_id, entries[i]["id"]), None)
+             for i in diff.removed]
+    for j in diff.modified:
+        old = entries[diff.sources[j]]
+        calls.append(("PATCH", _task_path(list_id, old["id"]),
+                      _patch_payload(payloads[j], old["done"])))
+    try:
+        _batch(client, calls)
+    except GraphError as exc:
+        deleted = {i for k, i in enumerate(diff.removed) if k in exc.completed}
+        patched = {j for k, j in enumerate(diff.modified, len(diff.removed))
+                   if k in exc.completed}
+        exc.entries = _pushed_entries(entries, payloads, diff, deleted,
+                                      patched, {})
+        raise
+    deleted = set(diff.removed)
+    patched = set(diff.modified)
+    inserted = diff.inserted
+    try:
+        ids = _create_tasks(client, list_id, [payloads[j] for j in inserted])
+    except GraphError as exc:
+        created = {inserted[k]: body["id"] for k, body in exc.completed.items()}
+        exc.entries = _pushed_entries(entries, payloads, diff, deleted,
+                                      patched, created)
+        # the next push looks for these before creating them again
+        exc.unconfirmed = [fps[inserted[k]] for k in exc.unknown]
+        raise
+    return _pushed_entries(entries, payloads, diff, deleted, patched,
+                           dict(zip(inserted, ids)))
+
+
+def _pushed_entries(entries, payloads, diff, deleted, patched, created):
+    """Sync-state entries for the remote list after an incremental push.
+
+    *deleted* (old indices), *patched* (new indices) and *created* (new
+    index -> Graph id) are the calls that went through.  Tasks that were
+    not created are left out and removed tasks that were not deleted are
+    kept at the end, so the next push sends those calls again.
+    """
+    new_entries = []
+    for j, src in enumerate(diff.sources):
+        if src is None:
+            if j in created:
+                new_entries.append(_entry(created[j], payloads[j]))
+        elif j in patched:
+            new_entries.append(_entry(entries[src]["id"], payloads[j]))
+        else:
+            new_entries.append(entries[src])
+    new_entries.extend(entries[i] for i in diff.removed if i not in deleted)
+    return new_entries
+
+
+def _map_tasks(tasks, fn):
+    """``fn(task)`` for each of *tasks*.
+
+    The UI may be editing the tasks meanwhile; reading through a
+    ``TaskSnapshot`` gives each call the task as it was when the
+    snapshot was taken.
+    """
+    if isinstance(tasks, TaskSnapshot):
+        return tasks.map(fn)
+    return [fn(task) for task in tasks]
+
+
+def _read_task(tasks, j, fn):
+    if isinstance(tasks, TaskSnapshot):
+        return tasks.read(j, fn)
+    return fn(tasks[j])
+
+
+class PullResult:
+    """Edits made in To Do, as found by ``SyncSession.pull``.
+
+    ``updated`` holds (task, key, merged) for tasks of the pulled list:
+    *key* is ``task.key()`` when it was read and *merged* a copy with the
+    remote title, completion, importance and reminder.  ``added`` holds
+    tasks created in To Do and ``removed`` counts known tasks deleted
+    there; those are pushed again, as Tasker's list wins.  ``reverted``
+    counts remote edits that a check without merging found; the next
+    push undoes them.
+    """
+
+    def __init__(self, updated=(), added=(), removed=0, reverted=0):
+        self.updated = list(updated)
+        self.added = list(added)
+        self.removed = removed
+        self.reverted = reverted
+
+    def apply(self, tasks):
+        """*tasks* with the pulled edits and additions (a snapshot stays one)."""
+        merged = {id(task): new for task, _key, new in self.updated}
+        if isinstance(tasks, TaskSnapshot):
+            return tasks.patched(merged, self.added)
+        return [merged.get(id(t), t) for t in tasks] + self.added
+
+    def __bool__(self):
+        return bool(self.updated or self.added)
+
+
+def _delta_url(list_id):
+    return GRAPH_BASE + _tasks_path(list_id) + "/delta"
+
+
+def _read_delta(client, url):
+    """Follow a delta query to its end.
+
+    Returns (changed, removed, delta_link): the changed tasks by id, the
+    ids of deleted tasks and the link that continues from here.
+    """
+    changed = {}
+    removed = set()
+    while True:
+        data = client.request("GET", url) or {}
+        for item in data.get("value", []):
+            if "@removed" in item:
+                changed.pop(item["id"], None)
+                removed.add(item["id"])
+            else:
+                removed.discard(item["id"])
+                changed[item["id"]] = item
+        url = data.get("@odata.nextLink")
+        if not url:
+            return changed, removed, data.get("@odata.deltaLink")
+
+
+def _merge_remote(task, item):
+    """Copy of *task* with the fields To Do manages taken from *item*.
+
+    Only fields that differ from what a push of *task* would send are
+    taken, so a task that merely comes back from our own push (or loses
+    surrounding whitespace on the way) is left alone.
+    """
+    local = _task_payload(task)
+    merged = task.copy()
+    title = item.get("title")
+    if title is not None and title != local["title"]:
+        merged.text = title
+    done = item.get("status") == "completed"
+    if done != task.done:
+        merged.done = done
+    high = item.get("importance") == "high"
+    if high != (task.star > 0):
+        merged.star = 1 if high else 0
+    remote = item.get("reminderDateTime") if item.get("isReminderOn") else None
+    remote_dt = remote["dateTime"][:19] if remote else None
+    local_dt = local.get("reminderDateTime", {}).get("dateTime")
+    if remote_dt != local_dt:
+        merged.reminder = _from_graph_datetime(remote) if remote else None
+    return merged
+
+
+def _pull(client, list_id, tasks, entries, delta_link, unconfirmed=(),
+          merge=True):
+    """Read the remote changes since *delta_link* and match them to *tasks*.
+
+    Returns (result, entries, delta_link) with the entries updated to
+    what the remote list now holds.  A task edited on both sides since
+    the last push keeps the local version; the next push sends it.  New
+    remote tasks matching an *unconfirmed* create are left for the next
+    push to adopt.
+
+    Without *merge* nothing is taken into *tasks*: the entries of tasks
+    edited or created in To Do are marked so that the next push puts
+    Tasker's version back and deletes the new ones.
+    """
+    try:
+        changed, removed, link = _read_delta(client,
+                                             delta_link or _delta_url(list_id))
+    except GraphError as exc:
+        if exc.status != 410 or not delta_link:
+            raise
+        # the delta link expired: enumerate the list once more
+        changed, removed, link = _read_delta(client, _delta_url(list_id))
+
+    unchanged = {}
+    if merge:
+        fps = _map_tasks(tasks, lambda t: _fingerprint(_task_payload(t)))
+        diff = diff_tasks([e["fp"] for e in entries], fps, key=lambda fp: fp)
+        edited = set(diff.modified)
+        # entry index -> index of the same, locally unchanged, task
+        unchanged = {i: j for j, i in enumerate(diff.sources)
+                     if i is not None and j not in edited}
+    known = {e["id"]: i for i, e in enumerate(entries)}
+    entries = list(entries)
+    updated = []
+    added = []
+    reverted = 0
+    for task_id, item in changed.items():
+        i = known.get(task_id)
+        if i is None:
+            task = _merge_remote(Task(), item)
+            payload = _task_payload(task)
+            if _fingerprint(payload) in unconfirmed:
+                continue
+            if merge:
+                added.append(task)
+            else:
+                reverted += 1  # no local task: the next push deletes it
+            entries.append(_entry(task_id, payload))
+            continue
+        if not merge:
+            remote = _entry(task_id, _task_payload(_merge_remote(Task(), item)))
+            if remote["fp"] != entries[i]["fp"]:
+                # matches no local task, so the next push patches it back
+                entries[i] = dict(remote, fp=None)
+                reverted += 1
+            continue
+        j = unchanged.get(i)
+        if j is None:
+            continue  # edited or deleted here too; ours wins
+        key, merged = _read_task(
+            tasks, j, lambda t: (t.key(), _merge_remote(t, item)))
+        if merged.key() != key:
+            updated.append((tasks[j], key, merged))
+            entries[i] = _entry(task_id, _task_payload(merged))
+    gone = {known[task_id] for task_id in removed if task_id in known}
+    if gone:
+        entries = [e for i, e in enumerate(entries) if i not in gone]
+    return PullResult(updated, added, len(gone), reverted), entries, link
+
+
+class SyncSession:
+    """Pushes to (and pulls from) one To Do list, keeping what can be
+    reused between them.
+
+    The MSAL application (with its token cache), the access token until
+    TOKEN_MARGIN seconds before it expires, and the Graph id of the list
+    stay in memory, so a push after an edit goes straight to the changed
+    tasks.  A 401 drops the token and a 404 the list id, and the push is
+    retried once.  One ``GraphClient``, and so one pool of keep-alive
+    connections, serves every push and pull until ``close``.  Use a new
+    session when the client id or list changes.
+    """
+
+    def __init__(self, client_id, list_name, account_id=None):
+        if not client_id:
+            raise ValueError("Microsoft Client ID is not configured.")
+        self.client_id = client_id
+        self.list_name = list_name
+        self.account_id = account_id or None
+        self.list_id = None
+        self._app = None
+        self._cache = None
+        self._token = None
+        self._token_expires = 0.0
+        self._client = None
+        self._lock = threading.Lock()
+
+    def matches(self, client_id, list_name):
+        return self.client_id == client_id and self.list_name == list_name
+
+    def invalidate(self):
+        """Forget the token and list id; the next push looks them up again."""
+        self._token = None
+        self.list_id = None
+
+    def close(self):
+        """Close the HTTP connections; a later push opens new ones."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def acquire_token(self, interactive=False):
+        if (not interactive and self._token is not None and
+                time.monotonic() < self._token_expires):
+            return self._token
+        if self._app is None:
+            self._cache = _load_token_cache()
+            self._app = msal.PublicClientApplication(
+                client_id=self.client_id,
+                authority=AUTHORITY,
+                token_cache=self._cache,
+            )
+        app = self._app
+        account = _select_account(app, account_id=self.account_id)
+        result = None
+        if not interactive and account:
+            try:
+                result = app.acquire_token_silent(SCOPES, account=account)
+            except requests.RequestException as exc:
+                # refreshing the token needs the network; retry like a push
+                raise GraphError(f"Token refresh failed: {exc}", 0) from exc
+        if not result and interactive:
+            result = app.acquire_token_interactive(SCOPES, prompt="login")
+            preferred = result.get("id_token_claims", {}).get("preferred_username")
+            account = _select_account(app, preferred_username=preferred) or account
+        if not result:
+            raise RuntimeError("No cached token. Use Test Sync to sign in.")
+        _save_token_cache(self._cache)
+        if "access_token" not in result:
+            raise RuntimeError(result.get("error_description") or "Token error")
+        if account:
+            self.account_id = account.get("home_account_id")
+        self._token = result["access_token"]
+        self._token_expires = (time.monotonic() +
+                               int(result.get("expires_in") or 0) - TOKEN_MARGIN)
+        return self._token
+
+    def push(self, tasks, interactive=False, info=None):
+        """Make the list match *tasks*; returns the signed-in account id.
+
+        *tasks* is best a ``TaskSnapshot``, which the UI can keep editing
+        while the push runs.
+
+        Only tasks that changed since the last push are sent.  A push
+        that fails half-way records the calls that went through, so the
+        next one resumes from there.  The whole list is cleared and
+        re-created when there is no usable sync state: first push,
+        another list, an interrupted push that could not record its
+        progress, or a known task that was deleted in To Do.
+
+        If *info* is a dict it receives ``mode`` ("incremental" or "full")
+        and the request count, bytes sent and wall time.
+        """
+        self._retrying(lambda: self._push(tasks, interactive, info),
+                       interactive)
+        return self.account_id
+
+    def pull(self, tasks, info=None, merge=True):
+        """Edits made in To Do since the last pull, matched to *tasks*.
+
+        Returns a ``PullResult``; the caller merges it and pushes the
+        merged list.  Uses a Graph delta query, so a pull costs one
+        request plus one per page of changes, however long the list is.
+        Nothing is pulled before the first push, which establishes which
+        remote task belongs to which local one.
+
+        With *merge* false this only checks for drift: tasks edited,
+        created or deleted in To Do are reported and the next push
+        restores Tasker's list, as push-only sync cannot keep them.
+        """
+        return self._retrying(lambda: self._pull(tasks, info, merge), False)
+
+    def _retrying(self, run, interactive):
+        with self._lock:
+            # each cached value gets one retry after it turns out stale
+            cached_token = self._token is not None and not interactive
+            cached_list = self.list_id is not None
+            while True:
+                try:
+                    return run()
+                except GraphError as exc:
+                    if exc.status == 401 and cached_token:
+                        cached_token = False
+                        self._token = None
+                    elif exc.status == 404 and cached_list:
+                        cached_list = False
+                        self.list_id = None
+                    else:
+                        raise
+
+    def _connect(self, interactive=False):
+        token = self.acquire_token(interactive)
+        if self._client is None:
+            self._client = GraphClient(token)
+        else:
+            self._client.set_token(token)
+            self._client.reset_stats()
+        if self.list_id is None:
+            self.list_id = _get_list_id(self._client, self.list_name)
+        return self._client
+
+    def _pull(self, tasks, info, merge):
+        client = self._connect()
+        try:
+            state = _load_sync_state()
+            if state is None or state.get("list_id") != self.list_id:
+                return PullResult()
+            unconfirmed = state.get("unconfirmed", [])
+            result, entries, link = _pull(client, self.list_id, tasks,
+                                          state["entries"],
+                                          state.get("delta_link"),
+                                          unconfirmed, merge)
+            _save_sync_state(_sync_state(self.list_id, entries, link,
+                                         unconfirmed))
+            return result
+        finally:
+            _finish(client, info)
+
+    def _push(self, tasks, interactive, info):
+        client = self._connect(interactive)
+        mode = "incremental"
+        list_id = self.list_id
+        link = None
+        try:
+            payloads = _map_tasks(tasks, _task_payload)
+
+            state = _load_sync_state()
+            # until this push completes the remote list is in an unknown state
+            _drop_sync_state()
+            entries = None
+            if state is not None and state.get("list_id") == list_id:
+                link = state.get("delta_link")
+                try:
+                    entries = _incremental_push(
+                        client, list_id, payloads, state["entries"],
+                        state.get("unconfirmed", []))
+                except GraphError as exc:
+                    if exc.status != 404:
+                        raise
+            if entries is None:
+                mode = "full"
+                link = None  # the re-created tasks would all show as changes
+                entries = _full_push(client, list_id, payloads)
+            _save_sync_state(_sync_state(list_id, entries, link))
+        except GraphError as exc:
+            if exc.entries is not None:
+                # record what did get through; the next push resumes there
+                _save_sync_state(_sync_state(list_id, exc.entries, link,
+                                             exc.unconfirmed))
+            raise
+        finally:
+            if info is not None:
+                info["mode"] = mode
+            _finish(client, info)
+
+
+def _finish(client, info):
+    """Add *client*'s stats for this push or pull to *info*, if a dict."""
+    if info is not None:
+        for key, value in client.stats().items():
+            info[key] = info.get(key, 0) + value
 
-def push_tasks(tasks, list_name, client_id, account_id=None, interactive=False):
-    token, new_account_id = _acquire_token(
-        client_id, account_id=account_id, interactive=interactive
-    )
-    list_id = _get_list_id(token, list_name)
-    _clear_list(token, list_id)
 
-    for task in tasks:
-        _create_task(token, list_id, _task_payload(task))
-    return new_account_id
+def push_tasks(tasks, list_name, client_id, account_id=None, interactive=False,
+               info=None):
+    """One-off ``SyncSession.push``; returns the signed-in account id."""
+    session = SyncSession(client_id, list_name, account_id=account_id)
+    try:
+        return session.push(tasks, interactive=interactive, info=info)
+    finally:
+        session.close()
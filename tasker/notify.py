@@ -0,0 +1,71 @@
+"""Desktop notifications over D-Bus (freedesktop.org), when available.
+
+Needs the optional ``dbus`` package (dbus-python) and a running
+notification daemon; without them Tasker only shows its own reminder
+panel.  Calls are made on a background thread, so a slow or missing
+daemon never stalls the Tk loop.  Tasker keeps a single notification and
+replaces it as more reminders come due.
+"""
+import queue
+import sys
+import threading
+
+try:
+    import dbus
+    HAS_DBUS = True
+except ImportError:
+    HAS_DBUS = False
+
+_SERVICE = "org.freedesktop.Notifications"
+_PATH = "/org/freedesktop/Notifications"
+
+
+class DesktopNotifier:
+    """Show, update and close Tasker's desktop notification."""
+
+    def __init__(self, app_name="Tasker"):
+        self.app_name = app_name
+        self.available = HAS_DBUS
+        self._calls = queue.SimpleQueue()
+        self._thread = None
+        self._id = 0  # notification to replace; 0 = none shown
+
+    def show(self, summary, body=""):
+        """Show the notification, replacing the one on screen."""
+        self._post(("show", summary, body))
+
+    def close(self):
+        self._post(("close",))
+
+    def _post(self, call):
+        if not self.available:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run,
+                                            name="tasker-notify", daemon=True)
+            self._thread.start()
+        self._calls.put(call)
+
+    def _run(self):
+        try:
+            bus = dbus.SessionBus()
+            iface = dbus.Interface(bus.get_object(_SERVICE, _PATH), _SERVICE)
+        except dbus.DBusException as e:
+            print(f"[Tasker] Desktop notifications unavailable: {e}",
+                  file=sys.stderr)
+            self.available = False
+            return
+        while True:
+            call = self._calls.get()
+            try:
+                if call[0] == "show":
+                    self._id = int(iface.Notify(
+                        self.app_name, dbus.UInt32(self._id), "",
+                        call[1], call[2], dbus.Array([], signature="s"),
+                        {"category": "reminder"}, -1))
+                elif self._id:
+                    iface.CloseNotification(dbus.UInt32(self._id))
+                    self._id = 0
+            except dbus.DBusException as e:
+                print(f"[Tasker] Desktop notification failed: {e}",
+                      file=sys.stderr)
@@ -0,0 +1,157 @@
+"""Repeating reminders.
+
+A task's ``repeat`` field holds a readable rule:
+
+    daily 09:00            every day
+    weekdays 09:00         Monday to Friday
+    weekly mon,thu 18:30   on the given days
+    monthly 15 09:00       on the 15th (the last day in shorter months)
+    every 4 hours          counted from the previous reminder
+
+The time may be left out, in which case the previous reminder's time of
+day is kept.  Occurrences are never expanded: the task's ``reminder``
+holds the next one, and when it goes off ``next_reminder`` computes the
+one after it in constant time, however long Tasker was not running.
+"""
+import calendar
+import datetime
+import functools
+import re
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# picker menu: label -> rule kind
+KINDS = {"Never": None, "Daily": "daily", "Weekdays": "weekdays",
+         "Weekly": "weekly", "Monthly": "monthly", "Hourly": "hours"}
+
+_TIME = r"(?:\s+(\d{1,2}):(\d{2}))?"
+_DAILY = re.compile(r"(daily|weekdays)" + _TIME + "$")
+_WEEKLY = re.compile(r"weekly\s+([a-z]+(?:\s*,\s*[a-z]+)*)" + _TIME + "$")
+_MONTHLY = re.compile(r"monthly\s+(\d{1,2})" + _TIME + "$")
+_HOURS = re.compile(r"every\s+(?:(\d+)\s+)?hours?$")
+
+
+class Rule:
+    """A parsed ``repeat`` rule; ``str()`` gives it back in file form."""
+
+    __slots__ = ("kind", "days", "day", "hours", "time")
+
+    def __init__(self, kind, days=(), day=1, hours=1, time=None):
+        self.kind = kind
+        self.days = frozenset(days)  # weekday numbers, for "weekly"
+        self.day = day               # day of month, for "monthly"
+        self.hours = hours           # interval, for "hours"
+        self.time = time             # datetime.time, or None
+
+    def next_after(self, last, now):
+        """First occurrence after *now*; *last* is the one that went off."""
+        if self.kind == "hours":
+            step = datetime.timedelta(hours=self.hours)
+            base = last or now
+            return base + (((now - base) // step) + 1) * step
+        time = self.time or (last or now).time().replace(second=0,
+                                                         microsecond=0)
+        if self.kind == "monthly":
+            year, month = now.year, now.month
+            while True:
+                day = min(self.day, calendar.monthrange(year, month)[1])
+                due = datetime.datetime.combine(
+                    datetime.date(year, month, day), time)
+                if due > now:
+                    return due
+                if month == 12:
+                    year, month = year + 1, 1
+                else:
+                    month += 1
+        if self.kind == "weekdays":
+            days = range(5)
+        elif self.kind == "weekly":
+            days = self.days
+        else:
+            days = range(7)
+        date = now.date()
+        while True:  # at most eight steps
+            due = datetime.datetime.combine(date, time)
+            if due > now and date.weekday() in days:
+                return due
+            date += datetime.timedelta(days=1)
+
+    def __str__(self):
+        at = f" {self.time:%H:%M}" if self.time is not None else ""
+        if self.kind == "weekly":
+            days = ",".join(WEEKDAYS[d] for d in sorted(self.days))
+            return f"weekly {days}{at}"
+        if self.kind == "monthly":
+            return f"monthly {self.day}{at}"
+        if self.kind == "hours":
+            return "every hour" if self.hours == 1 \
+                else f"every {self.hours} hours"
+        return self.kind + at
+
+
+def _time(hour, minute):
+    if hour is None:
+        return None
+    return datetime.time(int(hour), int(minute))
+
+
+@functools.lru_cache(maxsize=256)
+def parse_rule(text):
+    """The Rule for a ``repeat`` string, or None if it is not one."""
+    if not isinstance(text, str):
+        return None
+    text = " ".join(text.lower().split())
+    try:
+        m = _DAILY.match(text)
+        if m:
+            return Rule(m.group(1), time=_time(m.group(2), m.group(3)))
+        m = _WEEKLY.match(text)
+        if m:
+            days = {WEEKDAYS.index(d.strip()[:3])
+                    for d in m.group(1).split(",")}
+            return Rule("weekly", days=days,
+                        time=_time(m.group(2), m.group(3)))
+        m = _MONTHLY.match(text)
+        if m and 1 <= int(m.group(1)) <= 31:
+            return Rule("monthly", day=int(m.group(1)),
+                        time=_time(m.group(2), m.group(3)))
+        m = _HOURS.match(text)
+        if m and int(m.group(1) or 1) > 0:
+            return Rule("hours", hours=int(m.group(1) or 1))
+    except ValueError:  # unknown day name, hour 25, ...
+        pass
+    return None
+
+
+def next_reminder(task, now):
+    """The reminder to set after *task*'s went off at *now*, or None."""
+    rule = parse_rule(task.repeat)
+    if rule is None:
+        return None
+    return rule.next_after(task.reminder_dt, now).isoformat()
+
+
+def make_rule(kind, dt, current=None):
+    """``repeat`` string for a picker choice, first due at *dt*.
+
+    Keeps the interval of *current* if it is the same kind, and its
+    weekdays if *dt* falls on one of them; moving a weekly reminder to
+    another day repeats it on that day only.
+    """
+    if kind is None:
+        return None
+    rule = parse_rule(current)
+    days, hours = {dt.weekday()}, 1
+    if rule is not None and rule.kind == kind:
+        hours = rule.hours
+        if dt.weekday() in rule.days:
+            days = rule.days
+    time = None if kind == "hours" else dt.time()
+    return str(Rule(kind, days=days, day=dt.day, hours=hours, time=time))
+
+
+def kind_label(repeat):
+    """Picker menu label for a ``repeat`` string."""
+    rule = parse_rule(repeat)
+    kind = rule.kind if rule is not None else None
+    return next(label for label, k in KINDS.items() if k == kind)
@@ -0,0 +1,133 @@
+"""Reminder scheduling without scanning the task list.
+
+Pending reminders sit in a min-heap ordered by due time, and one Tk
+``after`` timer is armed for the earliest; everything due by the time it
+fires goes off together.  Changing, clearing or completing a reminder
+pushes a new entry rather than searching the heap: an entry only counts
+while it is still its task's current one, and stale entries are dropped
+when they reach the top (or all at once if they pile up).
+
+The timer sleeps until the earliest reminder, however far off.  Tk
+counts that time on its own clock, so a wall clock that moved meanwhile
+(suspend, DST, manual adjustment) is caught with one comparison instead
+of a polling loop: a timer that fires early finds nothing due and is
+armed again for the rest, and ``check`` fires reminders whose time has
+passed while the timer is still waiting.
+"""
+import datetime
+import heapq
+import itertools
+import math
+
+
+class ReminderScheduler:
+    """Call *on_due(tasks)* on the Tk thread when reminders come due.
+
+    Every change that affects a reminder must be reported:
+    ``update(task)`` after setting or clearing one or toggling ``done``,
+    ``remove(task)`` for a deleted task and ``reset(tasks)`` after the list
+    was replaced.  Tasks handed to *on_due* are no longer scheduled; the
+    callback is expected to clear their reminder, or move a repeating one
+    on and ``update`` it.
+    """
+
+    def __init__(self, root, on_due):
+        self.root = root
+        self.on_due = on_due
+        self._heap = []      # (due, seq, task)
+        self._current = {}   # id(task) -> the task's live heap entry
+        self._seq = itertools.count()
+        self._timer = None
+        self._timer_due = None
+
+    def __len__(self):
+        return len(self._current)
+
+    def reset(self, tasks):
+        """Schedule the reminders of *tasks*, forgetting all others."""
+        self._current = {}
+        for task in tasks:
+            entry = self._entry(task)
+            if entry is not None:
+                self._current[id(task)] = entry
+        self._heap = list(self._current.values())
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def update(self, task):
+        """Reschedule *task* after its reminder or ``done`` changed."""
+        entry = self._entry(task)
+        old = self._current.pop(id(task), None)
+        if entry is not None:
+            if old is not None and old[0] == entry[0]:
+                entry = old  # unchanged; keep its heap slot
+            else:
+                heapq.heappush(self._heap, entry)
+            self._current[id(task)] = entry
+        self._arm()
+
+    def remove(self, task):
+        """Forget *task* (deleted)."""
+        if self._current.pop(id(task), None) is not None:
+            self._arm()
+
+    def check(self):
+        """Fire reminders now if the clock has passed the armed one."""
+        if (self._timer_due is not None and
+                self._timer_due <= datetime.datetime.now()):
+            self._cancel()
+            self._fire()
+
+    def stop(self):
+        self._cancel()
+
+    # ---- internals ----
+    def _entry(self, task):
+        due = task.reminder_dt
+        if due is None or task.done:
+            return None
+        return (due, next(self._seq), task)
+
+    def _live(self, entry):
+        return self._current.get(id(entry[2])) is entry
+
+    def _arm(self):
+        """Point the timer at the earliest live reminder."""
+        if len(self._heap) > 2 * len(self._current) + 64:
+            self._heap = list(self._current.values())
+            heapq.heapify(self._heap)
+        while self._heap and not self._live(self._heap[0]):
+            heapq.heappop(self._heap)
+        due = self._heap[0][0] if self._heap else None
+        if self._timer is not None and due == self._timer_due:
+            return
+        self._cancel()
+        if due is None:
+            return
+        delay = (due - datetime.datetime.now()).total_seconds()
+        ms = max(0, math.ceil(delay * 1000))
+        self._timer = self.root.after(ms, self._fire)
+        self._timer_due = due
+
+    def _cancel(self):
+        if self._timer is not None:
+            try:
+                self.root.after_cancel(self._timer)
+            except Exception:
+                pass
+        self._timer = None
+        self._timer_due = None
+
+    def _fire(self):
+        self._timer = None
+        self._timer_due = None
+        now = datetime.datetime.now()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if self._live(entry):
+                del self._current[id(entry[2])]
+                due.append(entry[2])
+        self._arm()
+        if due:
+            self.on_due(due)
@@ -1,7 +1,16 @@
 import json
 import os
+import sys
+import threading
+import time
 
-from .constants import CONFIG_DIR, CONFIG_FILE, DEFAULT_DATA_FILE
+from .constants import (
+    CONFIG_DIR, CONFIG_FILE, DEFAULT_DATA_FILE, JOURNAL_MAX_BYTES,
+    JOURNAL_MAX_AGE_S,
+)
+from .cache import content_digest, load_cached_tasks, save_cached_tasks
+from .model import Task
+from .task_store import TaskSnapshot
 
 
 def load_config():
@@ -22,23 +31,392 @@ def save_config(cfg):
         json.dump(cfg, f, indent=2)
 
 
-def load_tasks(path):
-    """Load tasks from a flat JSON list – easy to hand-edit."""
-    if os.path.isfile(path):
+def read_tasks_file(path):
+    """Return the raw bytes and stat of the tasks file, or (None, None)."""
+    if not os.path.isfile(path):
+        return None, None
+    try:
+        with open(path, "rb") as f:
+            return f.read(), os.fstat(f.fileno())
+    except (PermissionError, OSError):
+        return None, None
+
+
+def load_tasks(path, info=None):
+    """Load tasks from a flat JSON list – easy to hand-edit.
+
+    Returns a list of ``Task`` records.  An unchanged file is read from the
+    binary startup cache instead of being parsed (see ``cache.py``).  Edits
+    recorded in the journal beside the file (see ``TaskJournal``) are
+    replayed on top.  If *info* is a dict, ``info["source"]`` is set to
+    ``"cache"``, ``"json"`` or ``"invalid"`` (unreadable JSON) and
+    ``info["digest"]`` to the content hash of the file.
+    """
+    raw, st = read_tasks_file(path)
+    if raw is None:
+        return []
+    return parse_tasks(path, raw, st, info)
+
+
+def parse_tasks(path, raw, st, info=None):
+    """``load_tasks`` for file contents the caller has already read."""
+    if info is not None:
+        info["digest"] = content_digest(raw)
+    tasks = load_cached_tasks(path, raw, st)
+    if info is not None:
+        info["source"] = "json" if tasks is None else "cache"
+    if tasks is None:
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (PermissionError, json.JSONDecodeError, OSError):
+            data = json.loads(raw.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            data = None
+        if not isinstance(data, list):
+            if info is not None:
+                info["source"] = "invalid"
             return []
-    return []
+        tasks = [Task.from_dict(d) for d in data]
+        save_cached_tasks(path, raw, st, tasks)
+    _replay_journal(path, tasks)
+    return tasks
 
 
-def save_tasks(path, tasks):
+def refresh_cache(path, tasks):
+    """Re-cache *tasks* if they are exactly what the tasks file holds."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+            st = os.fstat(f.fileno())
+    except OSError:
+        return
+    if raw == _file_bytes(_dump_tasks(tasks)):
+        save_cached_tasks(path, raw, st, tasks)
+
+
+def _dump_tasks(tasks):
+    if isinstance(tasks, TaskSnapshot):
+        dicts = tasks.map(Task.to_dict)
+    else:
+        dicts = [t.to_dict() for t in tasks]
+    return json.dumps(dicts, indent=2, ensure_ascii=False)
+
+
+def _file_bytes(text):
+    """The bytes ``_write_text`` puts on disk for *text*."""
+    return text.replace("\n", os.linesep).encode("utf-8", "surrogatepass")
+
+
+def _write_text(path, text):
     parent = os.path.dirname(path)
     if parent:
         os.makedirs(parent, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def save_tasks(path, tasks):
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(tasks, f, indent=2, ensure_ascii=False)
+        _write_text(path, _dump_tasks(tasks))
     except (PermissionError, OSError):
         pass  # silently fail if file is locked (e.g. OneDrive sync)
+
+
+class TaskSaver:
+    """Write-behind saver for the tasks file.
+
+    ``mark_dirty`` is cheap enough to call on every keystroke: a
+    background thread waits *interval* seconds after the first change,
+    then writes the latest state once.  Writes whose serialized content
+    matches the last write are skipped.  Pass a ``TaskSnapshot`` so the
+    thread sees a consistent list while the UI keeps editing.
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.mtime = 0  # mtime of the file after our last write
+        self.digest = None  # content hash of our last write
+        self._tasks = None
+        self._dirty = False
+        self._stopped = False
+        self._last_text = None
+        self._last_path = None
+        self._requests = 0
+        self._writes = 0
+        self._unchanged = 0
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="tasker-saver",
+                                        daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self, tasks):
+        """Record that *tasks* needs saving; returns immediately."""
+        with self._cond:
+            self._tasks = tasks
+            self._dirty = True
+            self._requests += 1
+            self._cond.notify()
+
+    def discard(self):
+        """Drop any pending write (e.g. after reloading an external edit)."""
+        with self._cond:
+            self._dirty = False
+            self._tasks = None
+
+    def flush(self):
+        """Write pending changes now, on the calling thread."""
+        self._write_pending()
+
+    def stop(self):
+        """Flush pending changes and stop the background writer."""
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def is_writing(self):
+        return self._io_lock.locked()
+
+    def stats(self):
+        """Return counters; ``coalesced`` edits were folded into other writes."""
+        with self._cond:
+            pending = 1 if self._dirty else 0
+            return {
+                "requests": self._requests,
+                "writes": self._writes,
+                "unchanged": self._unchanged,
+                "coalesced": max(0, self._requests - self._writes
+                                 - self._unchanged - pending),
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                # let the burst settle; later mark_dirty calls fold into it
+                deadline = time.monotonic() + self.interval
+                while not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._io_lock:
+            with self._cond:
+                if not self._dirty:
+                    return
+                tasks, path = self._tasks, self.path
+                self._tasks = None  # don't pin a snapshot between writes
+                self._dirty = False
+            try:
+                text = _dump_tasks(tasks)
+            except RuntimeError:
+                # list mutated mid-serialization; retry on the next round
+                self._redirty(tasks)
+                return
+            if text == self._last_text and path == self._last_path:
+                with self._cond:
+                    self._unchanged += 1
+                return
+            try:
+                _write_text(path, text)
+                self.mtime = os.path.getmtime(path)
+            except (PermissionError, OSError):
+                # file locked (e.g. OneDrive sync); retry on the next round
+                self._redirty(tasks)
+                return
+            self.digest = content_digest(_file_bytes(text))
+            self._last_text = text
+            self._last_path = path
+            with self._cond:
+                self._writes += 1
+
+    def _redirty(self, tasks):
+        with self._cond:
+            if not self._dirty:
+                self._tasks = tasks
+                self._dirty = True
+                self._cond.notify()
+
+
+# ---------------------------------------------------------------------------
+# Operation journal
+#
+# In journal mode each edit is appended to ``<tasks file>.journal`` as one
+# small JSON line instead of rewriting the whole tasks file.  The first line
+# records the size/mtime of the tasks file the ops apply to, so a journal
+# left over from before an external edit (e.g. from another device) is
+# ignored rather than replayed onto the wrong list.
+#
+# Ops (indices are into the list as it is when the op is applied):
+#   {"op": "set", "i": 3, "key": "star", "value": 2}
+#   {"op": "set_range", "i": 3, "j": 6, "key": "done", "value": true}
+#   {"op": "insert", "i": 4, "task": {...}}
+#   {"op": "delete", "i": 4}
+#   {"op": "move", "i": 4, "j": 6, "to": 2}   # slice [i:j] -> position to
+
+def journal_path(path):
+    return path + ".journal"
+
+
+def _base_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def apply_ops(tasks, ops):
+    """Apply journal *ops* to *tasks* in place."""
+    for op in ops:
+        kind = op["op"]
+        if kind == "set":
+            tasks[op["i"]][op["key"]] = op["value"]
+        elif kind == "set_range":
+            for task in tasks[op["i"]:op["j"]]:
+                task[op["key"]] = op["value"]
+        elif kind == "insert":
+            tasks.insert(op["i"], Task.from_dict(op["task"]))
+        elif kind == "delete":
+            del tasks[op["i"]]
+        elif kind == "move":
+            group = tasks[op["i"]:op["j"]]
+            del tasks[op["i"]:op["j"]]
+            tasks[op["to"]:op["to"]] = group
+        else:
+            raise ValueError(f"unknown journal op {kind!r}")
+
+
+def _replay_journal(path, tasks):
+    jpath = journal_path(path)
+    try:
+        with open(jpath, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return
+    if not lines:
+        return
+    try:
+        header = json.loads(lines[0])
+    except json.JSONDecodeError:
+        header = None
+    if not isinstance(header, dict) or header.get("base") != _base_stamp(path):
+        print("[Tasker] Tasks file changed outside Tasker – ignoring journal",
+              file=sys.stderr)
+        return
+    for line in lines[1:]:
+        try:
+            apply_ops(tasks, [json.loads(line)])
+        except (json.JSONDecodeError, LookupError, TypeError, ValueError):
+            break  # torn last write or corrupt record; keep what we have
+
+
+def drop_journal(path, tasks):
+    """Fold a leftover journal into the tasks file and delete it."""
+    jpath = journal_path(path)
+    if os.path.exists(jpath):
+        save_tasks(path, tasks)
+        try:
+            os.remove(jpath)
+        except OSError:
+            pass
+
+
+class TaskJournal:
+    """Append-only edit log beside the tasks file.
+
+    ``append`` costs one short write regardless of how many tasks there
+    are.  Once the log grows past *max_bytes* or its oldest op is older
+    than *max_age* seconds, ``needs_compaction`` turns true and the owner
+    calls ``compact`` to rewrite the flat JSON file and start a new log.
+    The age limit is also reached without further edits, so the owner
+    checks again after ``age_limit_in`` seconds.
+    """
+
+    def __init__(self, path, max_bytes=JOURNAL_MAX_BYTES,
+                 max_age=JOURNAL_MAX_AGE_S):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.digest = None  # content hash of the last compaction
+        self._file = None
+        self._size = 0
+        self._first_op_ts = None
+
+    def open(self, tasks):
+        """Start journaling; *tasks* is the state loaded by ``load_tasks``."""
+        try:
+            with open(journal_path(self.path), "r", encoding="utf-8") as f:
+                has_ops = len(f.readlines()) > 1
+        except OSError:
+            has_ops = False
+        if has_ops:
+            self.compact(tasks)
+        else:
+            self.reset()
+
+    def append(self, ops):
+        """Append *ops*; returns False if the journal could not be written."""
+        if self._file is None:
+            return False
+        text = "".join(json.dumps(op, ensure_ascii=False) + "\n"
+                       for op in ops)
+        try:
+            self._file.write(text)
+            self._file.flush()
+        except OSError:
+            return False
+        self._size += len(text)
+        if self._first_op_ts is None:
+            self._first_op_ts = time.monotonic()
+        return True
+
+    def needs_compaction(self):
+        if self._first_op_ts is None:
+            return False
+        return (self._size >= self.max_bytes or
+                time.monotonic() - self._first_op_ts >= self.max_age)
+
+    def age_limit_in(self):
+        """Seconds until the oldest op is *max_age* old, or None if empty."""
+        if self._first_op_ts is None:
+            return None
+        return max(0.0, self._first_op_ts + self.max_age - time.monotonic())
+
+    def compact(self, tasks):
+        """Rewrite the tasks file from *tasks* and start a fresh journal."""
+        text = _dump_tasks(tasks)
+        try:
+            _write_text(self.path, text)
+        except (PermissionError, OSError):
+            return False  # keep appending to the old journal
+        self.digest = content_digest(_file_bytes(text))
+        self.reset()
+        return True
+
+    def reset(self):
+        """Start a fresh journal for the tasks file as it is on disk now."""
+        self.close()
+        header = json.dumps({"base": _base_stamp(self.path)}) + "\n"
+        try:
+            self._file = open(journal_path(self.path), "w", encoding="utf-8")
+            self._file.write(header)
+            self._file.flush()
+        except OSError:
+            self._file = None
+        self._size = len(header)
+        self._first_op_ts = None
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
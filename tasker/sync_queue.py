@@ -0,0 +1,107 @@
+"""Durable record of a Microsoft To Do push that is still owed.
+
+The changes themselves are not copied here.  ``ms_sync_state.json``
+holds what the remote list looked like after the last push, and diffing
+it against the tasks at push time gives one net call per task: ten edits
+to a task become one PATCH, a task added and deleted again becomes
+nothing.  This file only remembers that such a push is owed and how
+often it has failed, so a push that could not go out (offline,
+throttled) is replayed with backoff, also after a restart.
+
+Kept free of msal/requests so the app can read it without them.
+"""
+import json
+import os
+import time
+
+from .constants import CONFIG_DIR
+
+QUEUE_FILE = os.path.join(CONFIG_DIR, "ms_sync_queue.json")
+
+
+class SyncQueue:
+    """Pending-push marker backed by *path*.
+
+    ``add`` is called for every local change and ``done`` after a push
+    succeeds; *version* guards against clearing changes made while that
+    push was running.
+    """
+
+    def __init__(self, path=QUEUE_FILE):
+        self.path = path
+        self.version = 0      # bumped by every add()
+        self.since = None     # epoch seconds of the oldest unsent change
+        self.attempts = 0     # failed pushes in a row
+        self.retry_at = 0.0   # epoch seconds; no retry before this
+        self.last_error = None
+        self._load()
+
+    @property
+    def pending(self):
+        return self.since is not None
+
+    def retry_delay(self):
+        """Seconds until the next attempt may start."""
+        return max(0.0, self.retry_at - time.time())
+
+    def add(self):
+        """Note that local changes are waiting to be pushed."""
+        self.version += 1
+        if self.since is None:
+            self.since = time.time()
+            self._write()
+
+    def failed(self, error, delay=None):
+        """A push failed; retry after *delay* seconds (None: on next change)."""
+        self.attempts += 1
+        self.last_error = str(error)
+        if self.since is None:
+            self.since = time.time()
+        self.retry_at = time.time() + delay if delay is not None else 0.0
+        self._write()
+
+    def done(self, version):
+        """A push of the changes up to *version* succeeded."""
+        self.attempts = 0
+        self.retry_at = 0.0
+        self.last_error = None
+        if version != self.version:
+            return  # changed meanwhile; still owed
+        self.since = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        try:
+            self.since = float(data["since"])
+            self.attempts = int(data.get("attempts", 0))
+            self.retry_at = float(data.get("retry_at", 0.0))
+        except (KeyError, TypeError, ValueError):
+            self.since = None
+            return
+        self.last_error = data.get("last_error")
+
+    def _write(self):
+        data = {
+            "since": self.since,
+            "attempts": self.attempts,
+            "retry_at": self.retry_at,
+            "last_error": self.last_error,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # best effort
@@ -0,0 +1,240 @@
+"""Long-lived background service that runs the Microsoft To Do syncs.
+
+One daemon worker thread runs for the life of the app.  The Tk thread
+submits ``SyncJob``s carrying a snapshot of the tasks; a
+job still waiting when a newer one for the same list arrives is
+replaced by it (latest wins), so a burst of edits costs one sync.  Jobs
+run one at a time: they share ``ms_sync_state.json``.
+
+Graph calls go through ``requests``, which blocks, so a job simply runs
+on the worker thread; inside a push ``GraphClient`` keeps several
+batches in flight on threads of its own.  Results come back through the one *dispatch*
+callable the service was given, which must run its argument on the Tk
+thread.  The next job starts only once a result has been handled there,
+so the handler can still refresh a job queued behind it.
+
+Kept free of msal/requests so the app can import it without them.
+"""
+import threading
+import time
+
+
+class SyncJob:
+    """One sync of *tasks* (best a ``TaskSnapshot``) with a To Do list.
+
+    With *pull* the edits made in To Do are pulled before the push;
+    without it they are only looked for, and the push undoes them.
+    *interactive* allows a sign-in window; such a job (Test Sync) is
+    never replaced by a later one.  *on_done* is called on the Tk thread
+    with a ``SyncResult``.
+    """
+
+    def __init__(self, tasks, list_name, client_id, account_id=None,
+                 pull=False, interactive=False, on_done=None):
+        self.tasks = tasks
+        self.list_name = list_name
+        self.client_id = client_id
+        self.account_id = account_id or None
+        self.pull = pull
+        self.interactive = interactive
+        self.on_done = on_done
+        self.submitted = None  # monotonic; of the oldest job it replaced
+
+    @property
+    def key(self):
+        return (self.client_id, self.list_name)
+
+
+class SyncResult:
+    """Outcome of a ``SyncJob``.
+
+    ``account_id`` is the signed-in account after a successful push,
+    ``pulled`` the ``PullResult`` if the job pulled (also when the push
+    then failed), ``info`` the request stats.  ``waited`` and ``seconds``
+    are the time spent queued and running.
+    """
+
+    def __init__(self):
+        self.error = None
+        self.account_id = None
+        self.pulled = None
+        self.info = {}
+        self.waited = 0.0
+        self.seconds = 0.0
+
+
+class SyncService:
+    """Runs ``SyncJob``s on one background thread; see the module doc.
+
+    ``submit``, ``pending``, ``invalidate`` and ``stats`` may be called
+    from any thread.
+    """
+
+    def __init__(self, dispatch):
+        self._dispatch = dispatch
+        self._lock = threading.Lock()
+        self._pending = []      # waiting jobs, oldest first
+        self._running = None    # job started and not yet handled
+        self._sessions = {}     # key -> SyncSession, reused between jobs
+        self._active = None     # session of the running job
+        self._closed = False
+        self._submitted = 0
+        self._coalesced = 0
+        self._completed = 0
+        self._failed = 0
+        self._latency = 0.0     # submit -> result, summed over jobs
+        self._latency_max = 0.0
+        self._queued_max = 0
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = threading.Thread(target=self._serve,
+                                        name="tasker-sync-service",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        """Queue *job*, replacing a waiting non-interactive job for its list."""
+        job.submitted = time.monotonic()
+        with self._lock:
+            if self._closed:
+                return
+            self._submitted += 1
+            for k, old in enumerate(self._pending):
+                if (old.key == job.key and not old.interactive
+                        and not job.interactive):
+                    job.submitted = old.submitted
+                    self._pending[k] = job
+                    self._coalesced += 1
+                    break
+            else:
+                self._pending.append(job)
+                self._queued_max = max(self._queued_max, len(self._pending))
+            self._wakeup.notify()
+
+    def pending(self, key):
+        """Whether a job for the list *key* is waiting to start."""
+        with self._lock:
+            return any(job.key == key for job in self._pending)
+
+    def invalidate(self):
+        """Forget cached sign-ins and list ids (settings changed)."""
+        self._close_sessions()
+
+    def stats(self):
+        with self._lock:
+            done = self._completed + self._failed
+            return {
+                "submitted": self._submitted,
+                "coalesced": self._coalesced,
+                "completed": self._completed,
+                "failed": self._failed,
+                "queued": len(self._pending),
+                "queued_max": self._queued_max,
+                "in_flight": 0 if self._running is None else 1,
+                "latency_avg": self._latency / done if done else 0.0,
+                "latency_max": self._latency_max,
+            }
+
+    def stop(self):
+        """Drop waiting jobs and end the thread; a running push is abandoned."""
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+            self._wakeup.notify()
+        self._close_sessions()
+
+    def _close_sessions(self):
+        """Drop the stored sessions and close their connections.
+
+        The running job's session is closed by ``_sync`` when it ends.
+        """
+        with self._lock:
+            sessions = [s for s in self._sessions.values()
+                        if s is not self._active]
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    # ---- worker thread ----
+    def _serve(self):
+        while True:
+            with self._lock:
+                while not self._closed and (self._running is not None or
+                                            not self._pending):
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                job = self._running = self._pending.pop(0)
+            self._run(job)
+
+    def _run(self, job):
+        started = time.monotonic()
+        result = self._sync(job)
+        result.waited = started - job.submitted
+        result.seconds = time.monotonic() - started
+        latency = result.waited + result.seconds
+        with self._lock:
+            if result.error is None:
+                self._completed += 1
+            else:
+                self._failed += 1
+            self._latency += latency
+            self._latency_max = max(self._latency_max, latency)
+        self._dispatch(lambda: self._deliver(job, result))
+
+    def _deliver(self, job, result):
+        """On the Tk thread: hand over *result*, then free its list."""
+        try:
+            if job.on_done is not None:
+                job.on_done(result)
+        finally:
+            with self._lock:
+                self._running = None
+                self._wakeup.notify()
+
+    # ---- one job ----
+    def _sync(self, job):
+        result = SyncResult()
+        session = None
+        try:
+            from .ms_todo_sync import SyncSession
+            if job.interactive:
+                # a fresh sign-in; kept for later jobs only if it works
+                session = SyncSession(job.client_id, job.list_name,
+                                      account_id=job.account_id)
+            else:
+                with self._lock:
+                    session = self._sessions.get(job.key)
+                    if session is None:
+                        session = SyncSession(job.client_id, job.list_name,
+                                              account_id=job.account_id)
+                        self._sessions[job.key] = session
+            with self._lock:
+                self._active = session
+            tasks = job.tasks
+            # edits made in To Do first, so the push does not undo them
+            # unless they cannot be kept
+            result.pulled = session.pull(tasks, info=result.info,
+                                         merge=job.pull)
+            if job.pull:
+                tasks = result.pulled.apply(tasks)
+            result.account_id = session.push(tasks,
+                                             interactive=job.interactive,
+                                             info=result.info)
+            if job.interactive:
+                with self._lock:
+                    old = self._sessions.get(job.key)
+                    if not self._closed:
+                        self._sessions[job.key] = session
+                if old is not None:
+                    old.close()
+        except Exception as exc:
+            result.error = exc
+        finally:
+            with self._lock:
+                self._active = None
+                kept = not self._closed and any(
+                    s is session for s in self._sessions.values())
+            if session is not None and not kept:
+                # a failed sign-in, or dropped by invalidate while running
+                session.close()
+        return result
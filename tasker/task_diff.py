@@ -0,0 +1,109 @@
+"""Diff two task lists so an external edit can be applied incrementally.
+
+Tasks have no ids in the JSON file, so tasks are matched by content and
+position: common prefix/suffix first, then ``difflib`` on what is left.
+Unmatched tasks with identical content on both sides count as moved.
+"""
+import difflib
+
+
+class TaskDiff:
+    """Result of ``diff_tasks``.
+
+    ``sources[j]`` is the old index new task *j* corresponds to, or None if
+    it was inserted.  ``modified`` holds new indices whose matched old task
+    has different content, ``moved`` new indices matched out of order, and
+    ``removed`` old indices with no counterpart.
+    """
+
+    def __init__(self, sources, modified, moved, removed):
+        self.sources = sources
+        self.modified = modified
+        self.moved = moved
+        self.removed = removed
+
+    @property
+    def inserted(self):
+        return [j for j, i in enumerate(self.sources) if i is None]
+
+    @property
+    def structural(self):
+        """True if tasks were added, removed or reordered."""
+        return bool(self.removed or self.moved or
+                    any(i is None for i in self.sources))
+
+    def __bool__(self):
+        return bool(self.modified) or self.structural
+
+
+def diff_tasks(old, new, key=None):
+    """Match *new* against *old*; *key* maps a task to a hashable value."""
+    key = key or (lambda t: t.key())
+    old_keys = [key(t) for t in old]
+    new_keys = [key(t) for t in new]
+    sources = [None] * len(new)
+    modified = []
+
+    # common prefix / suffix: the usual case for a one-task remote edit
+    lo = 0
+    limit = min(len(old), len(new))
+    while lo < limit and old_keys[lo] == new_keys[lo]:
+        sources[lo] = lo
+        lo += 1
+    hi = 0
+    while (hi < limit - lo and
+           old_keys[len(old) - 1 - hi] == new_keys[len(new) - 1 - hi]):
+        sources[len(new) - 1 - hi] = len(old) - 1 - hi
+        hi += 1
+
+    removed = []
+    matcher = difflib.SequenceMatcher(None, old_keys[lo:len(old) - hi],
+                                      new_keys[lo:len(new) - hi],
+                                      autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        i1, i2, j1, j2 = i1 + lo, i2 + lo, j1 + lo, j2 + lo
+        if tag == "equal":
+            for k in range(i2 - i1):
+                sources[j1 + k] = i1 + k
+            continue
+        # pair up replaced tasks one-to-one as in-place modifications
+        paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for k in range(paired):
+            sources[j1 + k] = i1 + k
+            modified.append(j1 + k)
+        removed.extend(range(i1 + paired, i2))
+
+    # identical content removed in one place and inserted in another
+    moved = []
+    if removed:
+        by_key = {}
+        for i in removed:
+            by_key.setdefault(old_keys[i], []).append(i)
+        for j, src in enumerate(sources):
+            if src is None:
+                candidates = by_key.get(new_keys[j])
+                if candidates:
+                    sources[j] = candidates.pop(0)
+                    moved.append(j)
+        matched = set(sources)
+        removed = [i for i in removed if i not in matched]
+    return TaskDiff(sources, modified, moved, removed)
+
+
+def apply_diff(old, new, diff):
+    """Return the new list, reusing the old ``Task`` objects it matched.
+
+    Modified tasks are updated in place so references held elsewhere
+    (selection, open pickers) keep pointing at the same object.
+    """
+    result = []
+    modified = set(diff.modified)
+    for j, src in enumerate(diff.sources):
+        if src is None:
+            result.append(new[j])
+            continue
+        task = old[src]
+        if j in modified:
+            task.update_from(new[j])
+        result.append(task)
+    return result
@@ -0,0 +1,213 @@
+"""The live task list, with cheap snapshots for background threads.
+
+Sync and the write-behind saver read the tasks on their own threads while
+the Tk thread keeps editing them.  Copying every task for each of them
+would cost O(n) on every keystroke; instead a snapshot shares the list
+and its ``Task`` objects, and the store copies on write:
+
+* before a structural change (insert, delete, move) live snapshots get a
+  private copy of the list spine -- pointers only, no tasks;
+* before a field edit, ``touch(task)`` gives them a copy of that one
+  task, so they keep seeing it as it was.
+
+All mutation happens on the Tk thread; snapshots may be read anywhere.
+"""
+import weakref
+
+
+class TaskStore(list):
+    """A ``list`` of ``Task`` that can hand out snapshots.
+
+    The list methods that change its structure preserve the spine for
+    live snapshots automatically.  Changing a task in place must be
+    preceded by ``touch(task)``.
+    """
+
+    __slots__ = ("_snapshots",)
+
+    def __init__(self, tasks=()):
+        super().__init__(tasks)
+        self._snapshots = []  # weakrefs to snapshots that may share us
+
+    def snapshot(self):
+        """A consistent, read-only view of the tasks as they are now; O(1)."""
+        snap = TaskSnapshot(self)
+        self._snapshots.append(weakref.ref(snap))
+        return snap
+
+    def touch(self, task):
+        """Call before changing a field of *task* in place."""
+        if self._snapshots:
+            for snap in self._live():
+                if id(task) not in snap._old:
+                    snap._old[id(task)] = task.copy()
+
+    def _live(self):
+        live = []
+        for ref in self._snapshots:
+            snap = ref()
+            if snap is not None:
+                live.append(snap)
+        if len(live) != len(self._snapshots):
+            self._snapshots = [weakref.ref(s) for s in live]
+        return live
+
+    def _detach(self):
+        """Give snapshots that share the spine their own copy of it."""
+        if self._snapshots:
+            for snap in self._live():
+                if snap._items is self:
+                    snap._items = list(self)
+
+    # ---- structural changes ----
+    def __setitem__(self, index, value):
+        self._detach()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._detach()
+        super().__delitem__(index)
+
+    def __iadd__(self, other):
+        self._detach()
+        return super().__iadd__(other)
+
+    def __imul__(self, n):
+        self._detach()
+        return super().__imul__(n)
+
+    def append(self, task):
+        self._detach()
+        super().append(task)
+
+    def extend(self, tasks):
+        self._detach()
+        super().extend(tasks)
+
+    def insert(self, index, task):
+        self._detach()
+        super().insert(index, task)
+
+    def pop(self, index=-1):
+        self._detach()
+        return super().pop(index)
+
+    def remove(self, task):
+        self._detach()
+        super().remove(task)
+
+    def clear(self):
+        self._detach()
+        super().clear()
+
+    def sort(self, *, key=None, reverse=False):
+        self._detach()
+        super().sort(key=key, reverse=reverse)
+
+    def reverse(self):
+        self._detach()
+        super().reverse()
+
+
+class TaskSnapshot:
+    """Read-only view of a ``TaskStore`` at the moment it was taken.
+
+    Items are the store's own ``Task`` objects while they are unchanged,
+    so results can be matched back by identity on the Tk thread, and
+    copies once they have been edited.  A task edited *while* another
+    thread reads it could still be seen half-changed through plain
+    indexing; ``read`` and ``map`` rule that out by checking, after
+    calling *fn*, whether the task was touched meanwhile, and calling it
+    again on the preserved copy if so.
+    """
+
+    __slots__ = ("_items", "_old", "_len", "__weakref__")
+
+    def __init__(self, store):
+        self._items = store  # replaced by a private copy on detach
+        self._old = {}  # id(task) -> copy made before its first edit
+        self._len = len(store)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self._get(i)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get(k) for k in range(*i.indices(self._len))]
+        return self._get(self._index(i))
+
+    def read(self, i, fn):
+        """``fn(self[i])``, consistent even if the task is being edited."""
+        task = self._task(self._index(i))
+        old = self._old.get(id(task))
+        if old is None:
+            value = fn(task)
+            old = self._old.get(id(task))
+            if old is None:
+                return value  # not touched before fn finished
+        return fn(old)
+
+    def map(self, fn):
+        """``[fn(task) for task in self]``, each call consistent."""
+        return [self.read(i, fn) for i in range(self._len)]
+
+    def patched(self, replace, extra=()):
+        """This view with tasks swapped and added.
+
+        *replace* maps ``id(task)`` of a task in this view to the task to
+        show instead; *extra* tasks are appended.
+        """
+        return PatchedSnapshot(self, replace, extra)
+
+    def _index(self, i):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("snapshot index out of range")
+        return i
+
+    def _task(self, i):
+        while True:
+            items = self._items
+            task = items[i]
+            if self._items is items:
+                # the store detaches before it changes, so *items* was
+                # still as of the snapshot when we indexed it
+                return task
+
+    def _get(self, i):
+        task = self._task(i)
+        return self._old.get(id(task), task)
+
+
+class PatchedSnapshot(TaskSnapshot):
+    """A ``TaskSnapshot`` with some tasks replaced and some appended."""
+
+    __slots__ = ("_base", "_replace", "_extra")
+
+    def __init__(self, base, replace, extra=()):
+        self._base = base
+        self._replace = dict(replace)
+        self._extra = list(extra)
+        self._len = len(base) + len(self._extra)
+
+    def read(self, i, fn):
+        i = self._index(i)
+        if i >= len(self._base):
+            return fn(self._extra[i - len(self._base)])
+        task = self._base._task(i)
+        new = self._replace.get(id(task))
+        if new is not None:
+            return fn(new)
+        return self._base.read(i, fn)
+
+    def _get(self, i):
+        if i >= len(self._base):
+            return self._extra[i - len(self._base)]
+        task = self._base._task(i)
+        new = self._replace.get(id(task))
+        return new if new is not None else self._base._get(i)
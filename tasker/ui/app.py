@@ -4,29 +4,41 @@ import datetime
 import time as _time
 import os
 import sys
-import threading
-
-try:
-    import keyboard as _kb
-    HAS_HOTKEY = True
-except ImportError:
-    HAS_HOTKEY = False
 
 from ..constants import (
     STAR_COLORS, WINDOW_WIDTH, WINDOW_HEIGHT, GLOBAL_HOTKEY,
-    DEFAULT_DATA_FILE, REMINDER_CHECK_MS, LOCK_FILE, CONFIG_DIR,
+    DEFAULT_DATA_FILE, LOCK_FILE, CONFIG_DIR,
+    SAVE_INTERVAL_MS, MS_PULL_INTERVAL_MS, REMINDER_SNOOZE_MIN,
+)
+from ..storage import (
+    load_config, load_tasks, save_config, TaskSaver, TaskJournal, drop_journal,
+    refresh_cache, read_tasks_file, parse_tasks,
 )
-from ..storage import load_config, load_tasks, save_tasks, save_config
+from ..cache import content_digest
+from ..dispatch import UIDispatcher
+from ..hotkey import GlobalHotkey, format_chord
+from ..hierarchy import SubtreeIndex
+from ..model import Task
+from ..notify import DesktopNotifier, HAS_DBUS
+from ..recurrence import next_reminder
+from ..reminders import ReminderScheduler
+from ..sync_queue import SyncQueue
+from ..sync_service import SyncJob, SyncService
+from ..task_diff import diff_tasks, apply_diff
+from ..task_store import TaskStore
 from ..tray import create_tray_icon
+from ..watcher import DataFileWatcher
 from .title_bar import TitleBar
 from .task_list import TaskList
+from .notifications import ReminderPanel
 from .dialogs import open_settings, open_first_run_config, open_keybindings
 
 
 class TaskerApp:
     """Main application window and controller."""
 
-    def __init__(self):
+    def __init__(self, startup_timing=False):
+        t_start = _time.perf_counter()
         self.selected_index = None
         self.tray_icon = None
         self.running = True
@@ -85,18 +97,47 @@ class TaskerApp:
         if "ms_account_id" not in self.cfg:
             self.cfg["ms_account_id"] = ""
             config_changed = True
+        if "ms_pull_enabled" not in self.cfg:
+            self.cfg["ms_pull_enabled"] = False
+            config_changed = True
+        if "save_interval_ms" not in self.cfg:
+            self.cfg["save_interval_ms"] = SAVE_INTERVAL_MS
+            config_changed = True
+        if "journal_mode" not in self.cfg:
+            self.cfg["journal_mode"] = False
+            config_changed = True
+        if "global_hotkey" not in self.cfg:
+            self.cfg["global_hotkey"] = GLOBAL_HOTKEY
+            config_changed = True
         if config_changed:
             save_config(self.cfg)
         self.ms_sync_enabled = bool(self.cfg.get("ms_sync_enabled"))
         self.ms_tasklist_name = self.cfg.get("ms_tasklist_name", "Tasker")
         self.ms_client_id = self.cfg.get("ms_client_id", "")
         self.ms_account_id = self.cfg.get("ms_account_id", "")
-        self.tasks = load_tasks(self.data_file)
+        self.ms_pull_enabled = bool(self.cfg.get("ms_pull_enabled"))
+        t_load = _time.perf_counter()
+        load_info = {}
+        self.tasks = TaskStore(load_tasks(self.data_file, load_info))
+        t_loaded = _time.perf_counter()
+        self.hierarchy = SubtreeIndex(self.tasks)
         self._file_mtime = self._get_file_mtime()
-        self._last_save_ts = 0.0
+        self._file_digest = load_info.get("digest")
+        self._saver = TaskSaver(
+            self.data_file,
+            interval=self.cfg.get("save_interval_ms", SAVE_INTERVAL_MS) / 1000,
+        )
+        self._journal = None
+        self._journal_timer = None
+        self._open_journal()
         self._ms_sync_timer = None
-        self._ms_sync_running = False
-        self._ms_sync_pending = False
+        # the only way other threads (tray, hotkey, sync) reach Tk
+        self._dispatch = UIDispatcher(self.root)
+        self._dispatch.start()
+        # one background thread runs every sync, newest snapshot first
+        self._sync_service = SyncService(self._dispatch.post)
+        # survives restarts: a push that could not go out is replayed
+        self._sync_queue = SyncQueue()
 
         # ---- title bar ----
         self.title_bar = TitleBar(self.root, on_close=self.quit_app,
@@ -124,6 +165,7 @@ class TaskerApp:
         }
         self.task_list = TaskList(self.root, task_callbacks=callbacks)
         self._rebuild_rows()
+        t_rows = _time.perf_counter()
 
         # ---- resize grip ----
         self._resize_data = {}
@@ -141,55 +183,50 @@ class TaskerApp:
 
         # ---- system tray ----
         self.tray_icon = create_tray_icon(
-            on_show=lambda: self.root.after(0, self.show_window),
-            on_quit=lambda: self.root.after(0, self.quit_app),
+            on_show=lambda: self._dispatch.post(self.show_window),
+            on_quit=lambda: self._dispatch.post(self.quit_app),
         )
 
-        # ---- global hotkey: Ctrl+K, Ctrl+K chord ----
-        self._hotkey_state = 0  # 0 = idle, 1 = first Ctrl+K pressed
-        self._hotkey_ts = 0.0
-        self._kb_hook = None
-        if HAS_HOTKEY:
-            try:
-                self._kb_hook = _kb.on_press(self._on_key_press)
-                print("[Tasker] Global hotkey registered (Ctrl+K, Ctrl+K)",
-                      file=sys.stderr)
-            except Exception as e:
-                print(f"[Tasker] Failed to register global hotkey: {e}",
-                      file=sys.stderr)
-
-        # ---- reminder checker ----
-        self._check_reminders()
+        # ---- global hotkey: a chord, Ctrl+K, Ctrl+K by default ----
+        try:
+            self._hotkey = GlobalHotkey(self.cfg["global_hotkey"],
+                                        self._toggle_visibility)
+        except ValueError as e:
+            print(f"[Tasker] {e}; using {GLOBAL_HOTKEY!r}", file=sys.stderr)
+            self._hotkey = GlobalHotkey(GLOBAL_HOTKEY, self._toggle_visibility)
+        if self._hotkey.start():
+            print(f"[Tasker] Global hotkey registered "
+                  f"({format_chord(self._hotkey.steps)}, "
+                  f"{self._hotkey.backend})", file=sys.stderr)
+
+        # ---- reminders: one timer for the next one due ----
+        self._reminders = ReminderScheduler(self.root, self._on_reminders_due)
+        self._reminders.reset(self.tasks)
+        self._reminder_panel = ReminderPanel(
+            self.root, on_open=self._open_reminder_task,
+            on_snooze=self._snooze_reminders, on_done=self._complete_tasks,
+            notifier=DesktopNotifier() if HAS_DBUS else None)
 
         # ---- file watcher (reload on external edits) ----
-        self._watch_file()
-
-    # ---- Ctrl+K, Ctrl+K chord ----
-    def _on_key_press(self, event):
-        """Detect Ctrl+K, Ctrl+K chord via keyboard.on_press."""
-        try:
-            key_name = event.name.lower() if event.name else ""
-            # Check for Ctrl+K
-            is_ctrl_k = (key_name == "k" and
-                         any(mod in event.modifiers or []
-                             for mod in ("ctrl", "left ctrl", "right ctrl"))
-                         if hasattr(event, "modifiers") and event.modifiers
-                         else key_name == "k" and _kb.is_pressed("ctrl"))
-
-            if is_ctrl_k:
-                now = _time.time()
-                if self._hotkey_state == 1 and (now - self._hotkey_ts) < 1.0:
-                    self._hotkey_state = 0
-                    self._toggle_visibility()
-                else:
-                    self._hotkey_state = 1
-                    self._hotkey_ts = now
-            elif key_name not in ("ctrl", "left ctrl", "right ctrl",
-                                  "control_l", "control_r", ""):
-                # any non-ctrl, non-k key resets the chord
-                self._hotkey_state = 0
-        except Exception:
-            pass
+        self._watcher = DataFileWatcher(self.root, self.data_file,
+                                        self._on_data_file_changed)
+        self._watcher.start()
+
+        # ---- To Do changes left over from the last session ----
+        # (also a first look for edits made in To Do meanwhile)
+        delay = max(2.0, self._sync_queue.retry_delay())
+        self._schedule_ms_sync(delay_ms=int(delay * 1000), changed=False)
+
+        if startup_timing:
+            def _report():
+                t_idle = _time.perf_counter()
+                print(f"[Tasker] Startup: {len(self.tasks)} tasks | "
+                      f"load {(t_loaded - t_load) * 1000:.1f} ms "
+                      f"({load_info.get('source', 'none')}) | "
+                      f"rows {(t_rows - t_loaded) * 1000:.1f} ms | "
+                      f"first idle {(t_idle - t_start) * 1000:.1f} ms",
+                      file=sys.stderr)
+            self.root.after_idle(_report)
 
     # ---- view toggle (active / completed) ----
     def _set_view(self, show_completed):
@@ -219,72 +256,77 @@ class TaskerApp:
         self.selected_index = index
         self.task_list.update_selection(index)
 
-    def _indent_value(self, value):
-        try:
-            return int(value)
-        except (TypeError, ValueError):
-            return 0
-
     def _update_text(self, index, var):
-        if index < len(self.tasks) and not self.tasks[index].get("done", False):
-            self.tasks[index]["text"] = var.get()
-            self._save()
+        if index < len(self.tasks) and not self.tasks[index].done:
+            text = var.get()
+            task = self.tasks[index]
+            if text == task.text:
+                return  # arrows, modifiers etc. don't change anything
+            self.tasks.touch(task)
+            task.text = text
+            self._save({"op": "set", "i": index, "key": "text", "value": text})
 
     def _toggle_done(self, index, var):
-        self.tasks[index]["done"] = var.get()
+        self._set_done(index, bool(var.get()))
+
+    def _set_done(self, index, done):
         # cascade to children: completing or un-completing a parent
         # also completes or un-completes all its children
-        parent_indent = self._indent_value(self.tasks[index].get("indent", 0))
-        for j in range(index + 1, len(self.tasks)):
-            child_indent = self._indent_value(self.tasks[j].get("indent", 0))
-            if child_indent > parent_indent:
-                self.tasks[j]["done"] = var.get()
-            else:
-                break
-        self._save_and_rebuild()
+        start, end = self.hierarchy.group(index)
+        for task in self.tasks[start:end]:
+            self.tasks.touch(task)
+            task.done = done
+            self._reminders.update(task)
+        self._save({"op": "set_range", "i": index, "j": end,
+                    "key": "done", "value": done})
+        # the group leaves this view; the other rows stay as they are
+        if done == self.show_completed or \
+                not self.task_list.remove_range(start, end):
+            self._rebuild_rows()
 
     def _toggle_star(self, index):
-        cur = self.tasks[index].get("star", 0)
-        self.tasks[index]["star"] = (cur + 1) % len(STAR_COLORS)
-        self._save_and_rebuild()
+        task = self.tasks[index]
+        star = (task.star + 1) % len(STAR_COLORS)
+        self.tasks.touch(task)
+        task.star = star
+        self._save({"op": "set", "i": index, "key": "star", "value": star})
+        self.task_list.set_star(index, star)
 
     def _insert_row_below(self, index):
-        new_task = {
-            "text": "", "done": False, "star": 0,
-            "indent": self.tasks[index].get("indent", 0), "reminder": None,
-        }
-        self.tasks.insert(index + 1, new_task)
+        new_task = Task(indent=self.tasks[index].indent)
+        self.hierarchy.insert(index + 1, new_task)
         self.selected_index = index + 1
-        self._save_and_rebuild()
+        self._save_and_rebuild({"op": "insert", "i": index + 1,
+                                "task": new_task.to_dict()})
         self.task_list.focus_row(self.selected_index)
         return "break"
 
     def _indent_row(self, index):
         if index > 0:
-            cur = self._indent_value(self.tasks[index].get("indent", 0))
-            prev_indent = self._indent_value(self.tasks[index - 1].get("indent", 0))
-            if cur <= prev_indent:
-                self.tasks[index]["indent"] = cur + 1
-                self._save_and_rebuild()
+            cur = self.tasks[index].indent
+            if cur <= self.tasks[index - 1].indent:
+                self.tasks.touch(self.tasks[index])
+                self.hierarchy.set_indent(index, cur + 1)
+                self._save({"op": "set", "i": index,
+                            "key": "indent", "value": cur + 1})
+                self.task_list.set_indent(index, cur + 1)
         return "break"
 
     def _unindent_row(self, index):
-        cur = self._indent_value(self.tasks[index].get("indent", 0))
+        cur = self.tasks[index].indent
         if cur > 0:
-            self.tasks[index]["indent"] = cur - 1
-            self._save_and_rebuild()
+            self.tasks.touch(self.tasks[index])
+            self.hierarchy.set_indent(index, cur - 1)
+            self._save({"op": "set", "i": index,
+                        "key": "indent", "value": cur - 1})
+            self.task_list.set_indent(index, cur - 1)
         return "break"
 
     # ---- keyboard navigation ----
     def _nav_up(self, index):
         """Move focus to the previous row."""
         imap = self.task_list.index_map
-        # find display position of current real index
-        display_pos = None
-        for di, ri in enumerate(imap):
-            if ri == index:
-                display_pos = di
-                break
+        display_pos = self.task_list.display_pos(index)
         if display_pos is not None and display_pos > 0:
             prev_real = imap[display_pos - 1]
             self._select_row(prev_real)
@@ -293,13 +335,8 @@ class TaskerApp:
 
     def _nav_down(self, index):
         """Move focus to the next row (or empty row)."""
-        from .task_row import EmptyRow
         imap = self.task_list.index_map
-        display_pos = None
-        for di, ri in enumerate(imap):
-            if ri == index:
-                display_pos = di
-                break
+        display_pos = self.task_list.display_pos(index)
         if display_pos is not None:
             if display_pos < len(imap) - 1:
                 next_real = imap[display_pos + 1]
@@ -307,24 +344,13 @@ class TaskerApp:
                 self.task_list.focus_row(next_real)
             elif not self.show_completed:
                 # focus the empty row at the bottom
-                rows = self.task_list.rows
-                if rows and isinstance(rows[-1], EmptyRow):
-                    rows[-1].entry.focus_set()
+                self.task_list.focus_empty()
         return "break"
 
     def _toggle_done_kb(self, index):
         """Toggle done via Ctrl+Space."""
         if index < len(self.tasks):
-            new_state = not self.tasks[index].get("done", False)
-            self.tasks[index]["done"] = new_state
-            parent_indent = self._indent_value(self.tasks[index].get("indent", 0))
-            for j in range(index + 1, len(self.tasks)):
-                child_indent = self._indent_value(self.tasks[j].get("indent", 0))
-                if child_indent > parent_indent:
-                    self.tasks[j]["done"] = new_state
-                else:
-                    break
-            self._save_and_rebuild()
+            self._set_done(index, not self.tasks[index].done)
         return "break"
 
     def _toggle_star_kb(self, index):
@@ -336,11 +362,11 @@ class TaskerApp:
     def _delete_row(self, index):
         """Delete a task row via Ctrl+D."""
         if index < len(self.tasks):
-            self.tasks.pop(index)
+            self._reminders.remove(self.hierarchy.pop(index))
             if self.selected_index is not None:
                 if self.selected_index >= len(self.tasks):
                     self.selected_index = max(0, len(self.tasks) - 1) if self.tasks else None
-            self._save_and_rebuild()
+            self._save_and_rebuild({"op": "delete", "i": index})
             if self.selected_index is not None:
                 self.task_list.focus_row(self.selected_index)
         return "break"
@@ -349,14 +375,7 @@ class TaskerApp:
         """Return (start, end) slice of a task and all its children."""
         if index >= len(self.tasks):
             return index, index + 1
-        parent_indent = self.tasks[index].get("indent", 0)
-        end = index + 1
-        while end < len(self.tasks):
-            if self.tasks[end].get("indent", 0) > parent_indent:
-                end += 1
-            else:
-                break
-        return index, end
+        return self.hierarchy.group(index)
 
     def _move_row_up(self, index):
         """Move task + children up via Shift+Up (active view only)."""
@@ -367,11 +386,10 @@ class TaskerApp:
             return "break"
         # the item just above the group
         above = start - 1
-        group = self.tasks[start:end]
-        del self.tasks[start:end]
-        self.tasks[above:above] = group
+        self.hierarchy.move(start, end, above)
         self.selected_index = above
-        self._save_and_rebuild()
+        self._save_and_rebuild({"op": "move", "i": start, "j": end,
+                                "to": above})
         self.task_list.focus_row(self.selected_index)
         return "break"
 
@@ -383,68 +401,136 @@ class TaskerApp:
         if end >= len(self.tasks):
             return "break"
         # the item (or group) just below: find its extent
-        below_start = end
-        below_end = self._get_task_group(below_start)[1]
-        group = self.tasks[start:end]
-        below_group = self.tasks[below_start:below_end]
+        below_end = self._get_task_group(end)[1]
         # swap: put below_group first, then group
-        self.tasks[start:below_end] = below_group + group
-        self.selected_index = start + len(below_group)
-        self._save_and_rebuild()
+        self.selected_index = start + (below_end - end)
+        self.hierarchy.move(start, end, self.selected_index)
+        self._save_and_rebuild({"op": "move", "i": start, "j": end,
+                                "to": self.selected_index})
         self.task_list.focus_row(self.selected_index)
         return "break"
 
     def _commit_empty_row(self, widget):
         text = widget.get().strip()
         if text:
-            self.tasks.append({
-                "text": text, "done": False, "star": 0,
-                "indent": 0, "reminder": None,
-            })
-            self._save_and_rebuild()
+            new_task = Task(text=text)
+            self.hierarchy.append(new_task)
+            # the row is kept across rebuilds; clear it for the next task
+            widget.delete(0, tk.END)
+            self._save_and_rebuild({"op": "insert", "i": len(self.tasks) - 1,
+                                    "task": new_task.to_dict()})
 
     # ---- inline reminder picker ----
     def _open_inline_reminder(self, index):
         # find the display row index for this real task index
-        display_idx = None
-        for di, ri in enumerate(self.task_list.index_map):
-            if ri == index:
-                display_idx = di
-                break
+        display_idx = self.task_list.display_pos(index)
         if display_idx is None:
             return
 
-        def _on_set(iso_str):
-            self.tasks[index]["reminder"] = iso_str
-            self._save_and_rebuild()
+        # look the task up again on use: an external reload may move it
+        task = self.tasks[index]
+
+        def _on_set(iso_str, repeat=None):
+            i = self._index_of(task)
+            if i is None:
+                return
+            self.tasks.touch(task)
+            task.reminder = iso_str
+            task.repeat = repeat
+            self._reminders.update(task)
+            self._save({"op": "set", "i": i, "key": "reminder",
+                        "value": iso_str},
+                       {"op": "set", "i": i, "key": "repeat",
+                        "value": repeat})
+            self.task_list.set_reminder(i, task.reminder_dt)
 
         def _on_clear():
-            self.tasks[index]["reminder"] = None
-            self._save_and_rebuild()
+            _on_set(None)
 
         self.task_list.show_picker(display_idx, self.tasks[index],
                                    _on_set, _on_clear)
 
     # ---- rebuild / save ----
+    def _set_tasks(self, tasks):
+        """Replace the whole task list (load / external reload)."""
+        self.tasks = TaskStore(tasks)
+        self.hierarchy.reset(self.tasks)
+        self._reminders.reset(self.tasks)
+
     def _rebuild_rows(self):
         self.task_list.rebuild(self.tasks, self.selected_index,
                                self._commit_empty_row,
                                show_completed=self.show_completed)
 
-    def _save(self):
-        save_tasks(self.data_file, self.tasks)
-        self._file_mtime = self._get_file_mtime()
-        self._last_save_ts = _time.time()
-        self._schedule_ms_sync()
+    def _save(self, *ops, sync=True):
+        """Persist the current tasks.
+
+        *ops* describe the edit for journal mode; without them the whole
+        file is rewritten.  *sync* False skips the To Do push, for
+        changes that came from To Do.
+        """
+        if self._journal is None:
+            self._saver.mark_dirty(self.tasks.snapshot())
+        elif not ops or not self._journal.append(ops):
+            self._compact_journal()
+        elif self._journal.needs_compaction():
+            self._compact_journal()
+        else:
+            self._arm_journal_timer()
+        if sync:
+            self._schedule_ms_sync()
 
-    def _save_and_rebuild(self):
-        self._save()
+    def _save_and_rebuild(self, *ops):
+        self._save(*ops)
         self._rebuild_rows()
 
+    def _open_journal(self):
+        """Start (or stop) journal mode for the current data file."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.cfg.get("journal_mode"):
+            self._journal = TaskJournal(self.data_file)
+            self._journal.open(self.tasks)
+        else:
+            drop_journal(self.data_file, self.tasks)
+        self._file_mtime = self._get_file_mtime()
+
+    def _flush_saves(self):
+        """Write everything pending to the tasks file now."""
+        if self._journal is not None:
+            self._compact_journal()
+        self._saver.flush()
+
+    def _compact_journal(self):
+        self._journal.compact(self.tasks)
+        self._file_mtime = self._get_file_mtime()
+        self._file_digest = self._journal.digest
+
+    def _arm_journal_timer(self):
+        """Fold the journal in when it gets too old, even if idle."""
+        due = self._journal.age_limit_in()
+        if due is None or self._journal_timer is not None:
+            return
+        self._journal_timer = self.root.after(int(due * 1000) + 1,
+                                              self._on_journal_timer)
+
+    def _on_journal_timer(self):
+        self._journal_timer = None
+        if self._journal is None:
+            return
+        if self._journal.needs_compaction():
+            self._compact_journal()
+        else:
+            self._arm_journal_timer()  # compacted meanwhile; newer ops
+
     # ---- Microsoft To Do sync ----
-    def _schedule_ms_sync(self, delay_ms=2000):
+    def _schedule_ms_sync(self, delay_ms=2000, changed=True):
+        """Push to To Do after *delay_ms*; *changed* records a local edit."""
         if not self.ms_sync_enabled or not self.ms_client_id:
             return
+        if changed:
+            self._sync_queue.add()
         if self._ms_sync_timer is not None:
             try:
                 self.root.after_cancel(self._ms_sync_timer)
@@ -453,50 +539,75 @@ class TaskerApp:
         self._ms_sync_timer = self.root.after(delay_ms, self._start_ms_sync)
 
     def _start_ms_sync(self):
+        self._ms_sync_timer = None
         if not self.ms_sync_enabled or not self.ms_client_id:
             return
-        if self._ms_sync_running:
-            self._ms_sync_pending = True
-            return
-        self._ms_sync_running = True
-        self._ms_sync_pending = False
-        tasks_snapshot = list(self.tasks)
-        tasklist_name = self.ms_tasklist_name or "Tasker"
-        client_id = self.ms_client_id
-        thread = threading.Thread(
-            target=self._ms_sync_worker,
-            args=(tasks_snapshot, tasklist_name, client_id, self.ms_account_id),
-            daemon=True,
-        )
-        thread.start()
-
-    def _ms_sync_worker(self, tasks_snapshot, tasklist_name, client_id, account_id):
-        error = None
-        new_account_id = None
-        try:
-            from ..ms_todo_sync import push_tasks
-            new_account_id = push_tasks(
-                tasks_snapshot,
-                tasklist_name,
-                client_id,
-                account_id=account_id,
-                interactive=False,
-            )
-        except Exception as exc:
-            error = exc
-        self.root.after(0, lambda: self._on_ms_sync_done(error, new_account_id))
-
-    def _on_ms_sync_done(self, error, new_account_id):
-        self._ms_sync_running = False
+        version = self._sync_queue.version
+        job = SyncJob(self.tasks.snapshot(), self.ms_tasklist_name or "Tasker",
+                      self.ms_client_id, account_id=self.ms_account_id,
+                      pull=self.ms_pull_enabled)
+        job.on_done = lambda result: self._on_ms_sync_done(job, result,
+                                                           version)
+        self._sync_service.submit(job)
+
+    def _on_ms_sync_done(self, job, result, version):
+        error = result.error
+        pulled = result.pulled
+        if pulled:
+            # merged even if the push failed: the sync state already
+            # counts these edits as pulled
+            self._apply_pulled(pulled)
+        if pulled is not None and (pulled.reverted or pulled.removed):
+            print(f"[Tasker] Microsoft To Do list drifted: {pulled.reverted} "
+                  f"tasks changed or added and {pulled.removed} deleted "
+                  f"there; pushing Tasker's list back", file=sys.stderr)
+        new_account_id = result.account_id
         if new_account_id and new_account_id != self.ms_account_id:
             self.ms_account_id = new_account_id
             self.cfg["ms_account_id"] = new_account_id
             save_config(self.cfg)
         if error:
             print(f"[Tasker] Microsoft To Do sync failed: {error}", file=sys.stderr)
-        if self._ms_sync_pending:
-            self._ms_sync_pending = False
+        info = result.info
+        if "requests" in info:
+            print(f"[Tasker] Microsoft To Do sync ({info.get('mode', '?')}): "
+                  f"{info['requests']} requests, {info['bytes_sent']} bytes, "
+                  f"{info['throttled']} throttled in {info['seconds']:.2f}s "
+                  f"(queued {result.waited:.2f}s)", file=sys.stderr)
+        queue = self._sync_queue
+        delay = None
+        if not error:
+            queue.done(version)
+        elif getattr(error, "retryable", False):
+            # throttled or offline: try again without waiting for an edit;
+            # the push resumes where this one stopped
+            from ..ms_todo_sync import backoff_delay
+            delay = backoff_delay(queue.attempts, error.retry_after)
+            queue.failed(error, delay)
+        else:
+            queue.failed(error)  # still owed; tried again on the next edit
+        if self._sync_service.pending(job.key):
+            # its snapshot predates what was just merged; take a new one
             self._start_ms_sync()
+        elif delay is not None:
+            self._schedule_ms_sync(delay_ms=int(delay * 1000), changed=False)
+        elif self._ms_sync_timer is None:
+            # look for edits made in To Do while idle
+            self._schedule_ms_sync(delay_ms=MS_PULL_INTERVAL_MS, changed=False)
+
+    def _apply_pulled(self, pulled):
+        """Merge edits made in To Do into the task list.
+
+        A task edited here since the pull started keeps the local edit;
+        the next push sends it.
+        """
+        merged = {id(task): new for task, key, new in pulled.updated
+                  if task.key() == key}
+        if not merged and not pulled.added:
+            return
+        self._merge_tasks([merged.get(id(t), t) for t in self.tasks] +
+                          pulled.added)
+        self._save(sync=False)
 
     # ---- file watcher ----
     def _get_file_mtime(self):
@@ -506,24 +617,88 @@ class TaskerApp:
         except OSError:
             return 0
 
-    def _watch_file(self):
-        """Poll the data file every 60 seconds for external changes."""
+    def _on_data_file_changed(self):
+        """Reload the tasks after the data file was changed elsewhere."""
         if not self.running:
             return
+        if self._saver.is_writing():
+            # our own write is in progress; look again once it's done
+            self.root.after(250, self._on_data_file_changed)
+            return
         try:
-            # skip if we saved recently (debounce 5s)
-            if (_time.time() - self._last_save_ts) < 5:
-                pass
-            else:
-                current_mtime = self._get_file_mtime()
-                if current_mtime and current_mtime != self._file_mtime:
-                    self._file_mtime = current_mtime
-                    self.tasks = load_tasks(self.data_file)
-                    self._rebuild_rows()
-                    self._schedule_ms_sync(delay_ms=0)
+            current_mtime = self._get_file_mtime()
+            if not current_mtime or current_mtime in (self._file_mtime,
+                                                      self._saver.mtime):
+                return
+            raw, st = read_tasks_file(self.data_file)
+            if raw is None:
+                return
+            digest = content_digest(raw)
+            if digest in (self._file_digest, self._saver.digest):
+                # touched or rewritten with the same bytes: nothing to do
+                self._file_mtime = current_mtime
+                return
+            load_info = {}
+            tasks = parse_tasks(self.data_file, raw, st, load_info)
+            if load_info.get("source") == "invalid":
+                return  # half-written by a sync client; wait for more
+            self._file_mtime = current_mtime
+            self._file_digest = digest
+            self._saver.discard()
+            if self._journal is not None:
+                self._journal.reset()
+            self._merge_tasks(tasks)
+            self._schedule_ms_sync(delay_ms=0)
         except Exception:
             pass
-        self.root.after(60000, self._watch_file)
+
+    def _merge_tasks(self, new_tasks):
+        """Apply an externally edited task list with as little UI churn
+        as possible: unchanged tasks keep their objects and rows."""
+        diff = diff_tasks(self.tasks, new_tasks)
+        if not diff:
+            return
+        done_changed = any(self.tasks[diff.sources[j]].done != new_tasks[j].done
+                           for j in diff.modified)
+        selected = (self.tasks[self.selected_index]
+                    if self.selected_index is not None
+                    and self.selected_index < len(self.tasks) else None)
+        focus = self.task_list.get_focus()
+        focus_task = self.tasks[focus[0]] if focus else None
+        picker_task = self.task_list.picker_task
+
+        for j in diff.modified:
+            # updated in place below; background snapshots keep the old
+            self.tasks.touch(self.tasks[diff.sources[j]])
+        self.tasks[:] = apply_diff(self.tasks, new_tasks, diff)
+        self.hierarchy.reset(self.tasks)
+        self._reminders.reset(self.tasks)
+
+        if not diff.structural and not done_changed:
+            # same rows, same order: patch the changed ones
+            for j in diff.modified:
+                self.task_list.update_row(j, self.tasks[j])
+            return
+
+        scroll = self.task_list.get_scroll()
+        self.selected_index = self._index_of(selected)
+        self._rebuild_rows()
+        self.task_list.set_scroll(scroll)
+        focus_index = self._index_of(focus_task)
+        if focus_index is not None:
+            self.task_list.focus_row(focus_index, focus[1])
+        picker_index = self._index_of(picker_task)
+        if picker_index is not None:
+            self._open_inline_reminder(picker_index)
+
+    def _index_of(self, task):
+        """Current position of *task* (by identity), or None."""
+        if task is None:
+            return None
+        for i, t in enumerate(self.tasks):
+            if t is task:
+                return i
+        return None
 
     # ---- visibility ----
     def _on_escape(self, event):
@@ -542,15 +717,18 @@ class TaskerApp:
 
     def hide_window(self):
         self.root.withdraw()
+        self._saver.flush()
 
     def show_window(self):
         self.root.deiconify()
         self.root.attributes("-topmost", True)
         self.root.lift()
         self.root.focus_force()
+        # after a suspend the reminder timer may still be waiting
+        self._reminders.check()
 
     def _toggle_visibility(self):
-        self.root.after(0, self._do_toggle)
+        self._dispatch.post(self._do_toggle)
 
     def _do_toggle(self):
         if self.root.state() == "withdrawn":
@@ -559,45 +737,137 @@ class TaskerApp:
             self.hide_window()
 
     # ---- reminders ----
-    def _check_reminders(self):
-        if not self.running:
+    def _on_reminders_due(self, tasks):
+        """Show the reminders that came due, all at once.
+
+        One-shot reminders are cleared; repeating ones move on to their
+        next occurrence.
+        """
+        pos = {id(t): i for i, t in enumerate(self.tasks)}
+        indices = sorted(pos[id(t)] for t in tasks if id(t) in pos)
+        if not indices:
             return
         now = datetime.datetime.now()
-        for i, task in enumerate(self.tasks):
-            r = task.get("reminder")
-            if r and not task.get("done", False):
-                try:
-                    dt = datetime.datetime.fromisoformat(r)
-                    if dt <= now:
-                        task["reminder"] = None
-                        self._save()
-                        self.show_window()
-                        # switch to active view if in completed view
-                        if self.show_completed:
-                            self.show_completed = False
-                        self.selected_index = i
-                        self._rebuild_rows()
-                        self.root.after(200, lambda i=i: self._flash_reminder(i))
-                        break
-                except Exception:
-                    pass
-        self.root.after(REMINDER_CHECK_MS, self._check_reminders)
-
-    def _flash_reminder(self, index):
-        self.task_list.flash_row(index)
-        if index < len(self.tasks):
-            messagebox.showinfo("Reminder",
-                                f"Task: {self.tasks[index].get('text', '')}")
+        for i in indices:
+            task = self.tasks[i]
+            self.tasks.touch(task)
+            task.reminder = next_reminder(task, now)
+            self._reminders.update(task)
+        self._save(*({"op": "set", "i": i, "key": "reminder",
+                      "value": self.tasks[i].reminder} for i in indices))
+        self.show_window()
+        # switch to active view if in completed view
+        if self.show_completed:
+            self.show_completed = False
+            self.selected_index = indices[0]
+            self._rebuild_rows()
+        else:
+            for i in indices:
+                self.task_list.set_reminder(i, self.tasks[i].reminder_dt)
+            self._select_row(indices[0])
+        self.root.after(200, lambda: self._flash_reminders(indices))
+        self._reminder_panel.add([self.tasks[i] for i in indices])
+
+    def _flash_reminders(self, indices):
+        for i in indices:
+            if i < len(self.tasks):
+                self.task_list.flash_row(i)
+
+    def _open_reminder_task(self, task):
+        self.show_window()
+        i = self._index_of(task)
+        if i is None:
+            return
+        if self.show_completed != task.done:
+            self.selected_index = i
+            self._toggle_view()
+        else:
+            self._select_row(i)
+
+    def _snooze_reminders(self, tasks):
+        """Remind again about *tasks* in REMINDER_SNOOZE_MIN minutes."""
+        due = datetime.datetime.now().replace(second=0, microsecond=0) \
+            + datetime.timedelta(minutes=REMINDER_SNOOZE_MIN)
+        pos = {id(t): i for i, t in enumerate(self.tasks)}
+        ops = []
+        for task in tasks:
+            i = pos.get(id(task))
+            if i is None or task.done:
+                continue
+            if task.repeat and task.reminder_dt is not None \
+                    and task.reminder_dt <= due:
+                continue  # the next occurrence comes first anyway
+            self.tasks.touch(task)
+            task.reminder = due.isoformat()
+            self._reminders.update(task)
+            self.task_list.set_reminder(i, task.reminder_dt)
+            ops.append({"op": "set", "i": i, "key": "reminder",
+                        "value": task.reminder})
+        if ops:
+            self._save(*ops)
+
+    def _complete_tasks(self, tasks):
+        """Mark *tasks* done, with their children (as the checkbox does).
+
+        A repeating task stays open: its reminder moved on to the next
+        occurrence when it went off, so this occurrence is already done.
+        """
+        pos = {id(t): i for i, t in enumerate(self.tasks)}
+        ops = []
+        for task in tasks:
+            i = pos.get(id(task))
+            if i is None or task.done:
+                continue
+            if task.repeat and task.reminder_dt is not None:
+                continue
+            start, end = self.hierarchy.group(i)
+            for t in self.tasks[start:end]:
+                self.tasks.touch(t)
+                t.done = True
+                self._reminders.update(t)
+            ops.append({"op": "set_range", "i": i, "j": end,
+                        "key": "done", "value": True})
+        if ops:
+            self._save_and_rebuild(*ops)
 
     # ---- quit ----
     def quit_app(self):
         self.running = False
-        self._save()
-        if HAS_HOTKEY:
-            try:
-                _kb.unhook_all()
-            except Exception:
-                pass
+        self._watcher.stop()
+        self._reminders.stop()
+        self._reminder_panel.close()
+        if self._journal is not None:
+            self._compact_journal()
+            self._journal.close()
+        else:
+            self._saver.mark_dirty(self.tasks.snapshot())
+        self._saver.stop()
+        refresh_cache(self.data_file, self.tasks)
+        stats = self._saver.stats()
+        print(f"[Tasker] Saved {stats['writes']} times for {stats['requests']} "
+              f"edits ({stats['coalesced']} coalesced, "
+              f"{stats['unchanged']} unchanged)", file=sys.stderr)
+        rows = self.task_list.rebuild_stats(total=True)
+        print(f"[Tasker] {rows['rebuilds']} list rebuilds: {rows['created']} "
+              f"rows created, {rows['reused']} reused ({rows['updated']} "
+              f"updated), {rows['destroyed']} destroyed", file=sys.stderr)
+        sync = self._sync_service.stats()  # before stop() drops the queue
+        self._sync_service.stop()
+        if sync["submitted"]:
+            print(f"[Tasker] {sync['submitted']} To Do syncs requested "
+                  f"({sync['coalesced']} coalesced): {sync['completed']} ok, "
+                  f"{sync['failed']} failed, {sync['in_flight']} unfinished, "
+                  f"{sync['queued']} queued (max {sync['queued_max']}); "
+                  f"latency avg {sync['latency_avg']:.2f}s, max "
+                  f"{sync['latency_max']:.2f}s", file=sys.stderr)
+        self._dispatch.stop()
+        ui = self._dispatch.stats()
+        if ui["run"]:
+            print(f"[Tasker] {ui['run']} UI calls from other threads: "
+                  f"latency avg {ui['latency_avg'] * 1000:.1f} ms, max "
+                  f"{ui['latency_max'] * 1000:.1f} ms; queue depth max "
+                  f"{ui['depth_max']}", file=sys.stderr)
+        self._hotkey.stop()
         if self.tray_icon:
             try:
                 self.tray_icon.stop()
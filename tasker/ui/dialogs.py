@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import threading
 
 from ..constants import GLOBAL_HOTKEY, CONFIG_FILE, DEFAULT_DATA_FILE
+from ..hotkey import format_chord
 from ..storage import save_config, save_tasks, load_tasks
+from ..sync_service import SyncJob
 
 
 def open_settings(root, app):
@@ -47,11 +48,19 @@ def open_settings(root, app):
     ms_enabled_var = tk.BooleanVar(value=app.ms_sync_enabled)
     tk.Checkbutton(
         ms_tab,
-        text="Enable Microsoft To Do sync (one-way push)",
+        text="Enable Microsoft To Do sync (push)",
         variable=ms_enabled_var,
         bg="#FFFFFF",
     ).pack(anchor="w", padx=10, pady=(10, 4))
 
+    ms_pull_var = tk.BooleanVar(value=app.ms_pull_enabled)
+    tk.Checkbutton(
+        ms_tab,
+        text="Also pull edits made in To Do (two-way)",
+        variable=ms_pull_var,
+        bg="#FFFFFF",
+    ).pack(anchor="w", padx=10, pady=(0, 4))
+
     tk.Label(ms_tab, text="Task List Name:", bg="#FFFFFF",
              font=("Segoe UI", 9)).pack(anchor="w", padx=10, pady=(4, 0))
     list_name_var = tk.StringVar(value=app.ms_tasklist_name or "Tasker")
@@ -92,62 +101,56 @@ def open_settings(root, app):
                  bg="#FFFFFF", font=("Segoe UI", 9)).pack(pady=18)
         progress.update_idletasks()
 
-        def _run():
-            error = None
-            new_account_id = None
-            try:
-                from ..ms_todo_sync import push_tasks
-                new_account_id = push_tasks(
-                    list(app.tasks),
-                    list_name,
-                    client_id,
-                    account_id=app.ms_account_id or None,
-                    interactive=True,
-                )
-            except Exception as exc:
-                error = exc
-
-            def _done():
-                progress.destroy()
-                if new_account_id:
-                    app.ms_account_id = new_account_id
-                    app.cfg["ms_account_id"] = new_account_id
-                    app.ms_client_id = client_id
-                    app.ms_tasklist_name = list_name
-                    app.cfg["ms_client_id"] = client_id
-                    app.cfg["ms_tasklist_name"] = list_name
-                    save_config(app.cfg)
-                if error:
-                    messagebox.showerror("Sync Failed", str(error))
-                else:
-                    messagebox.showinfo("Sync Success",
-                                        "Microsoft To Do sync completed.")
-
-            dlg.after(0, _done)
-
-        threading.Thread(target=_run, daemon=True).start()
+        def _done(result):
+            progress.destroy()
+            if result.account_id:
+                app.ms_account_id = result.account_id
+                app.cfg["ms_account_id"] = result.account_id
+                app.ms_client_id = client_id
+                app.ms_tasklist_name = list_name
+                app.cfg["ms_client_id"] = client_id
+                app.cfg["ms_tasklist_name"] = list_name
+                save_config(app.cfg)
+            if result.error:
+                messagebox.showerror("Sync Failed", str(result.error))
+            else:
+                messagebox.showinfo("Sync Success",
+                                    "Microsoft To Do sync completed.")
+
+        # the background syncs reuse this sign-in once it succeeds
+        app._sync_service.submit(SyncJob(
+            app.tasks.snapshot(), list_name, client_id,
+            account_id=app.ms_account_id, interactive=True, on_done=_done))
 
     tk.Button(ms_tab, text="Test Sync", command=_test_sync,
               width=12).pack(anchor="w", padx=10, pady=(8, 0))
 
     def _persist_settings():
+        app._flush_saves()
         new_path = path_var.get().strip()
         if new_path:
             import os
             if not os.path.exists(new_path):
                 save_tasks(new_path, app.tasks)
             app.data_file = new_path
+            app._saver.path = new_path
             app.cfg["data_file"] = new_path
         else:
             app.cfg["data_file"] = app.data_file
         app.ms_sync_enabled = bool(ms_enabled_var.get())
         app.ms_tasklist_name = list_name_var.get().strip() or "Tasker"
         app.ms_client_id = client_id_var.get().strip()
+        app.ms_pull_enabled = bool(ms_pull_var.get())
         app.cfg["ms_sync_enabled"] = app.ms_sync_enabled
+        app.cfg["ms_pull_enabled"] = app.ms_pull_enabled
         app.cfg["ms_tasklist_name"] = app.ms_tasklist_name
         app.cfg["ms_client_id"] = app.ms_client_id
         save_config(app.cfg)
-        app.tasks = load_tasks(app.data_file)
+        app._sync_service.invalidate()
+        app._set_tasks(load_tasks(app.data_file))
+        app._open_journal()
+        if app._watcher.path != app.data_file:
+            app._watcher.set_path(app.data_file)
         app._rebuild_rows()
         if app.ms_sync_enabled:
             app._schedule_ms_sync(delay_ms=0)
@@ -168,7 +171,8 @@ def open_settings(root, app):
     tk.Button(btn_frame, text="Close", command=_close,
               width=10).pack(side=tk.RIGHT)
 
-    tk.Label(dlg, text=f"Global Hotkey: Ctrl+K, Ctrl+K  |  Config: {CONFIG_FILE}",
+    hotkey = format_chord(app._hotkey.steps)
+    tk.Label(dlg, text=f"Global Hotkey: {hotkey}  |  Config: {CONFIG_FILE}",
              bg="#FFFFFF", fg="#999999",
              font=("Segoe UI", 8)).pack(side=tk.BOTTOM, pady=4)
 
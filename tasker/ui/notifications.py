@@ -0,0 +1,164 @@
+import tkinter as tk
+
+_BG = "#333333"
+_FG = "#EEEEEE"
+_LINK_FG = "#88BBFF"
+_FONT = ("Segoe UI", 9)
+
+
+class ReminderPanel:
+    """Non-modal reminder notification in the corner of the screen.
+
+    Reminders that come due while earlier ones are still on screen join
+    the same card, so a burst (or everything that went off while you
+    were away) is one grouped notification.  Each task can be opened,
+    snoozed or marked done, and the footer does the same for all of
+    them.  A repeating task has already moved on to its next occurrence
+    when it shows up here, so it gets Dismiss instead of Done.  The card
+    keeps clear of the main window.  Nothing here grabs focus or waits
+    for input.
+
+    *on_open(task)*, *on_snooze(tasks)* and *on_done(tasks)* are called
+    on the Tk thread.  *notifier* (a ``DesktopNotifier``) mirrors the
+    card as a desktop notification.
+    """
+
+    MAX_ROWS = 6
+
+    def __init__(self, root, *, on_open, on_snooze, on_done, notifier=None):
+        self.root = root
+        self._on_open = on_open
+        self._on_snooze = on_snooze
+        self._on_done = on_done
+        self._notifier = notifier
+        self._tasks = []
+        self._win = None
+
+    @property
+    def tasks(self):
+        return list(self._tasks)
+
+    def add(self, tasks):
+        """Show *tasks* as due, together with those already shown."""
+        shown = {id(t) for t in self._tasks}
+        self._tasks.extend(t for t in tasks if id(t) not in shown)
+        self._render()
+        if self._notifier is not None:
+            texts = [t.text or "(untitled)" for t in self._tasks]
+            if len(texts) == 1:
+                self._notifier.show("Reminder", texts[0])
+            else:
+                self._notifier.show(f"{len(texts)} reminders",
+                                    "\n".join(texts[:self.MAX_ROWS]))
+
+    def close(self):
+        self._tasks = []
+        if self._win is not None:
+            self._win.destroy()
+            self._win = None
+        if self._notifier is not None:
+            self._notifier.close()
+
+    # ---- actions ----
+    def _act(self, callback, tasks):
+        handled = {id(t) for t in tasks}
+        self._tasks = [t for t in self._tasks if id(t) not in handled]
+        callback(tasks)
+        if self._tasks:
+            self.add([])
+        else:
+            self.close()
+
+    # ---- drawing ----
+    def _render(self):
+        if self._win is None:
+            self._win = tk.Toplevel(self.root, bg=_BG,
+                                    highlightthickness=1,
+                                    highlightbackground="#666666")
+            self._win.overrideredirect(True)
+            self._win.attributes("-topmost", True)
+        else:
+            for child in self._win.winfo_children():
+                child.destroy()
+
+        count = len(self._tasks)
+        header = tk.Frame(self._win, bg=_BG)
+        header.pack(fill=tk.X, padx=8, pady=(6, 2))
+        title = "Reminder" if count == 1 else f"{count} reminders"
+        tk.Label(header, text=f"⏰ {title}", fg=_FG, bg=_BG,
+                 font=("Segoe UI", 10, "bold")).pack(side=tk.LEFT)
+        self._link(header, " ✕ ", self.close).pack(side=tk.RIGHT)
+
+        for task in self._tasks[:self.MAX_ROWS]:
+            row = tk.Frame(self._win, bg=_BG)
+            row.pack(fill=tk.X, padx=8, pady=1)
+            text = task.text or "(untitled)"
+            if len(text) > 40:
+                text = text[:39] + "…"
+            label = tk.Label(row, text=text, fg=_FG, bg=_BG, font=_FONT,
+                             anchor="w", cursor="hand2")
+            label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+            label.bind("<Button-1>", lambda e, t=task: self._on_open(t))
+            if task.repeat:
+                self._link(row, "Dismiss",
+                           lambda t=task: self._act(_ignore, [t])
+                           ).pack(side=tk.RIGHT)
+            else:
+                self._link(row, "Done",
+                           lambda t=task: self._act(self._on_done, [t])
+                           ).pack(side=tk.RIGHT)
+            self._link(row, "Snooze",
+                       lambda t=task: self._act(self._on_snooze, [t])
+                       ).pack(side=tk.RIGHT, padx=(6, 6))
+        if count > self.MAX_ROWS:
+            tk.Label(self._win, text=f"+ {count - self.MAX_ROWS} more",
+                     fg="#AAAAAA", bg=_BG, font=_FONT,
+                     anchor="w").pack(fill=tk.X, padx=8)
+        if count > 1:
+            footer = tk.Frame(self._win, bg=_BG)
+            footer.pack(fill=tk.X, padx=8, pady=(4, 0))
+            done_all = ("Done all" if any(not t.repeat for t in self._tasks)
+                        else "Dismiss all")
+            self._link(footer, done_all,
+                       lambda: self._act(self._on_done, self.tasks)
+                       ).pack(side=tk.RIGHT)
+            self._link(footer, "Snooze all",
+                       lambda: self._act(self._on_snooze, self.tasks)
+                       ).pack(side=tk.RIGHT, padx=6)
+        tk.Frame(self._win, bg=_BG, height=6).pack()
+
+        self._win.update_idletasks()
+        w = max(280, self._win.winfo_reqwidth())
+        h = self._win.winfo_reqheight()
+        x, y = self._place(w, h)
+        self._win.geometry(f"{w}x{h}+{x}+{y}")
+
+    def _place(self, w, h):
+        """Bottom-right corner above a typical taskbar, unless the main
+        window is there: then beside it, or above it if there is no room.
+        """
+        sw = self._win.winfo_screenwidth()
+        sh = self._win.winfo_screenheight()
+        x, y = sw - w - 16, sh - h - 56
+        root = self.root
+        if not root.winfo_viewable():
+            return x, y
+        rx, ry = root.winfo_rootx(), root.winfo_rooty()
+        rw, rh = root.winfo_width(), root.winfo_height()
+        if x >= rx + rw or x + w <= rx or y >= ry + rh or y + h <= ry:
+            return x, y
+        if rx - w - 8 >= 0:
+            return rx - w - 8, min(ry + rh - h, sh - h)
+        if ry - h - 8 >= 0:
+            return min(rx + rw - w, sw - w), ry - h - 8
+        return x, y
+
+    def _link(self, parent, text, command):
+        label = tk.Label(parent, text=text, fg=_LINK_FG, bg=_BG, font=_FONT,
+                         cursor="hand2")
+        label.bind("<Button-1>", lambda e: command())
+        return label
+
+
+def _ignore(tasks):
+    pass
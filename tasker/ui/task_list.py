@@ -1,27 +1,69 @@
 import tkinter as tk
 from tkinter import ttk
 
-from ..constants import SELECTED_ROW_BG, DEFAULT_ROW_BG, REMINDER_FLASH_BG
+from ..constants import (
+    REMINDER_FLASH_BG, WINDOW_HEIGHT, VIRTUAL_LIST_THRESHOLD,
+)
+from ..model import Task
+from ..recurrence import KINDS, kind_label, make_rule
 from .task_row import TaskRow, EmptyRow
 
+# rows scrolled per mouse wheel notch in virtual mode
+_WHEEL_ROWS = 3
+# rows kept on screen below a task whose reminder picker opens
+_PICKER_ROWS = 5
+# unused rows kept per view for later rebuilds
+_SPARE_ROWS = 20
+_COUNTERS = ("rebuilds", "created", "reused", "updated", "destroyed")
+
 
 class TaskList:
-    """Scrollable list of task rows backed by a Canvas."""
+    """Scrollable list of task rows backed by a Canvas.
+
+    Lists longer than ``VIRTUAL_LIST_THRESHOLD`` are virtualized: only a
+    pool of rows big enough to fill the viewport is created, and
+    scrolling points those rows at other tasks instead of moving the
+    canvas.  Methods that take a real task index scroll the task into
+    view first, so callers work the same way in both modes.
+
+    ``rebuild`` reconciles against the rows already on screen: a row that
+    showed the same ``Task`` object is kept (and patched if a field
+    changed), rows that are no longer needed show other tasks or go to a
+    small spare pool, and only the rows whose position changed are
+    re-packed.
+    """
 
     def __init__(self, parent, *, task_callbacks):
         self._task_callbacks = task_callbacks
-        self.rows: list[TaskRow | EmptyRow] = []
+        # rows currently shown, in display order (all of them unless virtual)
+        self.rows: list[TaskRow] = []
+        self.empty_row: EmptyRow | None = None
         # maps display index -> actual task list index
         self.index_map: list[int] = []
+        self._display_pos: dict[int, int] = {}
+        self._tasks = []
+        self._selected = None
+        self._readonly = False
+        # spare rows for each view (keyed by readonly)
+        self._spare: dict[bool, list[TaskRow]] = {False: [], True: []}
+        self._last_stats = dict.fromkeys(_COUNTERS, 0)
+        self._total_stats = dict.fromkeys(_COUNTERS, 0)
+
+        # virtual mode
+        self.virtual = False
+        self._pool: list[TaskRow] = []
+        self._top = 0  # display index of the first shown row
+        self._row_height = None
+        self._visible = 1  # rows that fit in the viewport
 
         container = tk.Frame(parent, bg="#333333")
         container.pack(fill=tk.BOTH, expand=True, padx=2, pady=(0, 2))
 
         self.canvas = tk.Canvas(container, bg="#FFFFFF", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(container, orient=tk.VERTICAL,
-                                  command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._scrollbar = ttk.Scrollbar(container, orient=tk.VERTICAL,
+                                        command=self._yview)
+        self.canvas.configure(yscrollcommand=self._scrollbar.set)
+        self._scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         self.inner = tk.Frame(self.canvas, bg="#FFFFFF")
@@ -33,6 +75,7 @@ class TaskList:
 
         # inline date picker frame (hidden by default)
         self._picker_frame = None
+        self._picker_task = None
 
     # ----- scroll plumbing -----
     def _on_frame_cfg(self, _e):
@@ -40,75 +83,449 @@ class TaskList:
 
     def _on_canvas_cfg(self, e):
         self.canvas.itemconfig(self._cw, width=e.width)
+        if self.virtual:
+            visible = self._fit_rows(e.height)
+            if visible != self._visible:
+                self._visible = visible
+                self._render()
 
     def _on_mousewheel(self, e):
-        self.canvas.yview_scroll(-1 * (e.delta // 120), "units")
+        if not self.virtual:
+            self.canvas.yview_scroll(-1 * (e.delta // 120), "units")
+        elif not (self._picker_frame and
+                  str(e.widget).startswith(str(self._picker_frame))):
+            self._scroll_to(self._top - (e.delta // 120) * _WHEEL_ROWS)
+
+    def _yview(self, *args):
+        """Scrollbar command: scroll the canvas, or the window of tasks."""
+        if not self.virtual:
+            return self.canvas.yview(*args)
+        if args[0] == "moveto":
+            self._scroll_to(round(float(args[1]) * self._total_slots()))
+        elif args[0] == "scroll":
+            step = self._visible if args[2] == "pages" else 1
+            self._scroll_to(self._top + int(args[1]) * step)
 
     # ----- rebuild -----
     def rebuild(self, tasks, selected_index, on_empty_commit,
                 show_completed=False):
         self.dismiss_picker()
-        for r in self.rows:
-            r.frame.destroy()
-        self.rows.clear()
-        self.index_map.clear()
-
-        for real_i, task in enumerate(tasks):
-            is_done = task.get("done", False)
-            # filter: show only completed or only active
-            if show_completed and not is_done:
-                continue
-            if not show_completed and is_done:
-                continue
-
-            display_i = len(self.index_map)
-            self.index_map.append(real_i)
-            row = TaskRow(self.inner, real_i, task,
-                          selected=(real_i == selected_index),
-                          callbacks=self._task_callbacks,
-                          readonly=show_completed)
-            self.rows.append(row)
+        self._last_stats = dict.fromkeys(_COUNTERS, 0)
+        self._count("rebuilds")
+        self._tasks = tasks
+        self._selected = selected_index
+        # filter: show only completed or only active
+        self.index_map = [i for i, task in enumerate(tasks)
+                          if task.done == show_completed]
+        self._display_pos = {ri: di for di, ri in enumerate(self.index_map)}
+
+        virtual = len(self.index_map) > VIRTUAL_LIST_THRESHOLD
+        if virtual != self.virtual:
+            self._set_virtual(virtual)
+        view_changed = show_completed != self._readonly
+        if view_changed:
+            for r in self._pool:
+                self._park(r)
+            self._pool.clear()
+        self._readonly = show_completed
 
         # only show empty row in active view
-        if not show_completed:
-            def _on_empty_up():
-                # move focus to last task row
-                if self.index_map:
-                    self.rows[-2].entry.focus_set()  # -2 because -1 is EmptyRow
-            empty = EmptyRow(self.inner, on_empty_commit, on_up=_on_empty_up)
-            self.rows.append(empty)
+        if show_completed:
+            if self.empty_row:
+                self._destroy(self.empty_row)
+                self.empty_row = None
+        elif self.empty_row:
+            self.empty_row.on_commit = on_empty_commit
+        else:
+            self.empty_row = EmptyRow(self.inner, on_empty_commit,
+                                      on_up=self._focus_last_row)
+            self._count("created")
+
+        if self.virtual:
+            self._render()
+        else:
+            self._reconcile(view_changed)
+
+    def _reconcile(self, view_changed):
+        """Show ``index_map`` reusing the current rows where possible."""
+        tasks = self._tasks
+        old_rows = self.rows
+        focus_row = self._focused_row()
+        focus_task = focus_row._task if focus_row else None
+
+        if view_changed:
+            # rows of the other view are read-only (or not); can't reuse
+            for r in old_rows:
+                self._park(r)
+            rows = [None] * len(self.index_map)
+            leftover = []
+        else:
+            # rows that already show the same task object keep showing it
+            by_task = {id(r._task): r for r in old_rows}
+            rows = [by_task.pop(id(tasks[i]), None) for i in self.index_map]
+            leftover = list(by_task.values())
+        spare = self._spare[self._readonly]
+
+        for k, real_i in enumerate(self.index_map):
+            row = rows[k]
+            task = tasks[real_i]
+            selected = real_i == self._selected
+            if row is None:
+                if leftover:
+                    row = leftover.pop()
+                elif spare:
+                    row = spare.pop()
+                else:
+                    rows[k] = TaskRow(self.inner, real_i, task,
+                                      selected=selected,
+                                      callbacks=self._task_callbacks,
+                                      readonly=self._readonly)
+                    self._count("created")
+                    continue
+                rows[k] = row
+            self._count("reused")
+            if row.show(real_i, task, selected):
+                self._count("updated")
+        for r in leftover:
+            self._park(r)
+
+        self._repack(old_rows, rows)
+        self.rows = rows
+        if focus_row is not None and (focus_row._task is not focus_task or
+                                      not focus_row.frame.winfo_manager()):
+            # the focused widget now shows another task (or none)
+            self.canvas.focus_set()
+
+    def _repack(self, old_rows, rows):
+        """Re-pack only the rows that are not already in place."""
+        keep = {id(r) for r in rows}
+        packed = [r for r in old_rows if id(r) in keep]
+        placed = set()
+        p = 0
+        prev = None
+        for row in rows:
+            while p < len(packed) and id(packed[p]) in placed:
+                p += 1
+            if p < len(packed) and packed[p] is row:
+                p += 1
+            elif prev is not None:
+                row.frame.pack(fill=tk.X, padx=0, pady=0, after=prev.frame)
+            elif p < len(packed):
+                row.frame.pack(fill=tk.X, padx=0, pady=0,
+                               before=packed[p].frame)
+            elif self.empty_row and self.empty_row.frame.winfo_manager():
+                row.frame.pack(fill=tk.X, padx=0, pady=0,
+                               before=self.empty_row.frame)
+            else:
+                row.frame.pack(fill=tk.X, padx=0, pady=0)
+            placed.add(id(row))
+            prev = row
+        if self.empty_row and not self.empty_row.frame.winfo_manager():
+            self.empty_row.frame.pack(fill=tk.X, padx=0, pady=0)
+
+    def _park(self, row):
+        """Hide an unused row, keeping it as a spare if there is room."""
+        spare = self._spare[row._readonly]
+        if len(spare) < _SPARE_ROWS:
+            row.frame.pack_forget()
+            spare.append(row)
+        else:
+            self._destroy(row)
+
+    def _destroy(self, row):
+        row.frame.destroy()
+        self._count("destroyed")
+
+    def _count(self, name, n=1):
+        self._last_stats[name] += n
+        self._total_stats[name] += n
+
+    def rebuild_stats(self, total=False):
+        """Row widgets created/reused/updated/destroyed.
+
+        Counts cover the last ``rebuild`` (plus any scrolling of a virtual
+        list since), or every rebuild so far with *total*.
+        """
+        return dict(self._total_stats if total else self._last_stats)
+
+    def _focus_last_row(self):
+        if self.index_map:
+            self.focus_row(self.index_map[-1])
+
+    # ----- virtual mode -----
+    def _set_virtual(self, virtual):
+        fraction = self.get_scroll()
+        if self._focused_row() is not None:
+            self.canvas.focus_set()
+        for r in (self._pool if self.virtual else self.rows):
+            self._park(r)
+        self._pool.clear()
+        self.rows = []
+        self.virtual = virtual
+        if virtual:
+            # the canvas stays at the top and clips the pool; the
+            # scrollbar follows the window of tasks instead
+            self.canvas.configure(yscrollcommand="")
+            self.canvas.yview_moveto(0)
+            self._top = int(fraction * len(self.index_map))
+        else:
+            self._top = 0
+            self.canvas.configure(yscrollcommand=self._scrollbar.set)
+
+    def _viewport_height(self):
+        height = self.canvas.winfo_height()
+        return height if height > 1 else WINDOW_HEIGHT
+
+    def _fit_rows(self, height):
+        return max(1, height // self._row_height) if self._row_height else 1
+
+    def _total_slots(self):
+        return len(self.index_map) + (1 if self.empty_row else 0)
+
+    def _new_row(self):
+        spare = self._spare[self._readonly]
+        if spare:
+            return spare.pop()
+        row = TaskRow(self.inner, 0, Task(), selected=False,
+                      callbacks=self._task_callbacks, readonly=self._readonly)
+        row.frame.pack_forget()  # _render packs it in order
+        self._count("created")
+        return row
+
+    def _fill_pool(self):
+        """Create or drop pooled rows so they cover the viewport."""
+        if self._row_height is None:
+            row = self._new_row()
+            self._pool.append(row)
+            row.frame.pack(fill=tk.X)
+            self.inner.update_idletasks()
+            self._row_height = max(1, row.frame.winfo_reqheight())
+            row.frame.pack_forget()
+            self._visible = self._fit_rows(self._viewport_height())
+        # one extra row for the partly visible one at the bottom
+        need = self._visible + 1
+        while len(self._pool) < need:
+            self._pool.append(self._new_row())
+        for r in self._pool[need:]:
+            self._park(r)
+        del self._pool[need:]
+
+    def _render(self):
+        """Point the row pool at the tasks in the visible window."""
+        self.dismiss_picker()
+        self._fill_pool()
+        focus_row = self._focused_row()
+        if focus_row is not None:
+            focus_task = focus_row._task
+            component = focus_row._focusables.index(focus_row.frame.focus_get())
+        n = len(self.index_map)
+        self._top = self._clamp_top(self._top)
+        count = max(0, min(len(self._pool), n - self._top))
+        # packed pool rows are always a prefix of the pool, so rows that
+        # come back are simply appended after the ones still shown
+        if self.empty_row:
+            self.empty_row.frame.pack_forget()
+        for k, row in enumerate(self._pool):
+            if k < count:
+                real_i = self.index_map[self._top + k]
+                self._count("reused")
+                if row.show(real_i, self._tasks[real_i],
+                            real_i == self._selected):
+                    self._count("updated")
+                if not row.frame.winfo_manager():
+                    row.frame.pack(fill=tk.X, padx=0, pady=0)
+            elif row.frame.winfo_manager():
+                row.frame.pack_forget()
+        self.rows = self._pool[:count]
+        if self.empty_row and self._top + count == n:
+            self.empty_row.frame.pack(fill=tk.X, padx=0, pady=0)
+
+        total = self._total_slots()
+        if total:
+            self._scrollbar.set(self._top / total,
+                                min(1.0, (self._top + self._visible) / total))
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+        if focus_row is not None:
+            # keep focus on the same task, not on the recycled widget
+            for row in self.rows:
+                if row._task is focus_task:
+                    row._focusables[component].focus_set()
+                    break
+            else:
+                self.canvas.focus_set()
+
+    def _clamp_top(self, top):
+        return max(0, min(top, self._total_slots() - self._visible))
+
+    def _scroll_to(self, top):
+        top = self._clamp_top(top)
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _ensure_visible(self, pos, below=0):
+        """Scroll display position *pos* (and *below* rows) into view."""
+        if not self.virtual:
+            return
+        if pos < self._top:
+            self._scroll_to(pos)
+        elif pos + below >= self._top + self._visible:
+            self._scroll_to(min(pos, pos + below - self._visible + 1))
+
+    def _row_for(self, real_index):
+        """The row showing task *real_index*, or None if it isn't shown."""
+        pos = self._display_pos.get(real_index)
+        if pos is None:
+            return None
+        k = pos - self._top
+        return self.rows[k] if 0 <= k < len(self.rows) else None
+
+    def _show_row(self, real_index):
+        """Scroll task *real_index* into view and return its row."""
+        pos = self._display_pos.get(real_index)
+        if pos is None:
+            return None
+        self._ensure_visible(pos)
+        return self._row_for(real_index)
+
+    def display_pos(self, real_index):
+        """Display index of task *real_index*, or None if filtered out."""
+        return self._display_pos.get(real_index)
 
     # ----- selection highlight -----
     def update_selection(self, selected_index):
-        for i, r in enumerate(self.rows):
-            if isinstance(r, TaskRow):
-                real_i = self.index_map[i] if i < len(self.index_map) else -1
-                bg = SELECTED_ROW_BG if real_i == selected_index else DEFAULT_ROW_BG
-                r.set_bg(bg)
+        old = self._row_for(self._selected)
+        self._selected = selected_index
+        if old is not None:
+            old.set_selected(False)
+        row = self._row_for(selected_index)
+        if row is not None:
+            row.set_selected(True)
 
     def flash_row(self, real_index):
-        for i, r in enumerate(self.rows):
-            if isinstance(r, TaskRow) and i < len(self.index_map):
-                if self.index_map[i] == real_index:
-                    r.set_bg(REMINDER_FLASH_BG)
-                    r.entry.focus_set()
-                    break
+        row = self._show_row(real_index)
+        if row is not None:
+            row.set_bg(REMINDER_FLASH_BG)
+            row.entry.focus_set()
+
+    def focus_row(self, real_index, component=1):
+        """Focus a row's component (0 checkbox, 1 text, 2 star, 3 reminder)."""
+        row = self._show_row(real_index)
+        if row is not None:
+            row._focusables[component].focus_set()
+
+    def focus_empty(self):
+        """Focus the add-a-task row at the bottom, if it is shown."""
+        if self.empty_row:
+            self._ensure_visible(len(self.index_map))
+            self.empty_row.entry.focus_set()
+
+    def get_focus(self):
+        """Return (real index, component) of the focused row, or None."""
+        row = self._focused_row()
+        if row is None:
+            return None
+        return row._index, row._focusables.index(row.frame.focus_get())
+
+    def _focused_row(self):
+        try:
+            focused = self.canvas.focus_get()
+        except (KeyError, tk.TclError):
+            return None
+        for r in self.rows:
+            if focused in r._focusables:
+                return r
+        return None
+
+    # ----- in-place patches (no rebuild) -----
+    # A task that is scrolled out of a virtual list needs nothing: its
+    # row is refreshed from the task when it comes back into view.
+    def update_row(self, real_index, task):
+        """Refresh one row in place after its task changed."""
+        row = self._row_for(real_index)
+        if row is not None:
+            row.refresh(task)
+
+    def set_star(self, real_index, star):
+        row = self._row_for(real_index)
+        if row is not None:
+            row.set_star(star)
+
+    def set_reminder(self, real_index, reminder_dt):
+        row = self._row_for(real_index)
+        if row is not None:
+            row.set_reminder(reminder_dt)
+
+    def set_indent(self, real_index, indent):
+        row = self._row_for(real_index)
+        if row is not None:
+            row.set_indent(indent)
+
+    def remove_range(self, start, end):
+        """Take tasks *start* to *end* - 1 out of the view, in place.
+
+        For tasks that moved to the other view (completed or reopened):
+        their rows are parked and the rest stay packed as they are.
+        Returns False if the list would switch to or from virtual mode;
+        call ``rebuild`` then.
+        """
+        keep = [i for i in self.index_map if not start <= i < end]
+        if len(keep) == len(self.index_map):
+            return True
+        if self.virtual != (len(keep) > VIRTUAL_LIST_THRESHOLD):
+            return False
+        self.dismiss_picker()
+        focus_row = self._focused_row()
+        self.index_map = keep
+        self._display_pos = {ri: di for di, ri in enumerate(keep)}
+        if self.virtual:
+            self._render()
+            return True
+        rows = []
+        for row in self.rows:
+            if start <= row._index < end:
+                self._park(row)
+            else:
+                rows.append(row)
+        self.rows = rows
+        if focus_row is not None and start <= focus_row._index < end:
+            self.canvas.focus_set()
+        return True
+
+    # ----- scroll position -----
+    def get_scroll(self):
+        if self.virtual:
+            total = self._total_slots()
+            return self._top / total if total else 0.0
+        return self.canvas.yview()[0]
+
+    def set_scroll(self, fraction):
+        if self.virtual:
+            self._scroll_to(round(fraction * self._total_slots()))
+            return
+        self.canvas.update_idletasks()
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.canvas.yview_moveto(fraction)
 
-    def focus_row(self, real_index):
-        for i, r in enumerate(self.rows):
-            if isinstance(r, TaskRow) and i < len(self.index_map):
-                if self.index_map[i] == real_index:
-                    r.entry.focus_set()
-                    break
+    @property
+    def picker_task(self):
+        """The task whose reminder picker is open, or None."""
+        return self._picker_task if self._picker_frame else None
 
     # ----- inline date/time picker -----
     def show_picker(self, row_index, task, on_set, on_clear):
         """Show an inline date/time picker below the given row."""
         self.dismiss_picker()
 
-        if row_index >= len(self.rows):
+        if row_index >= len(self.index_map):
+            return
+        self._ensure_visible(row_index, below=_PICKER_ROWS)
+        row_widget = self._row_for(self.index_map[row_index])
+        if row_widget is None:
             return
-        row_widget = self.rows[row_index]
+        self._picker_task = task
 
         import datetime
         self._picker_frame = tk.Frame(self.inner, bg="#F8F8E8", bd=1,
@@ -117,16 +534,9 @@ class TaskList:
                                 after=row_widget.frame)
 
         now = datetime.datetime.now().replace(second=0, microsecond=0)
-        existing = task.get("reminder")
-        if existing:
-            try:
-                dt = datetime.datetime.fromisoformat(existing)
-                # clamp to now if existing reminder is in the past
-                if dt < now:
-                    dt = now
-            except Exception:
-                dt = now
-        else:
+        dt = task.reminder_dt or now
+        # clamp to now if existing reminder is in the past
+        if dt < now:
             dt = now
 
         pf = self._picker_frame
@@ -281,6 +691,19 @@ class TaskList:
         min_spin.bind('<FocusOut>',
                       lambda e: _focusout_clamp(min_var, 0, 59, dt.minute))
 
+        # repeat row
+        repeat_row = tk.Frame(pf, bg="#F8F8E8")
+        repeat_row.pack(fill=tk.X, padx=8, pady=2)
+
+        tk.Label(repeat_row, text="Repeat:", bg="#F8F8E8",
+                 font=("Segoe UI", 8)).pack(side=tk.LEFT)
+
+        repeat_var = tk.StringVar(value=kind_label(task.repeat))
+        repeat_menu = tk.OptionMenu(repeat_row, repeat_var, *KINDS)
+        repeat_menu.config(font=("Segoe UI", 8), bg="#F8F8E8",
+                           highlightthickness=1, width=9)
+        repeat_menu.pack(side=tk.LEFT, padx=2)
+
         # buttons row
         btn_row = tk.Frame(pf, bg="#F8F8E8")
         btn_row.pack(fill=tk.X, padx=8, pady=(2, 6))
@@ -294,7 +717,9 @@ class TaskList:
                 cur = datetime.datetime.now().replace(second=0, microsecond=0)
                 if new_dt < cur:
                     new_dt = cur
-                on_set(new_dt.isoformat())
+                on_set(new_dt.isoformat(),
+                       make_rule(KINDS[repeat_var.get()], new_dt,
+                                 task.repeat))
             except ValueError:
                 pass
             self.dismiss_picker()
@@ -316,7 +741,7 @@ class TaskList:
 
         # Keyboard: Esc dismisses, Enter confirms from any widget
         all_widgets = [year_spin, month_spin, day_spin,
-                       hour_spin, min_spin,
+                       hour_spin, min_spin, repeat_menu,
                        set_btn, clear_btn, cancel_btn, pf]
         for w in all_widgets:
             w.bind("<Escape>", lambda e: self.dismiss_picker())
@@ -324,7 +749,7 @@ class TaskList:
 
         # Tab order: spinboxes then buttons
         tab_order = [year_spin, month_spin, day_spin,
-                     hour_spin, min_spin,
+                     hour_spin, min_spin, repeat_menu,
                      set_btn, clear_btn, cancel_btn]
         for i, w in enumerate(tab_order):
             next_w = tab_order[(i + 1) % len(tab_order)]
@@ -337,3 +762,4 @@ class TaskList:
         if self._picker_frame:
             self._picker_frame.destroy()
             self._picker_frame = None
+        self._picker_task = None
@@ -1,5 +1,4 @@
 import tkinter as tk
-import datetime
 
 from ..constants import (
     STAR_COLORS, SELECTED_ROW_BG, DEFAULT_ROW_BG, COMPLETED_FG,
@@ -33,17 +32,19 @@ class TaskRow:
                               highlightthickness=1, highlightbackground=UNFOCUS_BORDER_COLOR)
         self.frame.pack(fill=tk.X, padx=0, pady=0)
 
-        indent = int(task.get("indent", 0) or 0)
+        indent = task.indent
         self._callbacks = callbacks
         self._index = index
+        self._task = task
+        self._shown = _fields(task)
         self._readonly = readonly
         self._bg = bg
 
         # col 1: checkbox (always enabled so completed tasks can be unmarked)
-        self.done_var = tk.BooleanVar(value=task.get("done", False))
+        self.done_var = tk.BooleanVar(value=task.done)
         self.chk = tk.Checkbutton(
             self.frame, variable=self.done_var, bg=bg, activebackground=bg,
-            command=lambda: callbacks["on_done_toggle"](index, self.done_var),
+            command=lambda: self._fire("on_done_toggle", self.done_var),
             takefocus=1, highlightthickness=2,
             highlightcolor=FOCUS_BORDER_COLOR,
             highlightbackground=bg,
@@ -51,11 +52,11 @@ class TaskRow:
         self.chk.pack(side=tk.LEFT, padx=(4 + indent * 20, 0))
 
         # col 2: task text
-        self.text_var = tk.StringVar(value=task.get("text", ""))
+        self.text_var = tk.StringVar(value=task.text)
         self.entry = tk.Entry(
             self.frame, textvariable=self.text_var, relief=tk.FLAT, bg=bg,
             font=("Segoe UI", 10),
-            fg=COMPLETED_FG if task.get("done") else "#222222",
+            fg=COMPLETED_FG if task.done else "#222222",
             highlightthickness=2,
             highlightcolor=FOCUS_BORDER_COLOR,
             highlightbackground=bg,
@@ -65,8 +66,7 @@ class TaskRow:
         self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
 
         # col 3: star (make focusable with focus ring)
-        star_idx = task.get("star", 0)
-        star_color = STAR_COLORS[star_idx % len(STAR_COLORS)]
+        star_color = STAR_COLORS[task.star % len(STAR_COLORS)]
         self.star_label = tk.Label(
             self.frame, text="★", fg=star_color, bg=bg,
             font=("Segoe UI", 14),
@@ -80,15 +80,14 @@ class TaskRow:
         self.star_label.pack(side=tk.LEFT, padx=2)
         if not readonly:
             self.star_label.bind("<Button-1>",
-                                 lambda e: callbacks["on_star_toggle"](index))
+                                 lambda e: self._fire("on_star_toggle"))
             self.star_label.bind("<space>",
-                                 lambda e: callbacks["on_star_toggle"](index))
+                                 lambda e: self._fire("on_star_toggle"))
             self.star_label.bind("<Return>",
-                                 lambda e: callbacks["on_star_toggle"](index))
+                                 lambda e: self._fire("on_star_toggle"))
 
         # col 4: reminder (make focusable with focus ring)
-        reminder_val = task.get("reminder")
-        reminder_text = format_reminder(reminder_val) if reminder_val else "⏰"
+        reminder_text = format_reminder(task.reminder_dt)
         self.reminder_btn = tk.Label(
             self.frame, text=reminder_text, fg="#666666", bg=bg,
             font=("Segoe UI", 10),
@@ -102,11 +101,11 @@ class TaskRow:
         self.reminder_btn.pack(side=tk.LEFT, padx=(2, 6))
         if not readonly:
             self.reminder_btn.bind("<Button-1>",
-                                   lambda e: callbacks["on_reminder_click"](index))
+                                   lambda e: self._fire("on_reminder_click"))
             self.reminder_btn.bind("<space>",
-                                   lambda e: callbacks["on_reminder_click"](index))
+                                   lambda e: self._fire("on_reminder_click"))
             self.reminder_btn.bind("<Return>",
-                                   lambda e: callbacks["on_reminder_click"](index))
+                                   lambda e: self._fire("on_reminder_click"))
 
         # ordered list of focusable components in this row
         self._focusables = [self.chk, self.entry, self.star_label,
@@ -115,65 +114,68 @@ class TaskRow:
         # ---- bindings ----
         # all components: highlight row on focus
         for w in self._focusables:
-            w.bind("<FocusIn>", lambda e, w=w: self._on_focus_in(w), add="+")
+            w.bind("<FocusIn>", lambda e: self._on_focus_in(), add="+")
+            w.bind("<FocusOut>", lambda e: self._on_focus_out(), add="+")
 
         if not readonly:
             # entry-specific bindings
-            self.entry.bind("<FocusIn>", lambda e: callbacks["on_focus"](index),
+            self.entry.bind("<FocusIn>", lambda e: self._fire("on_focus"),
                             add="+")
             self.entry.bind("<KeyRelease>",
-                            lambda e: callbacks["on_text_change"](index, self.text_var))
+                            lambda e: self._fire("on_text_change", self.text_var))
             self.entry.bind("<Shift-Return>",
-                            lambda e: callbacks["on_shift_enter"](index))
+                            lambda e: self._fire("on_shift_enter"))
 
             # all focusable components get navigation bindings
             for w in self._focusables:
                 w.bind("<Tab>", lambda e, w=w: self._tab_forward(w))
                 w.bind("<Shift-Tab>", lambda e, w=w: self._tab_backward(w))
-                w.bind("<Up>", lambda e: callbacks["on_up"](index))
-                w.bind("<Down>", lambda e: callbacks["on_down"](index))
+                w.bind("<Up>", lambda e: self._fire("on_up"))
+                w.bind("<Down>", lambda e: self._fire("on_down"))
                 w.bind("<Shift-Right>",
-                       lambda e: callbacks["on_indent"](index))
+                       lambda e: self._fire("on_indent"))
                 w.bind("<Shift-Left>",
-                       lambda e: callbacks["on_unindent"](index))
+                       lambda e: self._fire("on_unindent"))
                 w.bind("<Shift-Up>",
-                       lambda e: callbacks["on_move_up"](index))
+                       lambda e: self._fire("on_move_up"))
                 w.bind("<Shift-Down>",
-                       lambda e: callbacks["on_move_down"](index))
+                       lambda e: self._fire("on_move_down"))
                 w.bind("<Control-d>",
-                       lambda e: callbacks["on_delete"](index))
+                       lambda e: self._fire("on_delete"))
 
             # checkbox and star/reminder: fire on_focus for row selection
             self.chk.bind("<FocusIn>",
-                          lambda e: callbacks["on_focus"](index), add="+")
+                          lambda e: self._fire("on_focus"), add="+")
             self.star_label.bind("<FocusIn>",
-                                 lambda e: callbacks["on_focus"](index), add="+")
+                                 lambda e: self._fire("on_focus"), add="+")
             self.reminder_btn.bind("<FocusIn>",
-                                   lambda e: callbacks["on_focus"](index), add="+")
+                                   lambda e: self._fire("on_focus"), add="+")
 
             # entry-only shortcuts
             self.entry.bind("<Control-space>",
-                            lambda e: callbacks["on_toggle_done_kb"](index))
+                            lambda e: self._fire("on_toggle_done_kb"))
             self.entry.bind("<Alt-s>",
-                            lambda e: callbacks["on_toggle_star_kb"](index))
+                            lambda e: self._fire("on_toggle_star_kb"))
             self.entry.bind("<Alt-r>",
-                            lambda e: callbacks["on_reminder_click"](index))
+                            lambda e: self._fire("on_reminder_click"))
         else:
             # readonly: arrow + tab navigation + delete
             for w in self._focusables:
-                w.bind("<Up>", lambda e: callbacks["on_up"](index))
-                w.bind("<Down>", lambda e: callbacks["on_down"](index))
+                w.bind("<Up>", lambda e: self._fire("on_up"))
+                w.bind("<Down>", lambda e: self._fire("on_down"))
                 w.bind("<Tab>", lambda e, w=w: self._tab_forward(w))
                 w.bind("<Shift-Tab>", lambda e, w=w: self._tab_backward(w))
                 w.bind("<Control-d>",
-                       lambda e: callbacks["on_delete"](index))
+                       lambda e: self._fire("on_delete"))
 
-    def _on_focus_in(self, widget):
+    def _on_focus_in(self):
         """Highlight the row border when any component gets focus."""
         self.frame.config(highlightbackground=FOCUS_BORDER_COLOR,
                           highlightthickness=2)
-        # Unhighlight when focus leaves this row entirely
-        widget.bind("<FocusOut>", lambda e: self._on_focus_out(), add="+")
+
+    def _fire(self, name, *args):
+        """Invoke callback *name* for the task this row currently shows."""
+        return self._callbacks[name](self._index, *args)
 
     def _on_focus_out(self):
         """Remove row border highlight when focus leaves."""
@@ -197,7 +199,7 @@ class TaskRow:
         if idx < len(self._focusables) - 1:
             self._focusables[idx + 1].focus_set()
         else:
-            self._callbacks["on_down"](self._index)
+            self._fire("on_down")
         return "break"
 
     def _tab_backward(self, current):
@@ -206,9 +208,71 @@ class TaskRow:
         if idx > 0:
             self._focusables[idx - 1].focus_set()
         else:
-            self._callbacks["on_up"](self._index)
+            self._fire("on_up")
         return "break"
 
+    # ---- in-place updates ----
+    def show(self, index, task, selected=False):
+        """Show *task* (at *index*) in this row; True if a field changed."""
+        self._index = index
+        self._task = task
+        changed = self.refresh(task)
+        self.set_selected(selected)
+        return changed
+
+    def refresh(self, task):
+        """Update the widgets whose field differs from what is shown.
+
+        Returns True if anything had to change.
+        """
+        fields = _fields(task)
+        if fields == self._shown:
+            return False
+        indent, done, text, star, reminder_dt = fields
+        self.set_indent(indent)
+        self.set_done(done)
+        self.set_text(text)
+        self.set_star(star)
+        self.set_reminder(reminder_dt)
+        return True
+
+    # Each setter is a no-op if the row already shows that value.
+    # self._shown mirrors _fields(): indent, done, text, star, reminder_dt
+    def set_indent(self, indent):
+        if self._shown[0] != indent:
+            self._shown[0] = indent
+            self.chk.pack_configure(padx=(4 + indent * 20, 0))
+
+    def set_done(self, done):
+        if self._shown[1] != done:
+            self._shown[1] = done
+            if self.done_var.get() != done:
+                self.done_var.set(done)
+            self.entry.config(fg=COMPLETED_FG if done else "#222222")
+
+    def set_text(self, text):
+        if self._shown[2] != text:
+            self._shown[2] = text
+            if self.text_var.get() != text:
+                self.text_var.set(text)
+
+    def set_star(self, star):
+        if self._shown[3] != star:
+            self._shown[3] = star
+            self.star_label.config(fg=STAR_COLORS[star % len(STAR_COLORS)])
+
+    def set_reminder(self, reminder_dt):
+        if self._shown[4] != reminder_dt:
+            self._shown[4] = reminder_dt
+            self.reminder_btn.config(text=format_reminder(reminder_dt))
+
+    def set_selected(self, selected):
+        bg = SELECTED_ROW_BG if selected else (
+            COMPLETED_ROW_BG if self._readonly else DEFAULT_ROW_BG
+        )
+        if bg != self._bg:
+            self.set_bg(bg)
+
     def set_bg(self, bg):
         self._bg = bg
         for w in (self.frame, self.entry, self.star_label, self.reminder_btn):
@@ -221,10 +285,16 @@ class TaskRow:
                 pass
 
 
+def _fields(task):
+    """The task fields a row displays, for change detection."""
+    return [task.indent, task.done, task.text, task.star, task.reminder_dt]
+
+
 class EmptyRow:
     """Placeholder row at the bottom for adding new tasks."""
 
     def __init__(self, parent, on_commit, on_up=None):
+        self.on_commit = on_commit
         bg = "#FAFAFA"
         self.frame = tk.Frame(parent, bg=bg, bd=0,
                               highlightthickness=1,
@@ -239,7 +309,7 @@ class EmptyRow:
         self.entry.insert(0, "Click to add a task...")
         self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(28, 6), pady=2)
         self.entry.bind("<FocusIn>", self._activate)
-        self.entry.bind("<Return>", lambda e: on_commit(self.entry))
+        self.entry.bind("<Return>", lambda e: self.on_commit(self.entry))
         if on_up:
             self.entry.bind("<Up>", lambda e: on_up())
 
@@ -258,9 +328,8 @@ class EmptyRow:
 
 
 # ---------------------------------------------------------------------------
-def format_reminder(iso_str):
-    try:
-        dt = datetime.datetime.fromisoformat(iso_str)
-        return dt.strftime("%m/%d %H:%M")
-    except Exception:
+def format_reminder(dt):
+    """Label text for a parsed reminder datetime (or the bell if unset)."""
+    if dt is None:
         return "⏰"
+    return dt.strftime("%m/%d %H:%M")
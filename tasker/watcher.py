@@ -0,0 +1,171 @@
+"""Watch the tasks file for changes made outside Tasker.
+
+On Linux the watcher uses inotify (through ctypes, no extra dependency)
+on the file's *directory*, so sync clients that replace the file with an
+atomic rename are seen too.  The inotify descriptor is registered with
+Tk's event loop, so nothing runs until the kernel reports an event.
+Elsewhere it falls back to polling every *poll_ms*.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+import time
+import tkinter as tk
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+               IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                        use_errno=True)
+    _inotify_init1 = _libc.inotify_init1
+    _inotify_add_watch = _libc.inotify_add_watch
+    _inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                   ctypes.c_uint32]
+    HAS_INOTIFY = sys.platform.startswith("linux")
+except (OSError, AttributeError):
+    HAS_INOTIFY = False
+
+
+class DataFileWatcher:
+    """Call *on_change* on the Tk thread when the data file may have changed.
+
+    Bursts of events (a sync client writing a temp file, renaming it, then
+    touching it) are debounced into one call *debounce_ms* after the last
+    event, but never later than *max_delay_ms* after the first one.
+    *on_change* should still compare the file against what it knows, since
+    the watcher also reports Tasker's own writes.
+    """
+
+    def __init__(self, root, path, on_change, *, poll_ms=60000,
+                 debounce_ms=200, max_delay_ms=800):
+        self.root = root
+        self.path = path
+        self.on_change = on_change
+        self.poll_ms = poll_ms
+        self.debounce_ms = debounce_ms
+        self.max_delay_ms = max_delay_ms
+        self.mode = None  # "inotify" or "poll" once started
+        self._fd = None
+        self._timer = None
+        self._first_event = None
+
+    def start(self):
+        if not (HAS_INOTIFY and self._start_inotify()):
+            self.mode = "poll"
+            self._timer = self.root.after(self.poll_ms, self._poll)
+
+    def stop(self):
+        self._cancel_timer()
+        self._close_inotify()
+        self.mode = None
+
+    def set_path(self, path):
+        """Watch a different data file."""
+        self.stop()
+        self.path = path
+        self.start()
+
+    # ---- inotify ----
+    def _start_inotify(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd = _inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        wd = _inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            os.close(fd)
+            return False
+        try:
+            self.root.tk.createfilehandler(fd, tk.READABLE, self._on_readable)
+        except (AttributeError, tk.TclError):
+            os.close(fd)  # no file handlers in this Tk build (Windows)
+            return False
+        self._fd = fd
+        self.mode = "inotify"
+        return True
+
+    def _close_inotify(self):
+        if self._fd is not None:
+            try:
+                self.root.tk.deletefilehandler(self._fd)
+            except (AttributeError, tk.TclError):
+                pass
+            os.close(self._fd)
+            self._fd = None
+
+    def _on_readable(self, fd, _mask):
+        name = os.fsencode(os.path.basename(self.path))
+        relevant = False
+        lost_dir = False
+        while True:
+            try:
+                data = os.read(fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EINTR):
+                    break
+                raise
+            if not data:
+                break
+            pos = 0
+            while pos + _EVENT.size <= len(data):
+                _wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                event_name = data[pos:pos + length].rstrip(b"\0")
+                pos += length
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    lost_dir = True
+                elif event_name == name:
+                    relevant = True
+        if lost_dir:
+            # the directory itself went away; fall back to polling
+            self._close_inotify()
+            self._cancel_timer()
+            self._first_event = None
+            self.mode = "poll"
+            self._timer = self.root.after(self.poll_ms, self._poll)
+            self.on_change()
+        elif relevant:
+            self._debounce()
+
+    def _debounce(self):
+        now = time.monotonic()
+        if self._first_event is None:
+            self._first_event = now
+        remaining_ms = (self._first_event - now) * 1000 + self.max_delay_ms
+        delay = int(max(0, min(self.debounce_ms, remaining_ms)))
+        self._cancel_timer()
+        self._timer = self.root.after(delay, self._fire)
+
+    def _fire(self):
+        self._timer = None
+        self._first_event = None
+        self.on_change()
+
+    # ---- polling fallback ----
+    def _poll(self):
+        self._timer = self.root.after(self.poll_ms, self._poll)
+        self.on_change()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            try:
+                self.root.after_cancel(self._timer)
+            except tk.TclError:
+                pass
+            self._timer = None
@@ -0,0 +1,48 @@
+"""``SubtreeIndex`` against a full rebuild after every edit."""
+import random
+
+from tasker.hierarchy import SubtreeIndex
+from tasker.model import Task
+
+
+def make(indents):
+    return [Task(str(i), indent=n) for i, n in enumerate(indents)]
+
+
+def test_queries():
+    index = SubtreeIndex(make([0, 1, 2, 1, 0, 1]))
+    assert index.group(0) == (0, 4)
+    assert index.group(1) == (1, 3)
+    assert index.group(3) == (3, 4)
+    assert index.group(4) == (4, 6)
+    assert index.parent(2) == 1
+    assert index.parent(3) == 0
+    assert index.parent(4) is None
+    assert index.root(2) == 0
+
+
+def test_indent_deeper_than_the_parent_allows():
+    # a hand-edited file can jump indent levels
+    index = SubtreeIndex(make([0, 3, 1]))
+    assert index.group(0) == (0, 3)
+    assert index.parent(2) == 0
+
+
+def test_random_edits_match_a_rebuild():
+    rng = random.Random(0)
+    tasks = make([rng.randrange(3) for _ in range(30)])
+    index = SubtreeIndex(tasks)
+    for step in range(500):
+        n = len(tasks)
+        edit = rng.randrange(4)
+        if edit == 0 or n < 5:
+            index.insert(rng.randrange(n + 1), Task(indent=rng.randrange(3)))
+        elif edit == 1:
+            index.pop(rng.randrange(n))
+        elif edit == 2:
+            index.set_indent(rng.randrange(n), rng.randrange(4))
+        else:
+            i, j = index.group(rng.randrange(n))
+            index.move(i, j, rng.randrange(n - (j - i) + 1))
+        assert index.tasks is tasks
+        assert index.check() == [], f"step {step}"
@@ -0,0 +1,65 @@
+"""Chord parsing and matching in ``tasker.hotkey``."""
+import pytest
+
+import tasker.hotkey as hotkey
+from tasker.hotkey import GlobalHotkey, format_chord, parse_chord
+
+CTRL_K = (frozenset({"ctrl"}), "k")
+
+
+def test_parse_chord():
+    assert parse_chord("Ctrl+K, ctrl+k") == (CTRL_K, CTRL_K)
+    assert parse_chord("win+shift+space") == \
+        ((frozenset({"super", "shift"}), "space"),)
+
+
+@pytest.mark.parametrize("text", ["", "ctrl+", "ctrl", "hyper+k",
+                                  "ctrl+k,,ctrl+k"])
+def test_bad_chord(text):
+    with pytest.raises(ValueError):
+        parse_chord(text)
+
+
+def test_format_chord():
+    assert format_chord(parse_chord("shift+ctrl+k, ctrl+f5")) == \
+        "Ctrl+Shift+K, Ctrl+F5"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(hotkey.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make(chord="ctrl+k, ctrl+k"):
+    fired = []
+    return GlobalHotkey(chord, lambda: fired.append(1)), fired
+
+
+def test_chord_completes(clock):
+    key, fired = make()
+    assert key._pressed(CTRL_K) is False
+    assert key._pressed(CTRL_K) is True
+    assert fired == [1]
+    assert key._pressed(CTRL_K) is False  # starts over
+
+
+def test_other_combo_resets(clock):
+    key, fired = make("ctrl+k, ctrl+j")
+    ctrl_j = (frozenset({"ctrl"}), "j")
+    key._pressed(CTRL_K)
+    assert key._pressed(CTRL_K) is False  # restarts at the first step
+    assert key._pressed(ctrl_j) is True
+    assert key._pressed(ctrl_j) is False
+    assert fired == [1]
+
+
+def test_timeout(clock):
+    key, fired = make()
+    key._pressed(CTRL_K)
+    clock[0] += 1.5
+    assert key._pressed(CTRL_K) is False
+    clock[0] += 0.5
+    assert key._pressed(CTRL_K) is True
+    assert fired == [1]
@@ -0,0 +1,220 @@
+"""Incremental To Do sync against the local fake Graph server."""
+import json
+import os
+import socket
+
+import pytest
+
+pytest.importorskip("msal")
+pytest.importorskip("requests")
+
+import tasker.ms_todo_sync as ms_todo_sync  # noqa: E402
+from fake_graph import FakeGraph  # noqa: E402
+from tasker.model import Task  # noqa: E402
+
+LIST_NAME = "Tests"
+
+
+class Session(ms_todo_sync.SyncSession):
+    def acquire_token(self, interactive=False):
+        return "test-token"
+
+
+@pytest.fixture
+def graph(tmp_path, monkeypatch):
+    monkeypatch.setattr(ms_todo_sync, "SYNC_STATE_FILE",
+                        str(tmp_path / "ms_sync_state.json"))
+    monkeypatch.setattr(ms_todo_sync, "CONFIG_DIR", str(tmp_path))
+    monkeypatch.setattr(ms_todo_sync, "BACKOFF_BASE", 0.01)
+    server = FakeGraph(seed=0).start()
+    monkeypatch.setattr(ms_todo_sync, "GRAPH_BASE", server.base_url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def session():
+    session = Session("test-client", LIST_NAME)
+    yield session
+    session.close()
+
+
+def push(session, tasks):
+    info = {}
+    session.push(tasks, info=info)
+    return info
+
+
+def titles(graph):
+    return sorted(item["title"] for item in graph.tasks(LIST_NAME))
+
+
+def state():
+    with open(ms_todo_sync.SYNC_STATE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def unreachable_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/v1.0"
+
+
+def lose_reply(monkeypatch, nth):
+    """Make the *nth* create ``$batch`` run on the server, then fail as if
+    the connection dropped before the reply arrived."""
+    request = ms_todo_sync.GraphClient.request
+    seen = [0]
+
+    def lossy(self, method, url, json_body=None):
+        result = request(self, method, url, json_body)
+        if (url.endswith("/$batch") and
+                any(r["method"] == "POST" for r in json_body["requests"])):
+            seen[0] += 1
+            if seen[0] == nth:
+                raise ms_todo_sync.GraphError("connection reset", 0)
+        return result
+
+    monkeypatch.setattr(ms_todo_sync.GraphClient, "request", lossy)
+    return lambda: monkeypatch.setattr(ms_todo_sync.GraphClient, "request",
+                                       request)
+
+
+def test_first_push_is_full_then_incremental(graph, session):
+    tasks = [Task(f"task {i}") for i in range(30)]
+    assert push(session, tasks)["mode"] == "full"
+    tasks[3].text = "edited"
+    del tasks[7]
+    tasks.append(Task("added"))
+    info = push(session, tasks)
+    assert info["mode"] == "incremental"
+    assert titles(graph) == sorted(t.text for t in tasks)
+    assert push(session, tasks)["requests"] == 0
+
+
+def test_offline_insert_resumes_incrementally(graph, session, monkeypatch):
+    tasks = [Task(f"task {i}") for i in range(5)]
+    push(session, tasks)
+    tasks.append(Task("written offline"))
+    tasks[0].star = 1
+    monkeypatch.setattr(ms_todo_sync, "GRAPH_BASE", unreachable_url())
+    with pytest.raises(ms_todo_sync.GraphError) as failed:
+        push(session, tasks)
+    assert failed.value.status == 0 and not failed.value.sent
+    assert len(state()["entries"]) == 5
+    assert "unconfirmed" not in state()
+
+    monkeypatch.setattr(ms_todo_sync, "GRAPH_BASE", graph.base_url)
+    info = push(session, tasks)
+    assert info["mode"] == "incremental"
+    assert titles(graph) == sorted(t.text for t in tasks)
+
+
+@pytest.mark.parametrize("first_push", [True, False])
+def test_lost_batch_reply_is_not_created_twice(graph, session, monkeypatch,
+                                               first_push):
+    tasks = [Task(f"task {i}", done=i % 3 == 0) for i in range(45)]
+    if not first_push:
+        push(session, tasks[:5])
+    restore = lose_reply(monkeypatch, 2 if first_push else 1)
+    with pytest.raises(ms_todo_sync.GraphError):
+        push(session, tasks)
+    restore()
+    saved = state()
+    assert saved["unconfirmed"]
+    assert len(graph.tasks(LIST_NAME)) > len(saved["entries"])
+
+    info = push(session, tasks)
+    assert info["mode"] == "incremental"
+    assert titles(graph) == sorted(t.text for t in tasks)
+    assert "unconfirmed" not in state()
+
+
+def test_lost_create_of_a_task_deleted_since(graph, session, monkeypatch):
+    tasks = [Task(f"task {i}") for i in range(3)]
+    push(session, tasks)
+    tasks.append(Task("short-lived"))
+    restore = lose_reply(monkeypatch, 1)
+    with pytest.raises(ms_todo_sync.GraphError):
+        push(session, tasks)
+    restore()
+    del tasks[-1]
+    assert push(session, tasks)["mode"] == "incremental"
+    assert titles(graph) == sorted(t.text for t in tasks)
+
+
+def test_pull_leaves_unconfirmed_creates_to_the_push(graph, session,
+                                                     monkeypatch):
+    tasks = [Task(f"task {i}") for i in range(3)]
+    push(session, tasks)
+    session.pull(tasks)  # delta link
+    tasks.append(Task("maybe created"))
+    restore = lose_reply(monkeypatch, 1)
+    with pytest.raises(ms_todo_sync.GraphError):
+        push(session, tasks)
+    restore()
+    assert not session.pull(tasks).added
+    push(session, tasks)
+    assert titles(graph) == sorted(t.text for t in tasks)
+
+
+def test_server_errors_resume_without_full_push(graph, session):
+    tasks = [Task(f"task {i}") for i in range(60)]
+    push(session, tasks)
+    graph.fail_rate = 0.3
+    for task in tasks[::4]:
+        task.text += " (edited)"
+    tasks += [Task(f"new {i}") for i in range(10)]
+    modes = []
+    for _ in range(20):
+        try:
+            modes.append(push(session, tasks)["mode"])
+            break
+        except ms_todo_sync.GraphError:
+            assert os.path.exists(ms_todo_sync.SYNC_STATE_FILE)
+    graph.fail_rate = 0.0
+    assert modes == ["incremental"]
+    assert titles(graph) == sorted(t.text for t in tasks)
+
+
+def edit_remote(graph, name, **fields):
+    list_id = next(iter(graph.lists))
+    item = next(t for t in graph.tasks(LIST_NAME) if t["title"] == name)
+    path = f"/me/todo/lists/{list_id}/tasks/{item['id']}"
+    if fields:
+        graph.dispatch("PATCH", path, fields)
+    else:
+        graph.dispatch("DELETE", path, None)
+
+
+def test_push_only_check_restores_remote_edits(graph, session):
+    tasks = [Task(f"task {i}", star=i % 2,
+                  reminder="2030-01-01T09:00:00" if i == 1 else None)
+             for i in range(6)]
+    push(session, tasks)
+    result = session.pull(tasks, merge=False)  # nothing to find
+    assert (result.reverted, result.removed) == (0, 0)
+
+    edit_remote(graph, "task 2", title="renamed in To Do")
+    edit_remote(graph, "task 3")
+    list_id = next(iter(graph.lists))
+    graph.dispatch("POST", f"/me/todo/lists/{list_id}/tasks",
+                   {"title": "added in To Do", "status": "notStarted"})
+    result = session.pull(tasks, merge=False)
+    assert not result
+    assert (result.reverted, result.removed) == (2, 1)
+    assert push(session, tasks)["mode"] == "incremental"
+    assert titles(graph) == sorted(t.text for t in tasks)
+
+
+def test_pull_merges_remote_edits(graph, session):
+    tasks = [Task(f"task {i}") for i in range(4)]
+    push(session, tasks)
+    session.pull(tasks)
+    edit_remote(graph, "task 1", title="renamed", status="completed")
+    result = session.pull(tasks)
+    [(task, _key, merged)] = result.updated
+    assert task is tasks[1]
+    assert (merged.text, merged.done) == ("renamed", True)
+    assert push(session, result.apply(tasks))["requests"] == 0
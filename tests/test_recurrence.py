@@ -0,0 +1,78 @@
+"""Repeating reminder rules."""
+import datetime
+
+import pytest
+
+from tasker.model import Task
+from tasker.recurrence import make_rule, next_reminder, parse_rule
+
+dt = datetime.datetime
+
+
+@pytest.mark.parametrize("text", [
+    "daily 09:00", "weekdays 09:00", "weekly mon,thu 18:30",
+    "monthly 15 09:00", "every 4 hours", "every hour", "daily",
+])
+def test_round_trip(text):
+    assert str(parse_rule(text)) == text
+
+
+@pytest.mark.parametrize("text", [
+    None, "", "yearly", "daily 25:00", "weekly xyz 09:00", "monthly 32",
+    "every 0 hours",
+])
+def test_not_a_rule(text):
+    assert parse_rule(text) is None
+
+
+def test_daily_skips_missed_days():
+    rule = parse_rule("daily 09:00")
+    assert rule.next_after(dt(2026, 3, 2, 9), dt(2026, 3, 9, 12)) \
+        == dt(2026, 3, 10, 9)
+    assert rule.next_after(dt(2026, 3, 2, 9), dt(2026, 3, 9, 8)) \
+        == dt(2026, 3, 9, 9)
+
+
+def test_weekdays_and_weekly():
+    friday = dt(2026, 3, 6, 9, 0)
+    assert parse_rule("weekdays 09:00").next_after(friday, friday) \
+        == dt(2026, 3, 9, 9)  # Monday
+    weekly = parse_rule("weekly mon,thu 18:30")
+    assert weekly.next_after(None, dt(2026, 3, 2, 19)) \
+        == dt(2026, 3, 5, 18, 30)  # Thursday
+
+
+def test_monthly_clamps_to_short_months():
+    rule = parse_rule("monthly 31 09:00")
+    assert rule.next_after(None, dt(2026, 2, 10)) == dt(2026, 2, 28, 9)
+    assert rule.next_after(None, dt(2026, 2, 28, 10)) == dt(2026, 3, 31, 9)
+
+
+def test_hours_keep_their_phase_after_downtime():
+    rule = parse_rule("every 4 hours")
+    last = dt(2026, 3, 2, 8, 15)
+    assert rule.next_after(last, dt(2026, 5, 1, 13)) == dt(2026, 5, 1, 16, 15)
+
+
+def test_time_left_out_keeps_the_reminder_time():
+    rule = parse_rule("daily")
+    assert rule.next_after(dt(2026, 3, 2, 7, 45), dt(2026, 3, 2, 7, 45)) \
+        == dt(2026, 3, 3, 7, 45)
+
+
+def test_next_reminder():
+    task = Task("t", reminder="2026-03-02T09:00:00", repeat="daily 09:00")
+    assert next_reminder(task, dt(2026, 3, 2, 9)) == "2026-03-03T09:00:00"
+    assert next_reminder(Task("t", reminder="2026-03-02T09:00:00"),
+                         dt(2026, 3, 2, 9)) is None
+
+
+def test_make_rule():
+    thursday = dt(2026, 3, 5, 18, 30)
+    assert make_rule(None, thursday) is None
+    assert make_rule("weekly", thursday, "weekly mon,thu 09:00") \
+        == "weekly mon,thu 18:30"
+    assert make_rule("weekly", thursday, "weekly mon 09:00") \
+        == "weekly thu 18:30"
+    assert make_rule("hours", thursday, "every 3 hours") == "every 3 hours"
+    assert make_rule("monthly", thursday) == "monthly 5 18:30"
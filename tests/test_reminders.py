@@ -0,0 +1,91 @@
+"""``ReminderScheduler`` timing, with a fake Tk root and clock."""
+import datetime
+import types
+
+import pytest
+
+import tasker.reminders as reminders
+from tasker.model import Task
+from tasker.reminders import ReminderScheduler
+
+START = datetime.datetime(2026, 3, 2, 9, 0)
+
+
+class Root:
+    """Records ``after`` timers instead of running them."""
+
+    def __init__(self):
+        self.timers = {}
+        self._ids = 0
+
+    def after(self, ms, func):
+        self._ids += 1
+        self.timers[self._ids] = (ms, func)
+        return self._ids
+
+    def after_cancel(self, timer):
+        self.timers.pop(timer, None)
+
+    def run(self):
+        (timer, (_, func)), = self.timers.items()
+        del self.timers[timer]
+        func()
+
+    @property
+    def delays(self):
+        return [ms for ms, _ in self.timers.values()]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [START]
+
+    class Clock(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now[0]
+
+    monkeypatch.setattr(reminders, "datetime",
+                        types.SimpleNamespace(datetime=Clock))
+    return now
+
+
+def at(**delta):
+    return (START + datetime.timedelta(**delta)).isoformat()
+
+
+def test_sleeps_until_the_next_reminder(clock):
+    root, fired = Root(), []
+    tasks = [Task("later", reminder=at(days=3)),
+             Task("soon", reminder=at(hours=2)),
+             Task("done", reminder=at(minutes=1), done=True)]
+    scheduler = ReminderScheduler(root, fired.extend)
+    scheduler.reset(tasks)
+    assert root.delays == [2 * 3600 * 1000]
+    clock[0] += datetime.timedelta(hours=2)
+    root.run()
+    assert [t.text for t in fired] == ["soon"]
+    assert root.delays == [(3 * 24 - 2) * 3600 * 1000]
+
+
+def test_early_timer_is_armed_again(clock):
+    root, fired = Root(), []
+    scheduler = ReminderScheduler(root, fired.extend)
+    scheduler.reset([Task("t", reminder=at(hours=2))])
+    clock[0] += datetime.timedelta(hours=1)  # clock set back meanwhile
+    root.run()
+    assert fired == []
+    assert root.delays == [3600 * 1000]
+
+
+def test_check_catches_up_after_the_clock_jumped(clock):
+    root, fired = Root(), []
+    scheduler = ReminderScheduler(root, fired.extend)
+    scheduler.reset([Task("t", reminder=at(hours=2)),
+                     Task("u", reminder=at(days=1))])
+    scheduler.check()
+    assert fired == []
+    clock[0] += datetime.timedelta(hours=10)  # woke up from suspend
+    scheduler.check()
+    assert [t.text for t in fired] == ["t"]
+    assert root.delays == [14 * 3600 * 1000]
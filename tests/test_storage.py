@@ -0,0 +1,104 @@
+"""Journal replay and compaction in ``tasker.storage``."""
+import json
+import os
+
+import pytest
+
+import tasker.cache as cache
+from tasker.model import Task
+from tasker.storage import (
+    TaskJournal, apply_ops, journal_path, load_tasks, save_tasks,
+)
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "cache"))
+    path = str(tmp_path / "tasks.json")
+    save_tasks(path, [Task("a"), Task("b", indent=1), Task("c"), Task("d")])
+    return path
+
+
+def texts(tasks):
+    return [t.text for t in tasks]
+
+
+def test_apply_ops():
+    tasks = [Task(t) for t in "abcde"]
+    apply_ops(tasks, [
+        {"op": "set", "i": 0, "key": "star", "value": "2"},
+        {"op": "set_range", "i": 1, "j": 3, "key": "done", "value": True},
+        {"op": "insert", "i": 5, "task": {"text": "f", "indent": 1}},
+        {"op": "delete", "i": 2},
+        {"op": "move", "i": 3, "j": 5, "to": 0},
+    ])
+    assert texts(tasks) == ["e", "f", "a", "b", "d"]
+    assert tasks[2].star == 2
+    assert [t.done for t in tasks] == [False, False, False, True, False]
+    assert tasks[1].indent == 1
+    with pytest.raises(ValueError):
+        apply_ops(tasks, [{"op": "swap", "i": 0}])
+
+
+def test_journal_is_replayed_on_load(path):
+    journal = TaskJournal(path)
+    journal.open(load_tasks(path))
+    assert journal.append([{"op": "set", "i": 0, "key": "text",
+                            "value": "A"}])
+    assert journal.append([{"op": "delete", "i": 3},
+                           {"op": "move", "i": 2, "j": 3, "to": 0}])
+    journal.close()
+    assert texts(load_tasks(path)) == ["c", "A", "b"]
+
+
+def test_torn_record_keeps_the_ops_before_it(path):
+    journal = TaskJournal(path)
+    journal.open(load_tasks(path))
+    journal.append([{"op": "set", "i": 1, "key": "done", "value": True}])
+    journal.close()
+    with open(journal_path(path), "a", encoding="utf-8") as f:
+        f.write('{"op": "delete", "i"')
+    tasks = load_tasks(path)
+    assert texts(tasks) == ["a", "b", "c", "d"]
+    assert tasks[1].done
+
+
+def test_journal_for_another_file_is_ignored(path):
+    journal = TaskJournal(path)
+    journal.open(load_tasks(path))
+    journal.append([{"op": "delete", "i": 0}])
+    journal.close()
+    save_tasks(path, [Task("x")])  # edited outside Tasker
+    assert texts(load_tasks(path)) == ["x"]
+
+
+def test_compaction_folds_the_journal_into_the_file(path):
+    journal = TaskJournal(path, max_bytes=200)
+    tasks = load_tasks(path)
+    journal.open(tasks)
+    assert not journal.needs_compaction()
+    while not journal.needs_compaction():
+        op = {"op": "set", "i": 0, "key": "star", "value": 1}
+        apply_ops(tasks, [op])
+        journal.append([op])
+    assert journal.compact(tasks)
+    journal.close()
+    with open(journal_path(path), encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 1  # just the header
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)[0]["star"] == 1
+    assert load_tasks(path)[0].star == 1
+
+
+def test_open_compacts_a_leftover_journal(path):
+    journal = TaskJournal(path)
+    journal.open(load_tasks(path))
+    journal.append([{"op": "delete", "i": 0}])
+    journal.close()  # as if Tasker had been killed
+    tasks = load_tasks(path)
+    journal = TaskJournal(path)
+    journal.open(tasks)
+    journal.close()
+    assert os.path.getsize(journal_path(path)) > 0
+    with open(path, encoding="utf-8") as f:
+        assert [t["text"] for t in json.load(f)] == ["b", "c", "d"]
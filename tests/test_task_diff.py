@@ -0,0 +1,57 @@
+"""``diff_tasks`` / ``apply_diff`` on external edits."""
+from tasker.model import Task
+from tasker.task_diff import apply_diff, diff_tasks
+
+
+def make(*texts):
+    return [Task(t) for t in texts]
+
+
+def test_unchanged():
+    diff = diff_tasks(make("a", "b"), make("a", "b"))
+    assert not diff
+    assert diff.sources == [0, 1]
+
+
+def test_one_task_edited():
+    old = make("a", "b", "c")
+    new = make("a", "B", "c")
+    diff = diff_tasks(old, new)
+    assert diff.sources == [0, 1, 2]
+    assert diff.modified == [1]
+    assert not diff.structural
+    result = apply_diff(old, new, diff)
+    assert result == old  # same objects, the middle one updated
+    assert old[1].text == "B"
+
+
+def test_insert_and_remove():
+    old = make("a", "b", "c", "d")
+    new = make("a", "x", "c", "d", "e")
+    diff = diff_tasks(old, new)
+    assert diff.structural
+    assert diff.inserted == [4]
+    assert diff.modified == [1]
+    assert diff.removed == []
+    diff = diff_tasks(old, make("a", "d"))
+    assert diff.removed == [1, 2]
+    assert diff.sources == [0, 3]
+
+
+def test_moved_task_keeps_its_object():
+    old = make("a", "b", "c", "d")
+    new = make("c", "a", "b", "d")
+    diff = diff_tasks(old, new)
+    assert diff.moved == [0]
+    assert diff.removed == []
+    result = apply_diff(old, new, diff)
+    assert [t.text for t in result] == ["c", "a", "b", "d"]
+    assert all(any(t is o for o in old) for t in result)
+
+
+def test_duplicates_are_matched_one_to_one():
+    old = make("a", "a", "b")
+    new = make("b", "a", "a")
+    diff = diff_tasks(old, new)
+    assert sorted(i for i in diff.sources if i is not None) == [0, 1, 2]
+    assert diff.removed == []